@@ -3,23 +3,48 @@ RAG-based chat endpoints
 Now using advanced RAG with vector search, hybrid search, and re-ranking
 """
 import os
+import asyncio
+import json
+import time
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
 import logging
 
-from ..services.core.rag_indexer_advanced import build_index
-from ..services.core.rag_retriever_advanced import retrieve, get_index_stats
-from ..services.responder import draft_reply
+from ..services.core.chat_pipeline import IndexStatusMonitor, StageTimer, start_warmup, finish_warmup
+from ..services.core.conversation_store import ConversationSession, get_conversation_store
+from ..services.core.executor import ExecutorBusyError
+from ..services.core.metrics import RequestTrace, annotate, start_trace
+from ..services.core.query_cache import get_query_cache
+from ..services.core.response_cache import get_response_cache
+from ..services.core.rag_indexer_advanced import build_index, get_index_version
+from ..services.core.rag_retriever_advanced import (
+    retrieve_async, retrieve_batch, embed_query_async, get_index_stats, get_retrieval_executor, get_retrieval_planner
+)
+from ..services.responder import draft_reply, draft_reply_stream, get_generation_backend
+from ..services.ai.deepseek_service import get_deepseek_service
+from ..services.ai.local_llm_service import get_local_llm_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-class ChatRequest(BaseModel):
-    query: str
+class RetrievalOptions(BaseModel):
     top_k: Optional[int] = 5
     use_reranking: Optional[bool] = True
     vector_weight: Optional[float] = 0.5
+    adaptive_depth: Optional[bool] = None  # None = RAG_ADAPTIVE_DEPTH env default
+
+class ChatRequest(RetrievalOptions):
+    query: str
+    debug: Optional[bool] = False  # include a per-stage trace in search_metadata
+    session_id: Optional[str] = None  # keep conversation memory across requests with the same ID
+    reuse_evidence: Optional[bool] = False  # answer a follow-up from the session's previous evidence set
+
+class BatchChatRequest(RetrievalOptions):
+    queries: List[str]
+    max_concurrency: Optional[int] = None  # None = CHAT_BATCH_LLM_CONCURRENCY env default
 
 def ensure_index(reset: bool = False) -> Dict[str, Any]:
     """
@@ -67,6 +92,117 @@ def ensure_index(reset: bool = False) -> Dict[str, Any]:
             "message": str(e)
         }
 
+# Ready index status is cached and refreshed in the background, off the request path
+_index_monitor = IndexStatusMonitor(
+    lambda: ensure_index(),
+    ttl_seconds=float(os.getenv("INDEX_STATUS_TTL_SECONDS", "30"))
+)
+
+async def _ready_index() -> Dict[str, Any]:
+    """Ensure the index is loaded, raising HTTPException if it is not usable"""
+    index_status = await _index_monitor.get()
+    if index_status.get("status") == "error":
+        raise HTTPException(status_code=500, detail=index_status.get("message"))
+    
+    if index_status.get("status") not in ["loaded", "built"]:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Index not ready: {index_status.get('status')}"
+        )
+    return index_status
+
+def _resolve_params(request: RetrievalOptions) -> Tuple[int, bool, float, bool]:
+    """Apply defaults to the optional retrieval parameters of a chat request"""
+    top_k = request.top_k or 5
+    use_reranking = request.use_reranking if request.use_reranking is not None else True
+    vector_weight = request.vector_weight or 0.5
+    adaptive_depth = (
+        request.adaptive_depth if request.adaptive_depth is not None
+        else os.getenv("RAG_ADAPTIVE_DEPTH", "false").lower() in ("1", "true", "yes")
+    )
+    return top_k, use_reranking, vector_weight, adaptive_depth
+
+async def _lookup_cache(
+    cache, query: str, cache_params: Tuple, index_version: int
+) -> Tuple[Optional[Dict[str, Any]], Optional[str], Optional[List[float]]]:
+    """
+    Check the query cache: exact normalized match first, then semantic match
+    
+    Returns:
+        (cached result or None, cache level, query embedding computed for the semantic lookup)
+    """
+    query_embedding = None
+    if cache is None:
+        annotate("query_cache", "disabled")
+        return None, None, None
+    cached = cache.get_exact(query, cache_params, index_version)
+    cache_level = "exact"
+    if cached is None and cache.semantic_enabled:
+        query_embedding = await embed_query_async(query)
+        if query_embedding is not None:
+            cached = cache.get_semantic(query_embedding, cache_params, index_version)
+            cache_level = "semantic"
+    if cached is None:
+        cache.record_miss()
+        annotate("query_cache", "miss")
+        return None, None, query_embedding
+    annotate("query_cache", cache_level)
+    return cached, cache_level, query_embedding
+
+def _stage_metadata(
+    search_metadata: Dict[str, Any], timer: StageTimer, trace: Optional[RequestTrace]
+) -> Dict[str, Any]:
+    """Add stage timings (and the debug trace if requested) to search metadata"""
+    metadata = {**search_metadata, "timings_ms": timer.as_dict()}
+    if trace is not None:
+        metadata["trace"] = trace.to_dict()
+    return metadata
+
+def _open_session(request: ChatRequest) -> Optional[ConversationSession]:
+    """Resume or start the request's conversation session (None for stateless requests)"""
+    if not request.session_id:
+        return None
+    store = get_conversation_store()
+    return store.get_or_create(request.session_id) if store is not None else None
+
+def _conversation_args(session: Optional[ConversationSession]) -> Dict[str, Any]:
+    """Extra draft_reply arguments for session requests"""
+    return {"conversation": session} if session is not None else {}
+
+def _session_fields(session: Optional[ConversationSession]) -> Dict[str, Any]:
+    """Session fields echoed in chat responses"""
+    if session is None:
+        return {}
+    return {"session_id": session.session_id, "turns": len(session.turns)}
+
+def _format_evidences(evidences: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Shape retrieved chunks for the API response"""
+    return [
+        {
+            "text": ev["text"][:300] + "..." if len(ev["text"]) > 300 else ev["text"],
+            "path": ev.get("path", ""),
+            "filename": ev.get("filename", ""),
+            "score": round(ev.get("score", 0.0), 4),
+            "vector_score": round(ev.get("vector_score", 0.0), 4),
+            "bm25_score": round(ev.get("bm25_score", 0.0), 4),
+            "rerank_score": round(ev.get("rerank_score", 0.0), 4) if ev.get("rerank_score") else None,
+        }
+        for ev in evidences
+    ]
+
+def _busy_error(e: ExecutorBusyError) -> HTTPException:
+    """Map a saturated retrieval executor to 503 with Retry-After"""
+    logger.warning(f"Chat request rejected: {e}")
+    return HTTPException(
+        status_code=503,
+        detail="Retrieval is at capacity. Please retry shortly.",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+def _sse(event: str, data: Any) -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @router.post("/")
 async def chat(request: ChatRequest) -> Dict[str, Any]:
     """
@@ -83,68 +219,345 @@ async def chat(request: ChatRequest) -> Dict[str, Any]:
         if not request.query or len(request.query.strip()) == 0:
             raise HTTPException(status_code=400, detail="Query cannot be empty")
         
+        timer = StageTimer("chat")
+        trace = start_trace() if request.debug else None
+        
         # Ensure index is loaded
-        index_status = ensure_index()
-        if index_status.get("status") == "error":
-            raise HTTPException(status_code=500, detail=index_status.get("message"))
-        
-        if index_status.get("status") not in ["loaded", "built"]:
-            raise HTTPException(
-                status_code=500, 
-                detail=f"Index not ready: {index_status.get('status')}"
-            )
+        with timer.stage("index"):
+            index_status = await _ready_index()
+        
+        top_k, use_reranking, vector_weight, adaptive_depth = _resolve_params(request)
+        session = _open_session(request)
+        reuse_evidence = bool(session is not None and request.reuse_evidence and session.evidences)
+        
+        # Check the query cache: exact normalized match first, then semantic match
+        # (not for sessions: a follow-up's answer depends on the earlier turns)
+        cache = get_query_cache() if session is None else None
+        cache_params = (top_k, use_reranking, vector_weight, adaptive_depth)
+        index_version = get_index_version()
+        with timer.stage("cache_lookup"):
+            cached, cache_level, query_embedding = await _lookup_cache(cache, request.query, cache_params, index_version)
+        if cached is not None:
+            return {
+                "query": request.query,
+                **cached,
+                "index_status": index_status,
+                "search_metadata": _stage_metadata({**cached["search_metadata"], "cache": cache_level}, timer, trace),
+            }
+        
+        # Cache miss: open the LLM connection while retrieval runs
+        warmup = start_warmup(get_generation_backend())
         
         # Retrieve relevant documents using advanced RAG
-        top_k = request.top_k or 5
-        evidences = retrieve(
-            query=request.query,
-            top_k=top_k,
-            use_reranking=request.use_reranking if request.use_reranking is not None else True,
-            vector_weight=request.vector_weight or 0.5
-        )
+        if reuse_evidence:
+            evidences = session.evidences
+        else:
+            with timer.stage("retrieve"):
+                evidences = await retrieve_async(
+                    query=request.query,
+                    top_k=top_k,
+                    use_reranking=use_reranking,
+                    vector_weight=vector_weight,
+                    query_embedding=query_embedding,
+                    adaptive=adaptive_depth
+                )
+            if session is not None:
+                session.set_evidences(evidences)
         
         if not evidences:
             return {
+                **_session_fields(session),
                 "query": request.query,
                 "answer": "No relevant documents found for your query. Please try rephrasing or ensure documents are indexed.",
                 "evidences": [],
                 "index_status": index_status,
+                "search_metadata": _stage_metadata({"total_results": 0}, timer, trace),
                 "status": "no_results"
             }
         
-        # Generate response
-        response = await draft_reply(request.query, evidences)
+        # Generate response (reusing the connection warmed during retrieval)
+        await finish_warmup(warmup, timer)
+        with timer.stage("generate"):
+            response = await draft_reply(request.query, evidences, **_conversation_args(session))
         
-        return {
-            "query": request.query,
+        result = {
             "answer": response["answer"],
-            "evidences": [
-                {
-                    "text": ev["text"][:300] + "..." if len(ev["text"]) > 300 else ev["text"],
-                    "path": ev.get("path", ""),
-                    "filename": ev.get("filename", ""),
-                    "score": round(ev.get("score", 0.0), 4),
-                    "vector_score": round(ev.get("vector_score", 0.0), 4),
-                    "bm25_score": round(ev.get("bm25_score", 0.0), 4),
-                    "rerank_score": round(ev.get("rerank_score", 0.0), 4) if ev.get("rerank_score") else None,
-                }
-                for ev in evidences
-            ],
-            "index_status": index_status,
+            "evidences": _format_evidences(evidences),
             "search_metadata": {
                 "total_results": len(evidences),
-                "vector_weight": request.vector_weight or 0.5,
-                "reranking_used": request.use_reranking if request.use_reranking is not None else True
+                "vector_weight": vector_weight,
+                "reranking_used": use_reranking,
+                "adaptive_depth": adaptive_depth,
+                "evidence_reused": reuse_evidence
             },
             "status": "success"
         }
         
+        # Only cache real answers, not dummy/error fallbacks from a transient provider failure
+        if cache is not None and response.get("provider") not in ("dummy", "error"):
+            cache.put(request.query, cache_params, index_version, result, query_embedding=query_embedding)
+        
+        return {
+            **_session_fields(session),
+            "query": request.query,
+            **result,
+            "index_status": index_status,
+            "search_metadata": _stage_metadata(
+                {**result["search_metadata"], "cache": "miss" if cache is not None else "disabled"}, timer, trace
+            ),
+        }
+        
     except HTTPException:
         raise
+    except ExecutorBusyError as e:
+        raise _busy_error(e)
     except Exception as e:
         logger.error(f"Error processing chat request: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}")
 
+@router.post("/stream")
+async def chat_stream(request: ChatRequest) -> StreamingResponse:
+    """
+    Streaming variant of the chat endpoint (Server-Sent Events)
+    
+    Retrieval runs before the stream opens so index and capacity errors still
+    map to HTTP status codes. The stream then emits an `evidences` event, one
+    `token` event per generated text delta, and a final `done` event with the
+    search metadata (or an `error` event if generation fails mid-stream).
+    
+    Args:
+        request: Chat request with query and optional parameters
+        
+    Returns:
+        text/event-stream response
+    """
+    try:
+        if not request.query or len(request.query.strip()) == 0:
+            raise HTTPException(status_code=400, detail="Query cannot be empty")
+        
+        timer = StageTimer("stream")
+        trace = start_trace() if request.debug else None
+        
+        with timer.stage("index"):
+            index_status = await _ready_index()
+        top_k, use_reranking, vector_weight, adaptive_depth = _resolve_params(request)
+        session = _open_session(request)
+        reuse_evidence = bool(session is not None and request.reuse_evidence and session.evidences)
+        
+        cache = get_query_cache() if session is None else None
+        cache_params = (top_k, use_reranking, vector_weight, adaptive_depth)
+        index_version = get_index_version()
+        with timer.stage("cache_lookup"):
+            cached, cache_level, query_embedding = await _lookup_cache(cache, request.query, cache_params, index_version)
+        
+        evidences = []
+        warmup = None
+        if cached is None:
+            # Cache miss: open the LLM connection while retrieval runs
+            warmup = start_warmup(get_generation_backend())
+        if reuse_evidence:
+            evidences = session.evidences
+        elif cached is None:
+            with timer.stage("retrieve"):
+                evidences = await retrieve_async(
+                    query=request.query,
+                    top_k=top_k,
+                    use_reranking=use_reranking,
+                    vector_weight=vector_weight,
+                    query_embedding=query_embedding,
+                    adaptive=adaptive_depth
+                )
+            if session is not None:
+                session.set_evidences(evidences)
+    except HTTPException:
+        raise
+    except ExecutorBusyError as e:
+        raise _busy_error(e)
+    except Exception as e:
+        logger.error(f"Error processing chat stream request: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}")
+    
+    search_metadata = {
+        "total_results": len(evidences),
+        "vector_weight": vector_weight,
+        "reranking_used": use_reranking,
+        "adaptive_depth": adaptive_depth,
+        "evidence_reused": reuse_evidence
+    }
+    
+    async def events() -> AsyncIterator[str]:
+        if cached is not None:
+            # Replay the cached answer as a single token
+            yield _sse("evidences", {"query": request.query, "evidences": cached["evidences"], "index_status": index_status})
+            yield _sse("token", {"text": cached["answer"]})
+            yield _sse("done", {
+                "status": cached["status"],
+                "search_metadata": _stage_metadata({**cached["search_metadata"], "cache": cache_level}, timer, trace)
+            })
+            return
+        
+        formatted = _format_evidences(evidences)
+        yield _sse("evidences", {
+            **_session_fields(session), "query": request.query, "evidences": formatted, "index_status": index_status
+        })
+        
+        if not evidences:
+            yield _sse("token", {"text": "No relevant documents found for your query. Please try rephrasing or ensure documents are indexed."})
+            yield _sse("done", {"status": "no_results", "search_metadata": _stage_metadata(search_metadata, timer, trace)})
+            return
+        
+        await finish_warmup(warmup, timer)
+        generate_start = time.perf_counter()
+        parts = []
+        async for event in draft_reply_stream(request.query, evidences, **_conversation_args(session)):
+            if event["type"] == "token":
+                if not parts:
+                    timer.record("first_token", (time.perf_counter() - generate_start) * 1000.0)
+                parts.append(event["text"])
+                yield _sse("token", {"text": event["text"]})
+            elif event["type"] == "error":
+                yield _sse("error", {"message": event["message"]})
+                return
+            elif event["type"] == "done":
+                # Only cache real answers, not dummy/error fallbacks from a transient provider failure
+                if cache is not None and event.get("provider") not in ("dummy", "error"):
+                    cache.put(request.query, cache_params, index_version, {
+                        "answer": "".join(parts),
+                        "evidences": formatted,
+                        "search_metadata": search_metadata,
+                        "status": "success"
+                    }, query_embedding=query_embedding)
+                timer.record("generate", (time.perf_counter() - generate_start) * 1000.0)
+                yield _sse("done", {
+                    **_session_fields(session),
+                    "status": "success",
+                    "provider": event.get("provider"),
+                    "search_metadata": _stage_metadata(
+                        {**search_metadata, "cache": "miss" if cache is not None else "disabled"}, timer, trace
+                    )
+                })
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/batch")
+async def chat_batch(request: BatchChatRequest) -> StreamingResponse:
+    """
+    Answer many questions in one job, streamed as NDJSON
+    
+    All questions are retrieved together (one embedding pass, one vector store
+    query, one re-ranking call). Each distinct evidence chunk is sent once as an
+    `evidence` line; `answer` lines reference chunks by ID and arrive in
+    completion order as the bounded-concurrency LLM calls finish. A final
+    `summary` line reports counts and timings.
+    
+    Args:
+        request: Questions and retrieval options
+        
+    Returns:
+        application/x-ndjson response
+    """
+    max_queries = int(os.getenv("CHAT_BATCH_MAX_QUERIES", "500"))
+    if not request.queries:
+        raise HTTPException(status_code=400, detail="Queries cannot be empty")
+    if len(request.queries) > max_queries:
+        raise HTTPException(status_code=400, detail=f"Too many queries (max {max_queries})")
+    
+    try:
+        timer = StageTimer("batch")
+        with timer.stage("index"):
+            await _ready_index()
+        # Open the LLM connection while retrieval runs
+        warmup = start_warmup(get_generation_backend())
+        top_k, use_reranking, vector_weight, adaptive_depth = _resolve_params(request)
+        
+        valid = [i for i, query in enumerate(request.queries) if query and query.strip()]
+        with timer.stage("retrieve"):
+            retrieved = await get_retrieval_executor().run(
+                retrieve_batch,
+                [request.queries[i] for i in valid],
+                top_k,
+                use_reranking,
+                vector_weight,
+                adaptive_depth
+            )
+    except HTTPException:
+        raise
+    except ExecutorBusyError as e:
+        raise _busy_error(e)
+    except Exception as e:
+        logger.error(f"Error processing chat batch request: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error processing chat batch request: {str(e)}")
+    
+    evidences_by_index = dict(zip(valid, retrieved))
+    concurrency = request.max_concurrency or int(os.getenv("CHAT_BATCH_LLM_CONCURRENCY", "4"))
+    
+    def _line(data: Dict[str, Any]) -> str:
+        return json.dumps(data, ensure_ascii=False) + "\n"
+    
+    async def lines() -> AsyncIterator[str]:
+        # Evidence shared between questions is sent once
+        seen = set()
+        for evidences in retrieved:
+            for ev, formatted in zip(evidences, _format_evidences(evidences)):
+                if ev["doc_id"] not in seen:
+                    seen.add(ev["doc_id"])
+                    yield _line({"type": "evidence", "id": ev["doc_id"], **formatted})
+        
+        await finish_warmup(warmup, timer)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def answer(index: int) -> Dict[str, Any]:
+            query = request.queries[index]
+            evidences = evidences_by_index.get(index)
+            base = {"type": "answer", "index": index, "query": query}
+            if evidences is None:
+                return {**base, "status": "error", "answer": None, "error": "Query cannot be empty"}
+            ids = [ev["doc_id"] for ev in evidences]
+            if not evidences:
+                return {**base, "status": "no_results", "answer": None, "evidence_ids": []}
+            async with semaphore:
+                response = await draft_reply(query, evidences)
+            return {
+                **base,
+                "status": "success",
+                "answer": response["answer"],
+                "provider": response.get("provider"),
+                "evidence_ids": ids,
+            }
+        
+        tasks = [asyncio.create_task(answer(i)) for i in range(len(request.queries))]
+        counts: Dict[str, int] = {}
+        generate_start = time.perf_counter()
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                counts[result["status"]] = counts.get(result["status"], 0) + 1
+                yield _line(result)
+        finally:
+            # Client went away: don't keep generating answers nobody will read
+            for task in tasks:
+                task.cancel()
+        timer.record("generate", (time.perf_counter() - generate_start) * 1000.0)
+        
+        yield _line({
+            "type": "summary",
+            "total": len(request.queries),
+            "unique_evidence": len(seen),
+            "statuses": counts,
+            "llm_concurrency": concurrency,
+            "timings_ms": timer.as_dict(),
+        })
+    
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/index-status")
 async def get_index_status() -> Dict[str, Any]:
     """
@@ -154,7 +567,7 @@ async def get_index_status() -> Dict[str, Any]:
         Index status and statistics
     """
     try:
-        status = ensure_index()
+        status = await run_in_threadpool(ensure_index)
         return status
     except Exception as e:
         logger.error(f"Error getting index status: {e}", exc_info=True)
@@ -175,8 +588,84 @@ async def rebuild_index(reset: bool = Query(False)) -> Dict[str, Any]:
         Index build status
     """
     try:
-        status = ensure_index(reset=reset)
+        _index_monitor.invalidate()
+        status = await run_in_threadpool(ensure_index, reset=reset)
         return status
     except Exception as e:
         logger.error(f"Error rebuilding index: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error rebuilding index: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error rebuilding index: {str(e)}")
+
+@router.get("/retrieval-stats")
+async def get_retrieval_stats() -> Dict[str, Any]:
+    """
+    Get retrieval executor and planner statistics
+    
+    Returns:
+        Executor queue depth and counters, adaptive planner decision counts,
+        and index status cache counters
+    """
+    return {
+        "executor": get_retrieval_executor().stats(),
+        "planner": get_retrieval_planner().stats(),
+        "index_status": _index_monitor.stats()
+    }
+
+@router.get("/cache-stats")
+async def get_cache_stats() -> Dict[str, Any]:
+    """
+    Get query cache and LLM response cache statistics
+    
+    Returns:
+        Hit/miss counters, hit rate, and cache size for the query cache,
+        plus per-tier counters for the response cache under "response_cache"
+    """
+    cache = get_query_cache()
+    response_cache = get_response_cache()
+    stats = cache.stats() if cache is not None else {"status": "disabled"}
+    stats["response_cache"] = response_cache.stats() if response_cache is not None else {"status": "disabled"}
+    return stats
+
+@router.get("/llm-stats")
+async def get_llm_stats() -> Dict[str, Any]:
+    """
+    Get LLM client connection pool and gateway statistics
+    
+    Returns:
+        Pool limits, open/idle connections, request/connection reuse counters,
+        gateway circuit state with retry/throttle/shed counters, the active
+        generation backend, and local model queue/throughput stats
+    """
+    deepseek = get_deepseek_service()
+    return {
+        **deepseek.pool_stats(),
+        "gateway": deepseek.gateway.stats(),
+        "backend": get_generation_backend().provider,
+        "local": get_local_llm_service().stats(),
+    }
+
+@router.get("/sessions/stats")
+async def get_session_stats() -> Dict[str, Any]:
+    """
+    Get conversation memory statistics
+    
+    Returns:
+        Live session count, limits, and created/resumed/expired/evicted counters
+    """
+    store = get_conversation_store()
+    return store.stats() if store is not None else {"status": "disabled"}
+
+@router.delete("/sessions/{session_id}")
+async def delete_session(session_id: str) -> Dict[str, Any]:
+    """
+    End a conversation and drop its memory
+    
+    Args:
+        session_id: Session ID used in chat requests
+        
+    Returns:
+        Whether the session existed
+    """
+    store = get_conversation_store()
+    if store is None or not store.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Session not found: {session_id}")
+    return {"session_id": session_id, "status": "deleted"}
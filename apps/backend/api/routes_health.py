@@ -1,11 +1,36 @@
 """
-Health check endpoints
+Health check and metrics endpoints
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
+from fastapi.responses import PlainTextResponse
+
+from ..services.core.executor import inference_stats
+from ..services.core.metrics import get_metrics_registry
 
 router = APIRouter()
 
 @router.get("/healthz")
 async def health_check():
     """Health check endpoint"""
-    return {"ok": True}
\ No newline at end of file
+    return {"ok": True}
+
+@router.get("/metrics")
+async def metrics(format: str = Query("prometheus", pattern="^(prometheus|json)$")):
+    """
+    Stage latency histograms
+    
+    Args:
+        format: "prometheus" (text exposition format) or "json" (p50/p95/p99 summary)
+    
+    Returns:
+        Metrics for every chat and RAG pipeline stage observed so far
+    """
+    registry = get_metrics_registry()
+    if format == "json":
+        return registry.snapshot()
+    return PlainTextResponse(registry.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@router.get("/executors")
+async def executors():
+    """Queue depth and rejection counts of the per-model inference pools"""
+    return inference_stats()
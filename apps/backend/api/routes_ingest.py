@@ -2,14 +2,28 @@
 File ingestion endpoints for multimodal processing
 Now using real AI models (Whisper, Tesseract OCR, Vision models)
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from typing import Dict, Any
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import json
 import logging
+import os
+import uuid
 
-from ..services.core.audio_stt import transcribe
+import numpy as np
+
+from ..services.core.audio_decode import SAMPLE_RATE, SCIPY_AVAILABLE, decode_audio, duration_seconds, resample
+from ..services.core.audio_stt import transcribe, get_whisper_service, stt_cache_params
+from ..services.core.audio_vad import EnergyVADSegmenter, SpeechSegment
+from ..services.core.executor import ExecutorBusyError, LANE_BATCH, LANE_INTERACTIVE, get_inference_executor
+from ..services.core.job_queue import JOB_DONE, JOB_FAILED, JobWorkerPool, get_job_queue
 from ..services.core.audio_emotion import predict_emotion_from_wav
-from ..services.core.image_ocr import run_ocr
+from ..services.core.image_ocr import ocr_cache_params, run_ocr
+from ..services.core.ingest_cache import content_digest, get_ingest_cache
 from ..services.ai import VisionService
+from ..services.ai.ocr_preprocess import PreprocessOptions
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -33,6 +47,192 @@ def get_vision_service() -> VisionService:
             logger.warning(f"Failed to initialize vision service: {e}")
     return _vision_service
 
+def _busy_error(e: ExecutorBusyError) -> HTTPException:
+    """Map a saturated inference pool to 503 with Retry-After"""
+    logger.warning(f"Ingest request rejected: {e}")
+    return HTTPException(
+        status_code=503,
+        detail=f"The {e.name} model is at capacity. Please retry shortly.",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+# Raw PCM sample formats accepted by /stream-audio
+STREAM_FORMATS = {
+    "pcm_s16le": ("<i2", 32768.0),
+    "f32le": ("<f4", 1.0),
+}
+
+def _stream_segmenter(sample_rate: int) -> EnergyVADSegmenter:
+    """Create a VAD segmenter configured from the environment"""
+    return EnergyVADSegmenter(
+        sample_rate=sample_rate,
+        min_rms=float(os.getenv("STT_VAD_ENERGY_THRESHOLD", "0.01")),
+        min_silence_ms=int(os.getenv("STT_STREAM_MIN_SILENCE_MS", "600")),
+        max_segment_s=float(os.getenv("STT_STREAM_MAX_SEGMENT_S", "30"))
+    )
+
+def _pcm_frame_to_float(frame: bytes, sample_format: str, carry: bytes) -> Tuple[np.ndarray, bytes]:
+    """
+    Convert a binary WebSocket frame to float32 samples
+
+    Frames may split a sample across messages; the incomplete tail is carried over.
+    """
+    dtype, scale = STREAM_FORMATS[sample_format]
+    data = carry + frame
+    width = np.dtype(dtype).itemsize
+    usable = len(data) - len(data) % width
+    samples = np.frombuffer(data[:usable], dtype=dtype).astype(np.float32)
+    if scale != 1.0:
+        samples /= scale
+    return samples, data[usable:]
+
+def _is_end_message(text: str) -> bool:
+    """Whether a text WebSocket message ends the audio stream"""
+    try:
+        message = json.loads(text)
+    except ValueError:
+        return text.strip() == "end"
+    return isinstance(message, dict) and message.get("type") == "end"
+
+def _transcribe_segment(segment: SpeechSegment, sample_rate: int, language: Optional[str]) -> Dict[str, Any]:
+    """Transcribe one speech segment, with timestamps relative to the stream start"""
+    samples = segment.samples
+    if sample_rate != SAMPLE_RATE:
+        samples = resample(samples, sample_rate, SAMPLE_RATE)
+    result = get_whisper_service().transcribe(samples, audio_format="pcm", language=language)
+    return {
+        "type": "partial",
+        "segment": segment.index,
+        "start": round(segment.start, 2),
+        "end": round(segment.end, 2),
+        "text": result.get("text", ""),
+        "language": result.get("language", "unknown"),
+        "segments": [
+            {
+                "start": round(segment.start + s["start"], 2),
+                "end": round(segment.start + s["end"], 2),
+                "text": s["text"]
+            }
+            for s in result.get("segments", [])
+        ],
+        **({"error": result["error"]} if result.get("error") else {}),
+    }
+
+async def process_audio(audio_bytes: bytes, filename: Optional[str], lane: str = LANE_INTERACTIVE) -> Dict[str, Any]:
+    """
+    Run STT and emotion analysis on an audio file
+
+    Args:
+        audio_bytes: Encoded audio
+        filename: Original file name (echoed in the result)
+        lane: Inference pool priority lane
+
+    Returns:
+        Dict with STT text and emotion analysis results
+
+    Raises:
+        ValueError: If the audio cannot be decoded
+        ExecutorBusyError: If the STT pool is full
+    """
+    # Identical uploads (same bytes and STT model) are answered from the ingest cache
+    cache = get_ingest_cache()
+    if cache is not None:
+        digest = await run_in_threadpool(content_digest, audio_bytes)
+        params = stt_cache_params()
+        cached = await run_in_threadpool(cache.get, "audio", digest, params)
+        if cached is not None:
+            return dict(cached, filename=filename, cached=True)
+    
+    # Decode once in memory; STT and emotion analysis share the samples
+    samples = await run_in_threadpool(decode_audio, audio_bytes)
+    
+    # Process with STT (now using Whisper) on the STT inference pool
+    stt_result = await transcribe(samples, lane=lane)
+    
+    # Process with emotion analysis (if available)
+    emotion_result = await predict_emotion_from_wav(samples)
+    
+    response = {
+        "filename": filename,
+        "duration_s": round(duration_seconds(samples), 2),
+        "stt": stt_result,
+        "emotion": emotion_result,
+        "status": "success"
+    }
+    if cache is not None and not stt_result.get("error"):
+        await run_in_threadpool(cache.set, "audio", digest, params, response)
+    return response
+
+async def process_image(
+    image_bytes: bytes,
+    filename: Optional[str],
+    lane: str = LANE_INTERACTIVE,
+    preprocess: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Run OCR and optional vision analysis on an image
+
+    Multi-page TIFFs and PDFs are OCR'd page by page (vision analysis is skipped for them).
+    OCR and vision results are cached separately on the image bytes, so a changed
+    OCR setting does not trigger a new (paid) vision call.
+
+    Args:
+        image_bytes: Image, multi-page TIFF or PDF file bytes
+        filename: Original file name (echoed in the result)
+        lane: Inference pool priority lane
+        preprocess: OCR preprocessing preset or step list (None = OCR_PREPROCESS default)
+
+    Returns:
+        Dict with OCR text extraction and vision analysis results
+
+    Raises:
+        ExecutorBusyError: If the OCR pool is full
+    """
+    cache = get_ingest_cache()
+    digest = await run_in_threadpool(content_digest, image_bytes) if cache is not None else None
+    
+    # Process with OCR (now using Tesseract) on the OCR inference pool, unless cached
+    ocr_params = ocr_cache_params(preprocess)
+    ocr_result = await run_in_threadpool(cache.get, "ocr", digest, ocr_params) if cache is not None else None
+    if ocr_result is not None:
+        ocr_result["cached"] = True
+    else:
+        ocr_result = await run_ocr(image_bytes, lane=lane, preprocess=preprocess)
+        if cache is not None:
+            await run_in_threadpool(cache.set, "ocr", digest, ocr_params, ocr_result)
+    
+    # Optional: Process with vision model (if available)
+    vision_result = None
+    vision_service = get_vision_service()
+    if vision_service and "pages" not in ocr_result:
+        vision_params = vision_service.cache_params()
+        vision_result = await run_in_threadpool(cache.get, "vision", digest, vision_params) if cache is not None else None
+        if vision_result is not None:
+            vision_result["cached"] = True
+        else:
+            try:
+                # Resize/re-encode on the vision pool, then call the provider's async client
+                prepared = await get_inference_executor("vision").run_in_lane(lane, vision_service.prepare, image_bytes)
+                vision_result = await vision_service.describe_image_async(image_bytes, prepared=prepared)
+            except ExecutorBusyError as e:
+                # Vision is best-effort; OCR alone still answers the upload
+                logger.warning(f"Vision analysis skipped: {e}")
+            except Exception as e:
+                logger.warning(f"Vision analysis failed: {e}")
+            if vision_result and cache is not None:
+                await run_in_threadpool(cache.set, "vision", digest, vision_params, vision_result)
+    
+    response = {
+        "filename": filename,
+        "ocr": ocr_result,
+        "status": "success"
+    }
+    
+    if vision_result:
+        response["vision"] = vision_result
+    
+    return response
+
 @router.post("/upload-audio")
 async def upload_audio(file: UploadFile = File(...)) -> Dict[str, Any]:
     """
@@ -52,65 +252,280 @@ async def upload_audio(file: UploadFile = File(...)) -> Dict[str, Any]:
         
         logger.info(f"Processing audio file: {file.filename} ({len(audio_bytes)} bytes)")
         
-        # Process with STT (now using Whisper)
-        stt_result = await transcribe(audio_bytes)
-        
-        # Process with emotion analysis (if available)
-        emotion_result = await predict_emotion_from_wav(audio_bytes)
-        
-        return {
-            "filename": file.filename,
-            "stt": stt_result,
-            "emotion": emotion_result,
-            "status": "success"
-        }
+        try:
+            return await process_audio(audio_bytes, file.filename)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Could not decode audio: {str(e)}")
         
+    except ExecutorBusyError as e:
+        raise _busy_error(e)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing audio: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing audio: {str(e)}")
 
 @router.post("/upload-image")
-async def upload_image(file: UploadFile = File(...)) -> Dict[str, Any]:
+async def upload_image(
+    file: UploadFile = File(...),
+    preprocess: Optional[str] = Query(
+        None, description="OCR preprocessing: none, default, full, or steps from downscale,grayscale,deskew,threshold"
+    )
+) -> Dict[str, Any]:
     """
     Upload and process image file for OCR and vision analysis
     Uses Tesseract OCR for text extraction and optional vision models for understanding
+    Multi-page TIFF scans and scanned PDFs return per-page results under "ocr.pages"
     
     Returns:
         Dict with OCR text extraction and vision analysis results
     """
     try:
         # Validate file type
-        if not file.content_type or not file.content_type.startswith('image/'):
-            raise HTTPException(status_code=400, detail="File must be an image file")
+        if not file.content_type or not file.content_type.startswith(('image/', 'application/pdf')):
+            raise HTTPException(status_code=400, detail="File must be an image or PDF file")
+        try:
+            PreprocessOptions.parse(preprocess)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         # Read file bytes
         image_bytes = await file.read()
         
         logger.info(f"Processing image file: {file.filename} ({len(image_bytes)} bytes)")
         
-        # Process with OCR (now using Tesseract)
-        ocr_result = await run_ocr(image_bytes)
-        
-        # Optional: Process with vision model (if available)
-        vision_result = None
-        vision_service = get_vision_service()
-        if vision_service:
-            try:
-                vision_result = vision_service.describe_image(image_bytes)
-            except Exception as e:
-                logger.warning(f"Vision analysis failed: {e}")
-        
-        response = {
-            "filename": file.filename,
-            "ocr": ocr_result,
-            "status": "success"
-        }
-        
-        if vision_result:
-            response["vision"] = vision_result
-        
-        return response
+        return await process_image(image_bytes, file.filename, preprocess=preprocess)
         
+    except ExecutorBusyError as e:
+        raise _busy_error(e)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing image: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
+
+# Job kind -> content type prefixes accepted for it (scanned PDFs go through OCR)
+JOB_KINDS = {"audio": ("audio/",), "image": ("image/", "application/pdf")}
+
+_job_workers: Optional[JobWorkerPool] = None
+
+async def _audio_job(data: bytes, job: Dict[str, Any]) -> Dict[str, Any]:
+    return await process_audio(data, job["filename"], lane=LANE_BATCH)
+
+async def _image_job(data: bytes, job: Dict[str, Any]) -> Dict[str, Any]:
+    return await process_image(data, job["filename"], lane=LANE_BATCH)
+
+def get_job_workers() -> JobWorkerPool:
+    """Get or create the ingest job worker pool (started by the app lifespan)"""
+    global _job_workers
+    if _job_workers is None:
+        _job_workers = JobWorkerPool(
+            get_job_queue(),
+            handlers={"audio": _audio_job, "image": _image_job},
+            workers=int(os.getenv("JOB_WORKERS", "2"))
+        )
+    return _job_workers
+
+def _job_kind(file: UploadFile) -> str:
+    """Infer the job kind from the upload content type"""
+    for kind, prefixes in JOB_KINDS.items():
+        if file.content_type and file.content_type.startswith(prefixes):
+            return kind
+    raise HTTPException(status_code=400, detail=f"Unsupported file type for {file.filename}: {file.content_type}")
+
+def _job_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a job row (without the result payload)"""
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "filename": job["filename"],
+        "batch_id": job["batch_id"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "error": job["error"],
+    }
+
+@router.post("/jobs", status_code=202)
+async def submit_job(file: UploadFile = File(...)) -> Dict[str, Any]:
+    """
+    Queue an audio or image file for background processing
+
+    Returns:
+        Dict with the job ID; poll /jobs/{job_id} and fetch /jobs/{job_id}/result
+    """
+    kind = _job_kind(file)
+    data = await file.read()
+    job_id = await run_in_threadpool(get_job_queue().submit, kind, data, file.filename, file.content_type)
+    get_job_workers().notify()
+    return {"job_id": job_id, "kind": kind, "status": "queued"}
+
+@router.post("/jobs/batch", status_code=202)
+async def submit_job_batch(files: List[UploadFile] = File(...)) -> Dict[str, Any]:
+    """
+    Queue many files at once (e.g. a stack of scanned pages)
+
+    Returns:
+        Dict with a batch ID and one job ID per file, in upload order
+    """
+    kinds = [_job_kind(file) for file in files]  # Reject the whole batch before queueing any of it
+    batch_id = uuid.uuid4().hex
+    job_queue = get_job_queue()
+    jobs = []
+    for file, kind in zip(files, kinds):
+        data = await file.read()
+        job_id = await run_in_threadpool(job_queue.submit, kind, data, file.filename, file.content_type, batch_id)
+        jobs.append({"job_id": job_id, "kind": kind, "filename": file.filename})
+    get_job_workers().notify()
+    return {"batch_id": batch_id, "jobs": jobs, "status": "queued"}
+
+@router.get("/jobs/batch/{batch_id}")
+async def get_job_batch(batch_id: str) -> Dict[str, Any]:
+    """Status of every job in a batch, with per-status counts"""
+    jobs = await run_in_threadpool(get_job_queue().batch, batch_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    counts: Dict[str, int] = {}
+    for job in jobs:
+        counts[job["status"]] = counts.get(job["status"], 0) + 1
+    return {"batch_id": batch_id, "counts": counts, "jobs": [_job_status(job) for job in jobs]}
+
+@router.get("/cache/stats")
+async def get_ingest_cache_stats() -> Dict[str, Any]:
+    """Ingest result cache usage and per-kind hit rates"""
+    cache = get_ingest_cache()
+    return await run_in_threadpool(cache.stats) if cache is not None else {"status": "disabled"}
+
+@router.get("/jobs/stats")
+async def get_job_stats() -> Dict[str, int]:
+    """Job counts per status"""
+    return await run_in_threadpool(get_job_queue().stats)
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> Dict[str, Any]:
+    """Job status"""
+    job = await run_in_threadpool(get_job_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_status(job)
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Job result
+
+    Returns:
+        The processing result once done; 202 with the status while queued or running
+    """
+    job = await run_in_threadpool(get_job_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == JOB_FAILED:
+        raise HTTPException(status_code=500, detail=f"Job failed: {job['error']}")
+    if job["status"] != JOB_DONE:
+        return JSONResponse(status_code=202, content=_job_status(job))
+    return {"job_id": job_id, "status": job["status"], "result": job["result"]}
+
+@router.websocket("/stream-audio")
+async def stream_audio(
+    websocket: WebSocket,
+    sample_rate: int = SAMPLE_RATE,
+    format: str = "pcm_s16le",
+    language: Optional[str] = None
+):
+    """
+    Streaming transcription for long recordings
+
+    The client sends raw mono PCM as binary messages (`format` = pcm_s16le or
+    f32le at `sample_rate`) and a text message `{"type": "end"}` when done.
+    Audio is split into speech segments at pauses; each segment is transcribed
+    as soon as it completes and pushed back as a `partial` message, so latency
+    is bounded per segment instead of per file. A `final` message with the full
+    transcript closes the stream.
+
+    Messages sent:
+        {"type": "ready", ...}, {"type": "partial", ...}, {"type": "final", ...}, {"type": "error", "detail": ...}
+    """
+    await websocket.accept()
+    if format not in STREAM_FORMATS or not 8000 <= sample_rate <= 48000 or (sample_rate != SAMPLE_RATE and not SCIPY_AVAILABLE):
+        await websocket.send_json({"type": "error", "detail": f"Unsupported stream format: {format} @ {sample_rate} Hz"})
+        await websocket.close(code=1003)
+        return
+
+    segmenter = _stream_segmenter(sample_rate)
+    stt_pool = get_inference_executor("stt")
+    max_seconds = float(os.getenv("STT_STREAM_MAX_SECONDS", "0"))
+    # Bounded so a client sending faster than Whisper keeps up is throttled by backpressure
+    pending: asyncio.Queue = asyncio.Queue(maxsize=int(os.getenv("STT_STREAM_MAX_PENDING", "4")))
+    partials: List[Dict[str, Any]] = []
+
+    async def transcribe_segments():
+        detected = language
+        while True:
+            segment = await pending.get()
+            if segment is None:
+                return
+            partial = await stt_pool.run(_transcribe_segment, segment, sample_rate, detected)
+            if detected is None and partial["text"] and partial["language"] != "unknown":
+                # Lock the language after the first detection so short segments don't flip it
+                detected = partial["language"]
+            partials.append(partial)
+            await websocket.send_json(partial)
+
+    worker = asyncio.create_task(transcribe_segments())
+
+    async def enqueue(segment: Optional[SpeechSegment]):
+        put = asyncio.ensure_future(pending.put(segment))
+        await asyncio.wait({put, worker}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            # The transcription task failed; surface its error instead of blocking
+            put.cancel()
+            await worker
+    await websocket.send_json({"type": "ready", "sample_rate": sample_rate, "format": format})
+
+    carry = b""
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes") is not None:
+                samples, carry = _pcm_frame_to_float(message["bytes"], format, carry)
+                for segment in segmenter.push(samples):
+                    await enqueue(segment)
+                if max_seconds and segmenter.duration > max_seconds:
+                    await websocket.send_json({"type": "error", "detail": f"Stream exceeds {max_seconds:g} s limit"})
+                    break
+            elif message.get("text") is not None and _is_end_message(message["text"]):
+                break
+
+        for segment in segmenter.flush():
+            await enqueue(segment)
+        await enqueue(None)
+        await worker
+
+        await websocket.send_json({
+            "type": "final",
+            "text": " ".join(p["text"] for p in partials if p["text"]),
+            "segments": [s for p in partials for s in p["segments"]],
+            "duration_s": round(segmenter.duration, 2),
+        })
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        logger.info("Audio stream disconnected by client")
+        worker.cancel()
+    except ExecutorBusyError as e:
+        logger.warning(f"Audio stream rejected: {e}")
+        await websocket.send_json({"type": "error", "detail": str(e), "retry_after": e.retry_after})
+        await websocket.close(code=1013)  # Try again later
+    except Exception as e:
+        logger.error(f"Error streaming audio: {e}", exc_info=True)
+        worker.cancel()
+        try:
+            await websocket.send_json({"type": "error", "detail": f"Error processing audio: {str(e)}"})
+            await websocket.close(code=1011)
+        except Exception:
+            pass
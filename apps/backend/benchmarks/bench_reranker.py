@@ -0,0 +1,129 @@
+"""
+Reranker latency benchmark
+Compares the PyTorch (sentence-transformers) cross-encoder with the ONNX Runtime backend
+
+Usage:
+    python -m apps.backend.benchmarks.bench_reranker --candidates 10 --runs 50 --threads 4
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+DEFAULT_QUERY = "what is the max spindle temperature for machine 3"
+
+def make_candidates(n: int, words_per_doc: int = 90) -> List[str]:
+    """Build deterministic pseudo-document chunks roughly the size of an indexed chunk"""
+    vocab = (
+        "spindle temperature coolant pressure alarm reset procedure motor speed limit "
+        "degrees celsius bar rpm check manual maintenance interval lubrication axis "
+        "servo encoder fault operator shift handover inspection vibration bearing"
+    ).split()
+    rng = np.random.default_rng(42)
+    return [" ".join(rng.choice(vocab, size=words_per_doc)) for _ in range(n)]
+
+def time_predict(
+    predict: Callable[[List[Tuple[str, str]]], Any],
+    pairs: List[Tuple[str, str]],
+    runs: int,
+    warmup: int = 3
+) -> Dict[str, float]:
+    """Time repeated predict calls and return latency percentiles in milliseconds"""
+    for _ in range(warmup):
+        predict(pairs)
+
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        predict(pairs)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+        "mean_ms": round(statistics.mean(latencies), 3),
+    }
+
+def run_benchmark(
+    model_name: str,
+    candidates: int,
+    runs: int,
+    threads: int,
+    backends: List[str]
+) -> Dict[str, Any]:
+    """
+    Run the reranker benchmark
+
+    Args:
+        model_name: Cross-encoder model name or path
+        candidates: Number of query-document pairs per rerank call
+        runs: Timed iterations per backend
+        threads: Thread count for torch / onnxruntime
+        backends: Subset of 'torch', 'onnx-fp32', 'onnx-int8'
+
+    Returns:
+        Dict with latency stats per backend and max score difference against torch
+    """
+    pairs = [(DEFAULT_QUERY, doc) for doc in make_candidates(candidates)]
+    results: Dict[str, Any] = {
+        "model": model_name,
+        "candidates": candidates,
+        "runs": runs,
+        "threads": threads,
+        "backends": {},
+    }
+
+    reference = None
+    if "torch" in backends:
+        import torch
+        from sentence_transformers import CrossEncoder
+
+        if threads:
+            torch.set_num_threads(threads)
+        model = CrossEncoder(model_name)
+        reference = np.asarray(model.predict(pairs))
+        results["backends"]["torch"] = time_predict(model.predict, pairs, runs)
+
+    from ..services.rag.onnx_reranker import OnnxCrossEncoder
+
+    for backend in ("onnx-fp32", "onnx-int8"):
+        if backend not in backends:
+            continue
+        model = OnnxCrossEncoder(model_name, quantize=backend == "onnx-int8", num_threads=threads or None)
+        stats = time_predict(model.predict, pairs, runs)
+        if reference is not None:
+            stats["max_abs_diff_vs_torch"] = float(np.max(np.abs(model.predict(pairs) - reference)))
+        results["backends"][backend] = stats
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cross-encoder reranker backends")
+    parser.add_argument("--model", default="cross-encoder/ms-marco-MiniLM-L-6-v2")
+    parser.add_argument("--candidates", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--threads", type=int, default=0, help="0 = library default")
+    parser.add_argument("--backends", default="torch,onnx-fp32,onnx-int8")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        args.model,
+        args.candidates,
+        args.runs,
+        args.threads,
+        [b.strip() for b in args.backends.split(",") if b.strip()]
+    )
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+if __name__ == "__main__":
+    main()
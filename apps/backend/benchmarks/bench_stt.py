@@ -0,0 +1,152 @@
+"""
+Speech-to-text real-time-factor benchmark
+Compares OpenAI Whisper (PyTorch) with faster-whisper (CTranslate2) backends
+
+RTF = processing time / audio duration (below 1.0 is faster than real time).
+
+Usage:
+    python -m apps.backend.benchmarks.bench_stt --audio sample1.wav sample2.mp3 --model base --threads 4
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ..services.core.audio_decode import SAMPLE_RATE, decode_audio, duration_seconds
+
+BACKENDS = ("openai", "faster-whisper-int8", "faster-whisper-int8-novad")
+
+def synthetic_audio(seconds: float = 30.0, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Alternating voiced-like tone bursts and silence
+
+    Measures decoder throughput and VAD skipping only; use real recordings for accuracy.
+    """
+    rng = np.random.default_rng(7)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    carrier = 0.3 * np.sin(2 * np.pi * 180 * t) * (1 + 0.5 * np.sin(2 * np.pi * 4 * t))
+    carrier += 0.02 * rng.standard_normal(len(t))
+    gate = (np.floor(t / 2.0) % 2 == 0).astype(np.float32)  # 2 s on, 2 s off
+    return (carrier * gate).astype(np.float32)
+
+def real_time_factor(processing_s: float, audio_s: float) -> float:
+    """Processing time per second of audio"""
+    return processing_s / audio_s if audio_s > 0 else 0.0
+
+def make_backend(name: str, model_size: str, threads: int):
+    """Instantiate a benchmark backend by name"""
+    from ..services.ai.whisper_service import FasterWhisperBackend, OpenAIWhisperBackend
+
+    if name == "openai":
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        return OpenAIWhisperBackend(model_size)
+    if name.startswith("faster-whisper"):
+        return FasterWhisperBackend(
+            model_size,
+            compute_type="int8",
+            cpu_threads=threads,
+            vad_filter=not name.endswith("novad")
+        )
+    raise ValueError(f"Unknown backend: {name}")
+
+def run_benchmark(
+    clips: Dict[str, np.ndarray],
+    model_size: str,
+    backends: List[str],
+    runs: int,
+    threads: int,
+    factory: Optional[Callable[[str, str, int], Any]] = None
+) -> Dict[str, Any]:
+    """
+    Run the STT benchmark
+
+    Args:
+        clips: Clip name -> decoded 16 kHz samples
+        model_size: Whisper model size
+        backends: Subset of BACKENDS
+        runs: Timed transcriptions per clip and backend (after one warm-up)
+        threads: CPU threads (0 = library default)
+        factory: Backend constructor (defaults to make_backend)
+
+    Returns:
+        Dict with per-backend RTF stats, load time and transcripts
+    """
+    factory = factory or make_backend
+    audio_s = sum(duration_seconds(samples) for samples in clips.values())
+    results: Dict[str, Any] = {
+        "model": model_size,
+        "threads": threads,
+        "runs": runs,
+        "clips": {name: round(duration_seconds(samples), 2) for name, samples in clips.items()},
+        "audio_s": round(audio_s, 2),
+        "backends": {},
+    }
+
+    for name in backends:
+        start = time.perf_counter()
+        try:
+            backend = factory(name, model_size, threads)
+        except ImportError as e:
+            results["backends"][name] = {"error": f"not installed: {e}"}
+            continue
+        load_s = time.perf_counter() - start
+
+        transcripts = {}
+        rtfs = []
+        for clip, samples in clips.items():
+            transcripts[clip] = backend.transcribe(samples)["text"].strip()  # warm-up
+        for _ in range(runs):
+            start = time.perf_counter()
+            for samples in clips.values():
+                backend.transcribe(samples)
+            rtfs.append(real_time_factor(time.perf_counter() - start, audio_s))
+
+        results["backends"][name] = {
+            "load_s": round(load_s, 2),
+            "rtf_mean": round(statistics.mean(rtfs), 4),
+            "rtf_min": round(min(rtfs), 4),
+            "x_real_time": round(1.0 / statistics.mean(rtfs), 2) if statistics.mean(rtfs) else None,
+            "transcripts": transcripts,
+        }
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark speech-to-text backends (real-time factor)")
+    parser.add_argument("--audio", nargs="*", default=[], help="Audio files (default: 30 s synthetic signal)")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0, help="0 = library default")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    if args.audio:
+        clips = {}
+        for path in args.audio:
+            with open(path, "rb") as f:
+                clips[path] = decode_audio(f.read())
+    else:
+        clips = {"synthetic-30s": synthetic_audio()}
+
+    results = run_benchmark(
+        clips,
+        args.model,
+        [b.strip() for b in args.backends.split(",") if b.strip()],
+        args.runs,
+        args.threads
+    )
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+if __name__ == "__main__":
+    main()
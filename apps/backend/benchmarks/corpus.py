@@ -0,0 +1,226 @@
+"""
+Synthetic corpus and labelled query set for RAG benchmarks
+Generates equipment-manual style documents (plain text and minimal PDFs) whose
+facts are unique per machine, plus questions whose relevant chunks are known.
+"""
+from pathlib import Path
+from typing import Any, Dict, List
+import json
+import random
+
+MACHINE_TYPES = ["lathe", "mill", "press", "grinder", "router", "drill"]
+
+FACT_TEMPLATES = [
+    (
+        "The maximum spindle temperature for machine {machine} is {value} degrees Celsius.",
+        "What is the max spindle temperature for machine {machine}?",
+    ),
+    (
+        "Coolant pressure on machine {machine} must stay between {low} and {value} bar during operation.",
+        "What coolant pressure range is allowed on machine {machine}?",
+    ),
+    (
+        "Alarm code E{code} on machine {machine} means the {part} encoder lost its reference position.",
+        "What does alarm E{code} mean on machine {machine}?",
+    ),
+    (
+        "Lubrication of the {part} axis on machine {machine} is required every {value} operating hours.",
+        "How often should the {part} axis on machine {machine} be lubricated?",
+    ),
+]
+
+FILLER_SENTENCES = [
+    "Operators must wear safety glasses when the enclosure door is open.",
+    "Record all readings in the shift handover log before leaving the station.",
+    "Check the hydraulic fluid level at the start of every shift.",
+    "Report unusual vibration or noise to the maintenance team immediately.",
+    "Keep the work area clear of chips and coolant spills.",
+    "Only trained personnel may change tooling or fixtures.",
+    "Verify the emergency stop function weekly and sign the inspection sheet.",
+    "Allow the machine to warm up for ten minutes before precision work.",
+]
+
+PARTS = ["X", "Y", "Z", "spindle", "turret", "feed"]
+
+def generate_corpus(
+    num_docs: int = 20,
+    facts_per_doc: int = 4,
+    filler_per_fact: int = 6,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Generate synthetic documents and labelled queries in memory
+
+    Args:
+        num_docs: Number of documents (one machine per document)
+        facts_per_doc: Number of query-able facts per document
+        filler_per_fact: Filler sentences placed around each fact
+        seed: Random seed for reproducibility
+
+    Returns:
+        Dict with 'documents' (filename, text) and 'queries' (query, filename, answer phrase)
+    """
+    rng = random.Random(seed)
+    documents = []
+    queries = []
+
+    for doc_idx in range(num_docs):
+        machine = f"{rng.choice(MACHINE_TYPES).upper()}-{100 + doc_idx}"
+        filename = f"manual_{machine.lower()}.pdf"
+        sentences = [f"Operating manual for machine {machine}."]
+
+        for template, question in rng.sample(FACT_TEMPLATES, k=min(facts_per_doc, len(FACT_TEMPLATES))):
+            values = {
+                "machine": machine,
+                "value": rng.randint(20, 400),
+                "low": rng.randint(1, 10),
+                "code": rng.randint(100, 999),
+                "part": rng.choice(PARTS),
+            }
+            fact = template.format(**values)
+            sentences.extend(rng.sample(FILLER_SENTENCES, k=filler_per_fact // 2))
+            sentences.append(fact)
+            sentences.extend(rng.sample(FILLER_SENTENCES, k=filler_per_fact - filler_per_fact // 2))
+            queries.append({
+                "query": question.format(**values),
+                "filename": filename,
+                "answer_phrase": fact,
+            })
+
+        documents.append({"filename": filename, "text": " ".join(sentences)})
+
+    return {"documents": documents, "queries": queries}
+
+def label_relevant_chunks(
+    queries: List[Dict[str, Any]],
+    chunk_ids: List[str],
+    chunk_texts: List[str],
+    chunk_filenames: List[str]
+) -> List[Dict[str, Any]]:
+    """
+    Attach relevant chunk IDs to each query
+
+    A chunk is relevant when it comes from the query's document and contains the
+    key part of the fact (the fact may be split across overlapping chunks).
+    Documents are matched on the file stem, since write_corpus may change the
+    extension (e.g. manual_x.pdf is written as manual_x.txt).
+
+    Args:
+        queries: Queries from generate_corpus
+        chunk_ids: Indexed chunk IDs
+        chunk_texts: Indexed chunk texts
+        chunk_filenames: Source filename of each chunk
+
+    Returns:
+        Queries with a 'relevant_ids' list (queries with no relevant chunk are dropped)
+    """
+    # PDF extraction re-wraps lines, so compare on normalized whitespace
+    normalized = [" ".join(text.split()) for text in chunk_texts]
+
+    chunk_stems = [Path(filename).stem for filename in chunk_filenames]
+
+    labelled = []
+    for query in queries:
+        stem = Path(query["filename"]).stem
+        # Either half of the fact is enough: overlapping chunks may split it
+        phrase = query["answer_phrase"]
+        half = max(20, len(phrase) // 2)
+        head, tail = phrase[:half], phrase[-half:]
+        relevant = [
+            chunk_id
+            for chunk_id, text, chunk_stem in zip(chunk_ids, normalized, chunk_stems)
+            if chunk_stem == stem and (head in text or tail in text)
+        ]
+        if relevant:
+            labelled.append({**query, "relevant_ids": relevant})
+    return labelled
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def write_simple_pdf(path: Path, text: str, chars_per_line: int = 90, lines_per_page: int = 50) -> None:
+    """
+    Write text into a minimal single-font PDF that pypdf can extract
+
+    Args:
+        path: Output file path
+        text: Text content
+        chars_per_line: Wrap width
+        lines_per_page: Lines per page
+    """
+    words = text.split()
+    lines, current = [], ""
+    for word in words:
+        if current and len(current) + 1 + len(word) > chars_per_line:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    font_id = 3
+    page_ids = []
+    next_id = 4
+    page_objects = []
+    for page_lines in pages:
+        stream = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(
+            f"({_pdf_escape(line)}) Tj T*" for line in page_lines
+        ) + " ET"
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        page_ids.append(page_id)
+        page_objects.append((content_id, f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"))
+        page_objects.append((
+            page_id,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ))
+
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    body = [
+        (1, "<< /Type /Catalog /Pages 2 0 R >>"),
+        (2, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"),
+        (font_id, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"),
+    ] + page_objects
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id, content in sorted(body):
+        offsets[obj_id] = len(out)
+        out += f"{obj_id} 0 obj\n{content}\nendobj\n".encode("latin-1")
+    xref_at = len(out)
+    out += f"xref\n0 {len(body) + 1}\n0000000000 65535 f \n".encode()
+    for obj_id in range(1, len(body) + 1):
+        out += f"{offsets[obj_id]:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(body) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+
+def write_corpus(corpus: Dict[str, Any], output_dir: str, fmt: str = "pdf") -> List[str]:
+    """
+    Write generated documents to disk
+
+    Args:
+        corpus: Output of generate_corpus
+        output_dir: Target directory
+        fmt: 'pdf' or 'txt'
+
+    Returns:
+        List of written file paths
+    """
+    root = Path(output_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for doc in corpus["documents"]:
+        if fmt == "pdf":
+            path = root / doc["filename"]
+            write_simple_pdf(path, doc["text"])
+        else:
+            path = root / Path(doc["filename"]).with_suffix(".txt").name
+            path.write_text(doc["text"], encoding="utf-8")
+        paths.append(str(path))
+
+    with open(root / "queries.json", "w") as f:
+        json.dump(corpus["queries"], f, indent=2)
+    return paths
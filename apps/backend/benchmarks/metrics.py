@@ -0,0 +1,74 @@
+"""
+Retrieval quality and latency metrics for RAG benchmarks
+"""
+from typing import Dict, Iterable, List, Sequence
+import math
+import statistics
+
+def recall_at_k(retrieved: Sequence[str], relevant: Iterable[str], k: int) -> float:
+    """Fraction of relevant items found in the top-k retrieved items"""
+    relevant = set(relevant)
+    if not relevant:
+        return 0.0
+    return len(relevant & set(retrieved[:k])) / len(relevant)
+
+def hit_at_k(retrieved: Sequence[str], relevant: Iterable[str], k: int) -> float:
+    """1.0 if any relevant item is in the top-k, else 0.0"""
+    relevant = set(relevant)
+    return 1.0 if relevant & set(retrieved[:k]) else 0.0
+
+def reciprocal_rank(retrieved: Sequence[str], relevant: Iterable[str]) -> float:
+    """1 / rank of the first relevant item (0 if none retrieved)"""
+    relevant = set(relevant)
+    for rank, item in enumerate(retrieved, 1):
+        if item in relevant:
+            return 1.0 / rank
+    return 0.0
+
+def ndcg_at_k(retrieved: Sequence[str], relevant: Iterable[str], k: int) -> float:
+    """Normalized discounted cumulative gain with binary relevance"""
+    relevant = set(relevant)
+    if not relevant:
+        return 0.0
+    dcg = sum(
+        1.0 / math.log2(rank + 1)
+        for rank, item in enumerate(retrieved[:k], 1)
+        if item in relevant
+    )
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(len(relevant), k) + 1))
+    return dcg / ideal if ideal > 0 else 0.0
+
+def summarize_quality(
+    runs: List[Dict[str, Sequence[str]]],
+    k: int
+) -> Dict[str, float]:
+    """
+    Average quality metrics over queries
+
+    Args:
+        runs: List of {'retrieved': [...ids], 'relevant': [...ids]}
+        k: Cut-off for @k metrics
+
+    Returns:
+        Dict with recall@k, hit@k, mrr, ndcg@k
+    """
+    if not runs:
+        return {f"recall@{k}": 0.0, f"hit@{k}": 0.0, "mrr": 0.0, f"ndcg@{k}": 0.0}
+    return {
+        f"recall@{k}": round(statistics.mean(recall_at_k(r["retrieved"], r["relevant"], k) for r in runs), 4),
+        f"hit@{k}": round(statistics.mean(hit_at_k(r["retrieved"], r["relevant"], k) for r in runs), 4),
+        "mrr": round(statistics.mean(reciprocal_rank(r["retrieved"], r["relevant"]) for r in runs), 4),
+        f"ndcg@{k}": round(statistics.mean(ndcg_at_k(r["retrieved"], r["relevant"], k) for r in runs), 4),
+    }
+
+def summarize_latency(samples_ms: List[float]) -> Dict[str, float]:
+    """p50 / p95 / mean of latency samples in milliseconds"""
+    if not samples_ms:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "mean_ms": 0.0, "count": 0}
+    ordered = sorted(samples_ms)
+    return {
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "mean_ms": round(statistics.mean(ordered), 3),
+        "count": len(ordered),
+    }
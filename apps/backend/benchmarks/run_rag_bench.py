@@ -0,0 +1,431 @@
+"""
+RAG retrieval quality and latency benchmark
+Indexes a synthetic (or given) corpus, runs a labelled query set through the
+hybrid search / re-ranking / LLM stages and reports recall@k, MRR, nDCG,
+per-stage latency and indexing throughput as JSON.
+
+Runs fully offline with stub models by default.
+
+Usage:
+    python -m apps.backend.benchmarks.run_rag_bench --docs 50 --output bench.json
+    python -m apps.backend.benchmarks.run_rag_bench --baseline bench.json   # exit 1 on regression
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from ..services.core.context_packer import get_context_packer
+from .corpus import generate_corpus, write_corpus, label_relevant_chunks
+from .metrics import summarize_quality, summarize_latency
+from .stubs import HashingEmbeddingService, OverlapCrossEncoder, StubLLM
+
+STAGES = ["embed", "ann", "bm25", "fuse", "rerank", "llm", "total"]
+
+def _ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+def load_models(real_models: bool, llm_latency_ms: float):
+    """Create embedding service, reranker and LLM (stub or real)"""
+    from ..services.rag.reranker import Reranker
+
+    if real_models:
+        from ..services.rag.embedding_service import EmbeddingService
+        return EmbeddingService(), Reranker(use_reranking=True), StubLLM(llm_latency_ms)
+
+    reranker = Reranker(use_reranking=False)
+    reranker.model = OverlapCrossEncoder()
+    reranker.use_reranking = True
+    return HashingEmbeddingService(), reranker, StubLLM(llm_latency_ms)
+
+def build_bench_index(
+    doc_paths: List[str],
+    embedding_service,
+    persist_dir: str,
+    chunk_size: int,
+    chunk_overlap: int
+) -> Dict[str, Any]:
+    """
+    Index documents the way build_index does, timing each phase
+
+    Returns:
+        Dict with hybrid_search, chunk metadata lists and an 'indexing' stats block
+    """
+    from ..services.core.rag_indexer_advanced import pdf_to_text, chunk_text
+    from ..services.rag.hybrid_search import HybridSearch
+    from ..services.rag.vector_store import VectorStore
+
+    timings = {}
+    start = time.perf_counter()
+    texts = {}
+    for path in doc_paths:
+        if path.endswith(".pdf"):
+            texts[path] = pdf_to_text(path)
+        else:
+            texts[path] = Path(path).read_text(encoding="utf-8")
+    timings["extract_ms"] = _ms(start)
+
+    start = time.perf_counter()
+    chunk_texts, chunk_ids, chunk_files, metadatas = [], [], [], []
+    for path, text in texts.items():
+        filename = os.path.basename(path)
+        chunks = chunk_text(text, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        for i, chunk in enumerate(chunks):
+            chunk_texts.append(chunk)
+            chunk_ids.append(f"{filename}_chunk_{i}")
+            chunk_files.append(filename)
+            metadatas.append({
+                "doc_path": path,
+                "doc_filename": filename,
+                "chunk_index": i,
+                "total_chunks": len(chunks)
+            })
+    timings["chunk_ms"] = _ms(start)
+
+    start = time.perf_counter()
+    embeddings = embedding_service.embed(chunk_texts, batch_size=32)
+    timings["embed_ms"] = _ms(start)
+
+    start = time.perf_counter()
+    vector_store = VectorStore(collection_name="bench", persist_dir=persist_dir)
+    for i in range(0, len(chunk_texts), 1000):
+        vector_store.add_documents(
+            texts=chunk_texts[i:i + 1000],
+            embeddings=embeddings[i:i + 1000],
+            metadatas=metadatas[i:i + 1000],
+            ids=chunk_ids[i:i + 1000]
+        )
+    timings["vector_add_ms"] = _ms(start)
+
+    start = time.perf_counter()
+    hybrid_search = HybridSearch(vector_store, embedding_service)
+    hybrid_search.build_bm25_index(chunk_texts)
+    hybrid_search.metadatas = metadatas
+    hybrid_search.ids = chunk_ids
+    timings["bm25_ms"] = _ms(start)
+
+    total_s = sum(timings.values()) / 1000
+    return {
+        "hybrid_search": hybrid_search,
+        "chunk_ids": chunk_ids,
+        "chunk_texts": chunk_texts,
+        "chunk_files": chunk_files,
+        "indexing": {
+            "documents": len(doc_paths),
+            "chunks": len(chunk_texts),
+            **{k: round(v, 3) for k, v in timings.items()},
+            "total_s": round(total_s, 3),
+            "docs_per_s": round(len(doc_paths) / total_s, 2) if total_s else 0.0,
+            "chunks_per_s": round(len(chunk_texts) / total_s, 2) if total_s else 0.0,
+        },
+    }
+
+def _pack_context(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Pack search results the same way draft_reply builds the LLM context"""
+    return get_context_packer().pack([
+        {
+            "text": r.get("text", ""),
+            "path": r.get("metadata", {}).get("doc_path", ""),
+            "filename": r.get("metadata", {}).get("doc_filename", ""),
+            "chunk_index": r.get("metadata", {}).get("chunk_index", 0),
+            "doc_id": r.get("id", ""),
+            "score": r.get("score", 0.0),
+        }
+        for r in results
+    ])
+
+def _summarize_plans(decisions: Dict[str, List[Dict[str, float]]]) -> Dict[str, Any]:
+    """Planner decision distribution with re-rank depth and latency per decision"""
+    total = sum(len(plans) for plans in decisions.values())
+    return {
+        "decisions": {decision: len(plans) for decision, plans in decisions.items()},
+        "skip_rate": round(len(decisions.get("skip", [])) / total, 4),
+        "mean_rerank_depth": round(
+            sum(p["depth"] for plans in decisions.values() for p in plans) / total, 2
+        ),
+        "by_decision": {
+            decision: {
+                "mean_rerank_depth": round(sum(p["depth"] for p in plans) / len(plans), 2),
+                "rerank": summarize_latency([p["rerank"] for p in plans]),
+                "total": summarize_latency([p["total"] for p in plans]),
+            }
+            for decision, plans in decisions.items()
+        },
+    }
+
+def run_queries(
+    hybrid_search,
+    reranker,
+    llm,
+    queries: List[Dict[str, Any]],
+    top_k: int,
+    alpha: float,
+    mode: str,
+    planner=None
+) -> Dict[str, Any]:
+    """
+    Run the labelled queries through one retrieval configuration
+
+    Args:
+        mode: 'no_rerank', 'rerank' (fixed 2x top_k depth) or 'adaptive' (planner-chosen depth)
+
+    Returns:
+        Dict with quality metrics, per-stage latency and planner decisions
+    """
+    stage_samples = {stage: [] for stage in STAGES}
+    quality_runs = []
+    decisions: Dict[str, List[Dict[str, float]]] = {}
+    context_tokens: List[int] = []
+    loop = asyncio.new_event_loop()
+
+    try:
+        for item in queries:
+            query = item["query"]
+            total_start = time.perf_counter()
+
+            start = time.perf_counter()
+            embedding = hybrid_search.embedding_service.embed_query(query)
+            stage_samples["embed"].append(_ms(start))
+
+            start = time.perf_counter()
+            vector_scores = hybrid_search.vector_search(query, top_k * 4, embedding)
+            stage_samples["ann"].append(_ms(start))
+
+            start = time.perf_counter()
+            bm25_scores = hybrid_search.bm25_search(query)
+            stage_samples["bm25"].append(_ms(start))
+
+            depth = planner.max_candidates(top_k) if mode == "adaptive" else top_k * 2
+            start = time.perf_counter()
+            results = hybrid_search.fuse(vector_scores, bm25_scores, depth, alpha=alpha)
+            stage_samples["fuse"].append(_ms(start))
+
+            plan = None
+            if mode == "no_rerank":
+                rerank_depth = 0
+            elif mode == "adaptive":
+                plan = planner.plan(results, top_k)
+                rerank_depth = plan["rerank_depth"]
+            else:
+                rerank_depth = len(results)
+
+            start = time.perf_counter()
+            if rerank_depth:
+                results = reranker.rerank(query, results[:rerank_depth], top_k=top_k)
+            else:
+                results = results[:top_k]
+            stage_samples["rerank"].append(_ms(start))
+
+            start = time.perf_counter()
+            packed = _pack_context(results)
+            loop.run_until_complete(llm.generate_response(query, context=packed["context"]))
+            stage_samples["llm"].append(_ms(start))
+            context_tokens.append(packed["tokens"])
+
+            stage_samples["total"].append(_ms(total_start))
+            if plan is not None:
+                decisions.setdefault(plan["decision"], []).append({
+                    "depth": rerank_depth,
+                    "rerank": stage_samples["rerank"][-1],
+                    "total": stage_samples["total"][-1],
+                })
+            quality_runs.append({
+                "retrieved": [r.get("id") for r in results],
+                "relevant": item["relevant_ids"],
+            })
+    finally:
+        loop.close()
+
+    output = {
+        "quality": summarize_quality(quality_runs, top_k),
+        "latency": {stage: summarize_latency(samples) for stage, samples in stage_samples.items()},
+        "context_tokens": {
+            "mean": round(sum(context_tokens) / len(context_tokens), 1) if context_tokens else 0.0,
+            "max": max(context_tokens, default=0),
+        },
+    }
+    if decisions:
+        output["planner"] = _summarize_plans(decisions)
+    return output
+
+def run_benchmark(
+    num_docs: int = 30,
+    doc_format: str = "pdf",
+    corpus_dir: Optional[str] = None,
+    top_k: int = 5,
+    alphas: Optional[List[float]] = None,
+    modes: Optional[List[str]] = None,
+    chunk_size: int = 500,
+    chunk_overlap: int = 50,
+    real_models: bool = False,
+    llm_latency_ms: float = 0.0,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Run the full benchmark and return machine-readable results
+
+    Args:
+        num_docs: Documents to generate (ignored when corpus_dir has queries.json)
+        doc_format: 'pdf' or 'txt' for generated documents
+        corpus_dir: Existing corpus directory with queries.json (generated if None)
+        top_k: Results per query
+        alphas: Hybrid search vector weights to evaluate
+        modes: Retrieval modes to evaluate ('no_rerank', 'rerank', 'adaptive')
+        chunk_size: chunk_text size
+        chunk_overlap: chunk_text overlap
+        real_models: Use sentence-transformers models instead of stubs
+        llm_latency_ms: Simulated LLM latency for the stub
+        seed: Corpus generation seed
+
+    Returns:
+        Results dict with environment, config, indexing and per-configuration runs
+
+    Raises:
+        ValueError: If no query has a relevant chunk in the index (broken corpus)
+    """
+    from ..services.rag.retrieval_planner import RetrievalPlanner
+
+    alphas = alphas or [0.5]
+    modes = modes or ["no_rerank", "rerank", "adaptive"]
+    embedding_service, reranker, llm = load_models(real_models, llm_latency_ms)
+
+    with tempfile.TemporaryDirectory(prefix="rag-bench-") as workdir:
+        if corpus_dir and (Path(corpus_dir) / "queries.json").exists():
+            queries = json.loads((Path(corpus_dir) / "queries.json").read_text())
+            doc_paths = sorted(
+                str(p) for p in Path(corpus_dir).iterdir() if p.suffix in (".pdf", ".txt")
+            )
+        else:
+            corpus = generate_corpus(num_docs=num_docs, seed=seed)
+            doc_paths = write_corpus(corpus, corpus_dir or os.path.join(workdir, "corpus"), fmt=doc_format)
+            queries = corpus["queries"]
+
+        index = build_bench_index(
+            doc_paths, embedding_service, os.path.join(workdir, "vector_db"), chunk_size, chunk_overlap
+        )
+        labelled = label_relevant_chunks(queries, index["chunk_ids"], index["chunk_texts"], index["chunk_files"])
+        if not labelled:
+            # Fail loudly instead of writing an all-zero baseline
+            raise ValueError(
+                f"None of the {len(queries)} queries matched an indexed chunk; "
+                "check that queries.json filenames match the corpus documents"
+            )
+
+        runs = {}
+        for alpha in alphas:
+            for mode in modes:
+                runs[f"alpha={alpha}/{mode}"] = run_queries(
+                    index["hybrid_search"], reranker, llm, labelled, top_k, alpha, mode,
+                    planner=RetrievalPlanner()
+                )
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "config": {
+            "num_docs": len(doc_paths),
+            "num_queries": len(labelled),
+            "doc_format": doc_format,
+            "top_k": top_k,
+            "alphas": alphas,
+            "modes": modes,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "models": "real" if real_models else "stub",
+            "llm_latency_ms": llm_latency_ms,
+        },
+        "indexing": index["indexing"],
+        "runs": runs,
+    }
+
+def compare_results(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    max_recall_drop: float = 0.01,
+    max_latency_increase: float = 0.2
+) -> List[str]:
+    """
+    Compare a run against a baseline
+
+    Args:
+        current: Results from run_benchmark
+        baseline: Previously saved results
+        max_recall_drop: Allowed absolute drop in recall@k / nDCG@k / MRR
+        max_latency_increase: Allowed relative increase in total p50 latency
+
+    Returns:
+        List of human-readable regression messages (empty = no regression)
+    """
+    regressions = []
+    for name, run in current["runs"].items():
+        base = baseline.get("runs", {}).get(name)
+        if not base:
+            continue
+        for metric, value in run["quality"].items():
+            base_value = base["quality"].get(metric)
+            if base_value is not None and base_value - value > max_recall_drop:
+                regressions.append(f"{name}: {metric} dropped {base_value:.4f} -> {value:.4f}")
+        base_p50 = base["latency"]["total"]["p50_ms"]
+        p50 = run["latency"]["total"]["p50_ms"]
+        if base_p50 > 0 and (p50 - base_p50) / base_p50 > max_latency_increase:
+            regressions.append(f"{name}: total p50 {base_p50:.2f}ms -> {p50:.2f}ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RAG retrieval quality and latency")
+    parser.add_argument("--docs", type=int, default=30, help="Synthetic documents to generate")
+    parser.add_argument("--format", choices=["pdf", "txt"], default="pdf")
+    parser.add_argument("--corpus-dir", help="Use/keep the corpus in this directory")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--alphas", default="0.5", help="Comma-separated vector weights")
+    parser.add_argument("--modes", default="no_rerank,rerank,adaptive")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--chunk-overlap", type=int, default=50)
+    parser.add_argument("--real-models", action="store_true", help="Use real embedding/reranker models")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON result")
+    parser.add_argument("--max-recall-drop", type=float, default=0.01)
+    parser.add_argument("--max-latency-increase", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        num_docs=args.docs,
+        doc_format=args.format,
+        corpus_dir=args.corpus_dir,
+        top_k=args.top_k,
+        alphas=[float(a) for a in args.alphas.split(",")],
+        modes=[m.strip() for m in args.modes.split(",") if m.strip()],
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        real_models=args.real_models,
+        llm_latency_ms=args.llm_latency_ms,
+    )
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_results(
+                results, json.load(f), args.max_recall_drop, args.max_latency_increase
+            )
+        for message in regressions:
+            print(f"REGRESSION: {message}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Offline stand-ins for the embedding model, cross-encoder and LLM
+Deterministic and dependency-free so benchmarks run without model downloads
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+import asyncio
+import hashlib
+import re
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)?")
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+class HashingEmbeddingService:
+    """Hashed bag-of-words (+ bigrams) embeddings with the EmbeddingService interface"""
+
+    def __init__(self, dim: int = 384):
+        self.provider = "stub"
+        self.model_name = f"hashing-{dim}"
+        self.dim = dim
+
+    def _bucket(self, feature: str) -> int:
+        return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little") % self.dim
+
+    def _embed_one(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        tokens = _tokens(text)
+        for token in tokens:
+            vector[self._bucket(token)] += 1.0
+        for left, right in zip(tokens, tokens[1:]):
+            vector[self._bucket(f"{left} {right}")] += 0.5
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm > 0 else vector).tolist()
+
+    def embed(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+        return [self._embed_one(text) for text in texts]
+
+    def embed_query(self, query: str) -> List[float]:
+        return self._embed_one(query)
+
+class OverlapCrossEncoder:
+    """Scores a pair by query-token coverage in the document (CrossEncoder.predict interface)"""
+
+    def predict(self, pairs: Sequence[Tuple[str, str]], batch_size: int = 32) -> np.ndarray:
+        scores = []
+        for query, document in pairs:
+            query_tokens = set(_tokens(query))
+            doc_tokens = set(_tokens(document))
+            scores.append(len(query_tokens & doc_tokens) / len(query_tokens) if query_tokens else 0.0)
+        return np.asarray(scores, dtype=np.float32)
+
+class StubLLM:
+    """Returns a canned answer after a fixed simulated generation delay"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+
+    def is_configured(self) -> bool:
+        return True
+
+    async def generate_response(
+        self,
+        query: str,
+        context: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000.0)
+        return f"Stub answer to '{query}' using {len(context or '')} characters of context."
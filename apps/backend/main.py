@@ -2,23 +2,46 @@
 Edge Reader MVP - Main FastAPI Application
 """
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 from .api.routes_health import router as health_router
-from .api.routes_ingest import router as ingest_router
+from .api.routes_ingest import router as ingest_router, get_job_workers
 from .api.routes_analysis import router as analysis_router
 from .api.routes_chat import router as chat_router
+from .services.ai.deepseek_service import get_deepseek_service
+from .services.responder import get_generation_backend
 
 # Load environment variables
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open long-lived clients, load a local model and start ingest job workers on startup; close them on shutdown"""
+    deepseek = get_deepseek_service()
+    backend = get_generation_backend()
+    if deepseek.is_configured():
+        await deepseek.start()
+    if backend is not deepseek and backend.is_configured():
+        await backend.start()
+    job_workers = get_job_workers() if os.getenv("JOB_WORKERS_ENABLED", "true").lower() == "true" else None
+    if job_workers:
+        job_workers.start()
+    yield
+    if job_workers:
+        await job_workers.stop()
+    await deepseek.aclose()
+    if backend is not deepseek:
+        await backend.aclose()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Edge Reader MVP",
     description="Multimodal AI-powered document processing system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -2,20 +2,116 @@
 DeepSeek API service for AI chat
 """
 import os
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
+import asyncio
+import json
 import httpx
 import logging
 
+from .llm_gateway import LLMProviderError, create_llm_gateway
+
 logger = logging.getLogger(__name__)
 
+class DeepSeekAPIError(LLMProviderError):
+    """DeepSeek request failure (status_code is None for connection errors)"""
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Parse a numeric Retry-After header"""
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+def user_message(query: str, context: Optional[str] = None) -> Dict[str, str]:
+    """Build the user message for a query with optional context"""
+    if context:
+        return {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {query}"}
+    return {"role": "user", "content": query}
+
+def build_messages(
+    query: str,
+    context: Optional[str] = None,
+    system_prompt: Optional[str] = None,
+    history: Optional[List[Dict[str, str]]] = None
+) -> List[Dict[str, str]]:
+    """
+    Build the chat messages for a query with optional context
+    Shared by all generation backends so prompts stay identical across providers
+    
+    Args:
+        query: User query
+        context: Optional context/evidence to include
+        system_prompt: Optional system prompt
+        history: Earlier user/assistant messages of the conversation, oldest first
+        
+    Returns:
+        List of message dicts
+    """
+    messages = []
+    
+    # Add system prompt if provided
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    elif context:
+        # Default system prompt when context is provided
+        messages.append({
+            "role": "system",
+            "content": "You are a helpful AI assistant that answers questions based on the provided context. "
+                      "Use the context to provide accurate and relevant answers. "
+                      "If the context doesn't contain enough information, say so."
+        })
+    else:
+        messages.append({
+            "role": "system",
+            "content": "You are a helpful AI assistant."
+        })
+    
+    # Replayed verbatim so the provider's prefix cache covers the earlier turns
+    if history:
+        messages.extend(history)
+    
+    # Add context if provided
+    messages.append(user_message(query, context))
+    
+    return messages
+
+
 class DeepSeekService:
     """Service for interacting with DeepSeek API"""
     
+    provider = "deepseek"
+    
     def __init__(self):
         self.api_key = os.getenv("DEEPSEEK_API_KEY")
         self.api_url = os.getenv("DEEPSEEK_API_URL", "https://api.deepseek.com")
         self.model = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
         
+        # Connection pool settings for the long-lived HTTP client
+        self.http2 = os.getenv("DEEPSEEK_HTTP2", "true").lower() in ("1", "true", "yes")
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv("DEEPSEEK_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("DEEPSEEK_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("DEEPSEEK_KEEPALIVE_EXPIRY", "60"))
+        )
+        self.timeout = httpx.Timeout(
+            float(os.getenv("DEEPSEEK_TIMEOUT", "60")),
+            connect=float(os.getenv("DEEPSEEK_CONNECT_TIMEOUT", "10"))
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Request / connection counters
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._tcp_connects = 0
+        self._tls_handshakes = 0
+        self._warmups = 0
+        self._warmup_in_flight = False
+        
+        # Concurrency cap, rate limit, retries and circuit breaker for provider calls
+        self.gateway = create_llm_gateway("deepseek")
+        
         if not self.api_key:
             logger.warning("DEEPSEEK_API_KEY not found in environment variables. AI Chat will use dummy responses.")
             self.api_key = None
@@ -24,6 +120,126 @@ class DeepSeekService:
         """Check if DeepSeek API is properly configured"""
         return self.api_key is not None and len(self.api_key.strip()) > 0
     
+    async def start(self) -> None:
+        """Open the pooled HTTP client (called from the app lifespan)"""
+        if self._client is not None and not self._client.is_closed:
+            return
+        
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("h2 not installed, DeepSeek client falls back to HTTP/1.1. Install with: pip install h2")
+                http2 = False
+        
+        self._client = httpx.AsyncClient(
+            base_url=self.api_url,
+            http2=http2,
+            limits=self.limits,
+            timeout=self.timeout,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+        )
+        self._client_loop = asyncio.get_running_loop()
+        logger.info(
+            f"DeepSeek HTTP client opened (http2={http2}, max_connections={self.limits.max_connections}, "
+            f"keepalive={self.limits.max_keepalive_connections}/{self.limits.keepalive_expiry}s)"
+        )
+    
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client (called from the app lifespan)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+            logger.info("DeepSeek HTTP client closed")
+    
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled client, opening it lazily if the lifespan did not"""
+        if self._client is not None and self._client_loop is not asyncio.get_running_loop():
+            # Pooled connections are bound to the loop that opened them
+            logger.warning("DeepSeek client used from a different event loop; reopening connection pool")
+            self._client = None
+        if self._client is None or self._client.is_closed:
+            await self.start()
+        return self._client
+    
+    async def _trace(self, event: str, info: Dict[str, Any]) -> None:
+        """httpcore trace hook: count new TCP connections and TLS handshakes"""
+        if event == "connection.connect_tcp.complete":
+            self._tcp_connects += 1
+        elif event == "connection.start_tls.complete":
+            self._tls_handshakes += 1
+    
+    async def warmup(self) -> bool:
+        """
+        Open a pooled connection ahead of the first completion request
+        
+        Called while retrieval is still running so TCP/TLS setup overlaps with it.
+        Does nothing when an idle keep-alive connection is already available.
+        
+        Returns:
+            True if a new connection was warmed
+        """
+        if not self.is_configured() or self._warmup_in_flight:
+            return False
+        client = await self._get_client()
+        if self.pool_stats()["idle_connections"] > 0:
+            return False
+        
+        self._warmup_in_flight = True
+        try:
+            # Cheap authenticated GET; the response body is irrelevant, the connection is what we keep
+            response = await client.get("/models", extensions={"trace": self._trace})
+            await response.aclose()
+            self._warmups += 1
+            return True
+        except httpx.HTTPError as e:
+            logger.debug(f"DeepSeek connection warm-up failed: {e}")
+            return False
+        finally:
+            self._warmup_in_flight = False
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool metrics
+        
+        Returns:
+            Dict with pool limits, open/idle/active connections, and reuse counters
+        """
+        connections = []
+        if self._client is not None and not self._client.is_closed:
+            pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", []) or [])
+        
+        idle = sum(1 for conn in connections if conn.is_idle())
+        http2_connections = sum(1 for conn in connections if "HTTP/2" in conn.info())
+        
+        return {
+            "client_open": self._client is not None and not self._client.is_closed,
+            "http2_enabled": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "http2_connections": http2_connections,
+            "requests_total": self._requests,
+            "requests_in_flight": self._in_flight,
+            "errors_total": self._errors,
+            "tcp_connects_total": self._tcp_connects,
+            "tls_handshakes_total": self._tls_handshakes,
+            "warmups_total": self._warmups,
+            "connection_reuse_ratio": (
+                round(1 - self._tcp_connects / (self._requests + self._warmups), 4)
+                if self._requests + self._warmups else 0.0
+            ),
+        }
+    
     async def chat(
         self, 
         messages: List[Dict[str, str]], 
@@ -41,8 +257,16 @@ class DeepSeekService:
             max_tokens: Maximum tokens to generate
             
         Returns:
-            API response dict
+            API response dict (when stream=True the streamed deltas are
+            collected into the same shape; use chat_stream to consume tokens)
         """
+        if stream:
+            parts = [token async for token in self.chat_stream(messages, temperature, max_tokens)]
+            return {
+                "model": self.model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(parts)}}]
+            }
+        
         if not self.is_configured():
             raise ValueError(
                 "DEEPSEEK_API_KEY not configured. "
@@ -50,45 +274,156 @@ class DeepSeekService:
                 "See docs/DEEPSEEK_API_SETUP.md for instructions."
             )
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "model": self.model,
             "messages": messages,
-            "stream": stream,
+            "stream": False,
             "temperature": temperature
         }
         
         if max_tokens:
             payload["max_tokens"] = max_tokens
         
+        return await self.gateway.call(self._post_completion, payload)
+    
+    async def _post_completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a single (non-streaming) completion request"""
+        client = await self._get_client()
+        self._requests += 1
+        self._in_flight += 1
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    f"{self.api_url}/v1/chat/completions",
-                    headers=headers,
-                    json=payload
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await client.post(
+                "/v1/chat/completions",
+                json=payload,
+                extensions={"trace": self._trace}
+            )
+            response.raise_for_status()
+            return response.json()
         except httpx.HTTPStatusError as e:
+            self._errors += 1
             logger.error(f"DeepSeek API HTTP error: {e.response.status_code} - {e.response.text}")
-            raise Exception(f"DeepSeek API error: {e.response.status_code}")
+            raise DeepSeekAPIError(
+                f"DeepSeek API error: {e.response.status_code}",
+                status_code=e.response.status_code,
+                retry_after=_retry_after(e.response)
+            )
         except httpx.RequestError as e:
+            self._errors += 1
             logger.error(f"DeepSeek API request error: {e}")
-            raise Exception(f"Failed to connect to DeepSeek API: {str(e)}")
+            raise DeepSeekAPIError(f"Failed to connect to DeepSeek API: {str(e)}")
         except Exception as e:
+            self._errors += 1
             logger.error(f"DeepSeek API unexpected error: {e}", exc_info=True)
             raise
+        finally:
+            self._in_flight -= 1
+    
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from DeepSeek API
+        
+        Parses the server-sent event stream incrementally and yields content
+        deltas as they arrive. The request is admitted through the gateway but
+        not retried, since a partially emitted stream cannot be replayed.
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            temperature: Sampling temperature (0.0-2.0)
+            max_tokens: Maximum tokens to generate
+            
+        Yields:
+            Content text deltas
+        """
+        if not self.is_configured():
+            raise ValueError(
+                "DEEPSEEK_API_KEY not configured. "
+                "Please set DEEPSEEK_API_KEY in your .env file. "
+                "See docs/DEEPSEEK_API_SETUP.md for instructions."
+            )
+        
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "stream": True,
+            "temperature": temperature
+        }
+        
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+        
+        async with self.gateway.slot():
+            async for token in self._stream_completion(payload):
+                yield token
+    
+    async def _stream_completion(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """Send a single streaming completion request and yield content deltas"""
+        client = await self._get_client()
+        self._requests += 1
+        self._in_flight += 1
+        try:
+            async with client.stream(
+                "POST",
+                "/v1/chat/completions",
+                json=payload,
+                headers={"Accept": "text/event-stream"},
+                extensions={"trace": self._trace}
+            ) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                response.raise_for_status()
+                
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue  # blank separators, comments and keep-alives
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = json.loads(data)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping malformed DeepSeek stream chunk: {data[:100]}")
+                        continue
+                    choices = chunk.get("choices") or []
+                    if choices:
+                        content = (choices[0].get("delta") or {}).get("content")
+                        if content:
+                            yield content
+        except httpx.HTTPStatusError as e:
+            self._errors += 1
+            logger.error(f"DeepSeek API HTTP error: {e.response.status_code} - {e.response.text}")
+            raise DeepSeekAPIError(
+                f"DeepSeek API error: {e.response.status_code}",
+                status_code=e.response.status_code,
+                retry_after=_retry_after(e.response)
+            )
+        except httpx.RequestError as e:
+            self._errors += 1
+            logger.error(f"DeepSeek API request error: {e}")
+            raise DeepSeekAPIError(f"Failed to connect to DeepSeek API: {str(e)}")
+        finally:
+            self._in_flight -= 1
+    
+    def build_messages(
+        self,
+        query: str,
+        context: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for a query with optional context"""
+        return build_messages(query, context, system_prompt, history)
     
     async def generate_response(
         self,
         query: str,
         context: Optional[str] = None,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None
     ) -> str:
         """
         Generate a response to a query with optional context
@@ -97,37 +432,12 @@ class DeepSeekService:
             query: User query
             context: Optional context/evidence to include
             system_prompt: Optional system prompt
+            history: Earlier user/assistant messages of the conversation
             
         Returns:
             Generated response text
         """
-        messages = []
-        
-        # Add system prompt if provided
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        elif context:
-            # Default system prompt when context is provided
-            messages.append({
-                "role": "system",
-                "content": "You are a helpful AI assistant that answers questions based on the provided context. "
-                          "Use the context to provide accurate and relevant answers. "
-                          "If the context doesn't contain enough information, say so."
-            })
-        else:
-            messages.append({
-                "role": "system",
-                "content": "You are a helpful AI assistant."
-            })
-        
-        # Add context if provided
-        if context:
-            messages.append({
-                "role": "user",
-                "content": f"Context:\n{context}\n\nQuestion: {query}"
-            })
-        else:
-            messages.append({"role": "user", "content": query})
+        messages = self.build_messages(query, context, system_prompt, history)
         
         try:
             response = await self.chat(messages)
@@ -144,6 +454,29 @@ class DeepSeekService:
         except Exception as e:
             logger.error(f"Error generating response: {e}")
             raise
+    
+    async def generate_response_stream(
+        self,
+        query: str,
+        context: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response to a query with optional context
+        
+        Args:
+            query: User query
+            context: Optional context/evidence to include
+            system_prompt: Optional system prompt
+            history: Earlier user/assistant messages of the conversation
+            
+        Yields:
+            Response text deltas
+        """
+        messages = self.build_messages(query, context, system_prompt, history)
+        async for token in self.chat_stream(messages):
+            yield token
 
 
 # Global instance
@@ -0,0 +1,297 @@
+"""
+LLM gateway: concurrency cap, rate limiting, retries and circuit breaking
+Sits between the app and an LLM provider client so bursts degrade gracefully
+"""
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+import os
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+class LLMProviderError(Exception):
+    """Provider call failure carrying the HTTP status (None for connection errors)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        """Rate limits, server errors and connection failures are worth retrying"""
+        return self.status_code is None or self.status_code in RETRYABLE_STATUS
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is open and the call is shed"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"LLM provider '{name}' circuit is open. Retry after {retry_after:.1f}s.")
+        self.name = name
+        self.retry_after = retry_after
+
+class LLMGateway:
+    """
+    Guards calls to one LLM provider
+
+    - A semaphore caps concurrent in-flight requests
+    - A token bucket caps the request rate (requests are delayed, not dropped)
+    - Retryable failures are retried with full-jitter exponential backoff,
+      honouring the provider's Retry-After when given
+    - After `failure_threshold` consecutive failures the circuit opens and calls
+      fail fast for `recovery_timeout` seconds; then one probe call is let through
+      (half-open) and its outcome closes or re-opens the circuit
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 8,
+        rate_per_second: float = 10.0,
+        burst: int = 20,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0
+    ):
+        """
+        Initialize LLM gateway
+
+        Args:
+            name: Provider name (used in logs and stats)
+            max_concurrency: Maximum concurrent provider requests
+            rate_per_second: Sustained request rate (0 disables rate limiting)
+            burst: Token bucket capacity
+            max_retries: Retries per call for retryable failures
+            base_delay: Initial backoff delay in seconds
+            max_delay: Backoff delay cap in seconds
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds the circuit stays open before a probe
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        # asyncio primitives are bound to the loop that first uses them
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Token bucket (may go negative: callers reserve a token and sleep off the deficit)
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+
+        # Circuit breaker
+        self._state = "closed"
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        # Counters
+        self._in_flight = 0
+        self._waiting = 0
+        self._calls = 0
+        self._successes = 0
+        self._failures = 0
+        self._retries = 0
+        self._rate_limited = 0
+        self._throttled = 0
+        self._shed = 0
+        self._circuit_opens = 0
+
+        logger.info(
+            f"LLM gateway '{name}' initialized (concurrency={max_concurrency}, rate={rate_per_second}/s, "
+            f"burst={burst}, retries={max_retries}, breaker={failure_threshold}/{recovery_timeout}s)"
+        )
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def _take_token(self) -> None:
+        """Reserve one token from the bucket, sleeping if the bucket is empty"""
+        if self.rate_per_second <= 0:
+            return
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._last_refill) * self.rate_per_second)
+        self._last_refill = now
+        self._tokens -= 1.0
+        if self._tokens < 0:
+            self._throttled += 1
+            await asyncio.sleep(-self._tokens / self.rate_per_second)
+
+    def _check_circuit(self) -> None:
+        """Shed the call if the circuit is open; admit a single probe once it has cooled down"""
+        if self._state == "closed":
+            return
+        remaining = self.recovery_timeout - (time.monotonic() - self._opened_at)
+        if self._state == "open" and remaining <= 0:
+            self._state = "half_open"
+        if self._state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        self._shed += 1
+        raise CircuitOpenError(self.name, max(remaining, 1.0))
+
+    def _record_success(self) -> None:
+        self._successes += 1
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        if self._state != "closed":
+            logger.info(f"LLM gateway '{self.name}' circuit closed")
+        self._state = "closed"
+
+    def _record_failure(self, error: Exception) -> None:
+        self._failures += 1
+        if isinstance(error, LLMProviderError) and not error.retryable:
+            # Client errors (bad request, auth) say nothing about provider health
+            self._probe_in_flight = False
+            return
+        self._consecutive_failures += 1
+        if self._state == "half_open" or self._consecutive_failures >= self.failure_threshold:
+            if self._state != "open":
+                self._circuit_opens += 1
+                logger.warning(
+                    f"LLM gateway '{self.name}' circuit opened after {self._consecutive_failures} "
+                    f"consecutive failures: {error}"
+                )
+            self._state = "open"
+            self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            return min(float(retry_after), self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Admit one provider request (breaker check, rate limit, concurrency cap)
+
+        Outcome of the wrapped block is recorded for the circuit breaker.
+        Used directly for streaming calls, which cannot be replayed once tokens
+        have been emitted and are therefore not retried.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        self._check_circuit()
+        semaphore = self._get_semaphore()
+        self._waiting += 1
+        try:
+            await self._take_token()
+            await semaphore.acquire()
+        except BaseException:
+            self._probe_in_flight = False
+            raise
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+        try:
+            yield
+        except Exception as e:
+            if isinstance(e, LLMProviderError) and e.status_code == 429:
+                self._rate_limited += 1
+            self._record_failure(e)
+            raise
+        except BaseException:
+            # Cancelled or closed early: no verdict on provider health
+            self._probe_in_flight = False
+            raise
+        else:
+            self._record_success()
+        finally:
+            self._in_flight -= 1
+            semaphore.release()
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Call the provider through the gateway, retrying retryable failures
+
+        Args:
+            fn: Coroutine function performing a single provider request
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            fn's return value
+
+        Raises:
+            CircuitOpenError: If the circuit is (or becomes) open
+            Exception: The last provider error once retries are exhausted
+        """
+        self._calls += 1
+        attempt = 0
+        while True:
+            try:
+                async with self.slot():
+                    return await fn(*args, **kwargs)
+            except LLMProviderError as e:
+                if not e.retryable or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                attempt += 1
+                self._retries += 1
+                logger.warning(
+                    f"LLM gateway '{self.name}' retry {attempt}/{self.max_retries} in {delay:.2f}s "
+                    f"(status={e.status_code})"
+                )
+                await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get gateway limits, circuit state and path counters"""
+        return {
+            "name": self.name,
+            "state": self._state,
+            "max_concurrency": self.max_concurrency,
+            "rate_per_second": self.rate_per_second,
+            "burst": self.burst,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "consecutive_failures": self._consecutive_failures,
+            "calls": self._calls,
+            "successes": self._successes,
+            "failures": self._failures,
+            "retries": self._retries,
+            "rate_limited": self._rate_limited,
+            "throttled": self._throttled,
+            "shed": self._shed,
+            "circuit_opens": self._circuit_opens,
+        }
+
+def create_llm_gateway(name: str) -> LLMGateway:
+    """
+    Create a gateway configured from LLM_* environment variables
+
+    Args:
+        name: Provider name
+
+    Returns:
+        LLMGateway instance
+    """
+    return LLMGateway(
+        name,
+        max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+        rate_per_second=float(os.getenv("LLM_RATE_PER_SECOND", "10")),
+        burst=int(os.getenv("LLM_RATE_BURST", "20")),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+        base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5")),
+        max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "8")),
+        failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+        recovery_timeout=float(os.getenv("LLM_BREAKER_RECOVERY", "30"))
+    )
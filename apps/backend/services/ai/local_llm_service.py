@@ -0,0 +1,309 @@
+"""
+Local CPU LLM service (llama.cpp) for offline sites
+Loads a quantized GGUF model once and serves requests FIFO from a single
+worker thread (llama.cpp evaluates one sequence at a time), streaming tokens back.
+"""
+import os
+from typing import Optional, List, Dict, Any, AsyncIterator
+import asyncio
+import logging
+import queue
+import threading
+import time
+
+from .deepseek_service import build_messages
+
+logger = logging.getLogger(__name__)
+
+# Try to import llama.cpp bindings
+try:
+    from llama_cpp import Llama
+    LLAMA_CPP_AVAILABLE = True
+except ImportError:
+    LLAMA_CPP_AVAILABLE = False
+    logger.warning("llama-cpp-python not available. Install with: pip install llama-cpp-python")
+
+_STOP = object()
+
+class _Job:
+    """One queued generation request"""
+
+    def __init__(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+                 loop: asyncio.AbstractEventLoop, output: asyncio.Queue):
+        self.messages = messages
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.loop = loop
+        self.output = output
+        self.cancelled = threading.Event()
+        self.enqueued_at = time.monotonic()
+
+    def emit(self, item: Any) -> None:
+        """Hand an item to the awaiting coroutine (called from the worker thread)"""
+        try:
+            self.loop.call_soon_threadsafe(self.output.put_nowait, item)
+        except RuntimeError:
+            # The requester's event loop is closed: nobody is listening any more
+            self.cancelled.set()
+
+class LocalLLMService:
+    """Service for generating answers with a local llama.cpp model"""
+
+    provider = "local"
+
+    def __init__(self):
+        self.model_path = os.getenv("LOCAL_LLM_MODEL_PATH")
+        self.model = os.path.basename(self.model_path) if self.model_path else "local"
+        self.n_ctx = int(os.getenv("LOCAL_LLM_CONTEXT", "4096"))
+        self.n_threads = int(os.getenv("LOCAL_LLM_THREADS", str(os.cpu_count() or 4)))
+        self.max_tokens = int(os.getenv("LOCAL_LLM_MAX_TOKENS", "512"))
+        self.max_queue = int(os.getenv("LOCAL_LLM_MAX_QUEUE", "32"))
+        self.prompt_cache = os.getenv("LOCAL_LLM_PROMPT_CACHE", "true").lower() in ("1", "true", "yes")
+
+        self._llm = None
+        self._load_lock = threading.Lock()
+        self._jobs: "queue.Queue" = queue.Queue(maxsize=self.max_queue)
+        self._worker: Optional[threading.Thread] = None
+
+        # Counters
+        self._requests = 0
+        self._queue_wait_seconds = 0.0
+        self._tokens = 0
+        self._generation_seconds = 0.0
+        self._errors = 0
+
+        if self.model_path and not LLAMA_CPP_AVAILABLE:
+            logger.warning("LOCAL_LLM_MODEL_PATH is set but llama-cpp-python is not installed.")
+
+    def is_configured(self) -> bool:
+        """Check if a local model is available"""
+        return LLAMA_CPP_AVAILABLE and bool(self.model_path) and os.path.exists(self.model_path)
+
+    def _load_model(self):
+        """Load the GGUF model (once)"""
+        logger.info(f"Loading local LLM from {self.model_path} (n_ctx={self.n_ctx}, threads={self.n_threads})")
+        llm = Llama(
+            model_path=self.model_path,
+            n_ctx=self.n_ctx,
+            n_threads=self.n_threads,
+            verbose=False
+        )
+        if self.prompt_cache:
+            # Reuse the evaluated KV state of the shared system-prompt prefix across requests
+            from llama_cpp import LlamaRAMCache
+            llm.set_cache(LlamaRAMCache())
+        return llm
+
+    def load(self) -> None:
+        """Load the model and start the worker thread if not already running"""
+        with self._load_lock:
+            if self._llm is None:
+                self._llm = self._load_model()
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run_worker, name="local-llm", daemon=True)
+                self._worker.start()
+
+    async def start(self) -> None:
+        """Load the model off the event loop (called from the app lifespan)"""
+        await asyncio.get_running_loop().run_in_executor(None, self.load)
+
+    async def warmup(self) -> bool:
+        """
+        Make sure the model is loaded before the first generation
+        
+        Returns:
+            True if the model was loaded by this call
+        """
+        if not self.is_configured() or (self._llm is not None and self._worker is not None):
+            return False
+        await self.start()
+        return True
+
+    async def aclose(self) -> None:
+        """Stop the worker thread (called from the app lifespan)"""
+        if self._worker is not None and self._worker.is_alive():
+            self._jobs.put(_STOP)
+            await asyncio.get_running_loop().run_in_executor(None, self._worker.join, 5)
+        self._worker = None
+
+    def _run_worker(self) -> None:
+        """Serve jobs in FIFO order (they share the loaded weights and the prompt-prefix KV cache)"""
+        while True:
+            job = self._jobs.get()
+            if job is _STOP:
+                return
+            self._queue_wait_seconds += time.monotonic() - job.enqueued_at
+            try:
+                self._generate(job)
+            except Exception as e:
+                # Never let one request take down the only worker thread
+                logger.error(f"Local LLM worker error: {e}", exc_info=True)
+
+    def _generate(self, job: _Job) -> None:
+        """Run one completion and stream its deltas to the job's queue"""
+        if job.cancelled.is_set():
+            job.emit(_STOP)
+            return
+        started = time.perf_counter()
+        try:
+            stream = self._llm.create_chat_completion(
+                messages=job.messages,
+                temperature=job.temperature,
+                max_tokens=job.max_tokens,
+                stream=True
+            )
+            for chunk in stream:
+                if job.cancelled.is_set():
+                    break
+                content = chunk["choices"][0].get("delta", {}).get("content")
+                if content:
+                    self._tokens += 1
+                    job.emit(content)
+        except Exception as e:
+            self._errors += 1
+            logger.error(f"Local LLM generation error: {e}", exc_info=True)
+            job.emit(e)
+        finally:
+            self._generation_seconds += time.perf_counter() - started
+            job.emit(_STOP)
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from the local model
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+
+        Yields:
+            Content text deltas
+        """
+        if not self.is_configured():
+            raise ValueError(
+                "Local LLM not configured. Set LOCAL_LLM_MODEL_PATH to a GGUF model "
+                "and install llama-cpp-python."
+            )
+        if self._llm is None or self._worker is None:
+            await self.start()
+
+        output: asyncio.Queue = asyncio.Queue()
+        job = _Job(messages, temperature, max_tokens or self.max_tokens, asyncio.get_running_loop(), output)
+        try:
+            self._jobs.put_nowait(job)
+        except queue.Full:
+            raise Exception("Local LLM queue is full")
+        self._requests += 1
+
+        try:
+            while True:
+                item = await output.get()
+                if item is _STOP:
+                    return
+                if isinstance(item, Exception):
+                    raise Exception(f"Local LLM error: {item}")
+                yield item
+        finally:
+            # Stop generating if the consumer went away (client disconnect)
+            job.cancelled.set()
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        stream: bool = False,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Run a chat completion and return it in the OpenAI response shape
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            stream: Accepted for interface compatibility (generation is always streamed internally)
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+
+        Returns:
+            Response dict
+        """
+        parts = [token async for token in self.chat_stream(messages, temperature, max_tokens)]
+        return {
+            "model": self.model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(parts)}}]
+        }
+
+    async def generate_response(
+        self,
+        query: str,
+        context: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """
+        Generate a response to a query with optional context
+
+        Args:
+            query: User query
+            context: Optional context/evidence to include
+            system_prompt: Optional system prompt
+            history: Earlier user/assistant messages of the conversation
+
+        Returns:
+            Generated response text
+        """
+        response = await self.chat(build_messages(query, context, system_prompt, history))
+        return response["choices"][0]["message"]["content"]
+
+    async def generate_response_stream(
+        self,
+        query: str,
+        context: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response to a query with optional context
+
+        Args:
+            query: User query
+            context: Optional context/evidence to include
+            system_prompt: Optional system prompt
+            history: Earlier user/assistant messages of the conversation
+
+        Yields:
+            Response text deltas
+        """
+        async for token in self.chat_stream(build_messages(query, context, system_prompt, history)):
+            yield token
+
+    def stats(self) -> Dict[str, Any]:
+        """Get model, queue and throughput statistics"""
+        return {
+            "configured": self.is_configured(),
+            "loaded": self._llm is not None,
+            "model": self.model,
+            "n_ctx": self.n_ctx,
+            "n_threads": self.n_threads,
+            "queue_depth": self._jobs.qsize(),
+            "requests_total": self._requests,
+            "avg_queue_wait_ms": round(self._queue_wait_seconds * 1000 / self._requests, 1) if self._requests else 0.0,
+            "tokens_total": self._tokens,
+            "tokens_per_s": round(self._tokens / self._generation_seconds, 2) if self._generation_seconds else 0.0,
+            "errors_total": self._errors,
+        }
+
+
+# Global instance
+_local_llm_service: Optional[LocalLLMService] = None
+
+def get_local_llm_service() -> LocalLLMService:
+    """Get or create local LLM service instance"""
+    global _local_llm_service
+    if _local_llm_service is None:
+        _local_llm_service = LocalLLMService()
+    return _local_llm_service
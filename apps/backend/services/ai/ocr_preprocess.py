@@ -0,0 +1,253 @@
+"""
+Image preprocessing before OCR
+Vectorized NumPy/Pillow steps that make phone photos and scans cheaper and
+easier for Tesseract: DPI-aware downscaling, grayscale, deskew and adaptive
+(local mean) thresholding.
+"""
+from typing import Any, Dict, Optional, Tuple
+import logging
+import math
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+PREPROCESS_STEPS = ("downscale", "grayscale", "deskew", "threshold")
+
+# Named presets accepted wherever a step list is
+PREPROCESS_PRESETS = {
+    "none": (),
+    "default": ("downscale", "grayscale"),
+    "full": PREPROCESS_STEPS,
+}
+
+class PreprocessOptions:
+    """Which preprocessing steps to run, and their parameters"""
+
+    def __init__(
+        self,
+        steps=PREPROCESS_PRESETS["default"],
+        target_dpi: int = 300,
+        max_side: int = 3500,
+        max_skew: float = 5.0,
+        threshold_window: int = 31,
+        threshold_offset: float = 0.1
+    ):
+        """
+        Initialize preprocessing options
+
+        Args:
+            steps: Subset of PREPROCESS_STEPS (always applied in that order)
+            target_dpi: Resolution to downscale high-DPI scans to
+            max_side: Longest image side after downscaling, for images without
+                usable DPI metadata (3500 px ~ A4 at 300 DPI)
+            max_skew: Largest skew angle searched by deskew, in degrees
+            threshold_window: Local window (pixels at target resolution) for adaptive thresholding
+            threshold_offset: A pixel is ink if darker than (1 - offset) x its local mean
+        """
+        unknown = set(steps) - set(PREPROCESS_STEPS)
+        if unknown:
+            raise ValueError(f"Unknown preprocessing steps: {sorted(unknown)}. Choose from {PREPROCESS_STEPS}")
+        self.steps = tuple(step for step in PREPROCESS_STEPS if step in steps)
+        self.target_dpi = target_dpi
+        self.max_side = max_side
+        self.max_skew = max_skew
+        self.threshold_window = threshold_window
+        self.threshold_offset = threshold_offset
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> "PreprocessOptions":
+        """
+        Build options from a preset name or comma-separated step list
+
+        Args:
+            spec: e.g. "none", "default", "full" or "downscale,deskew";
+                None uses the OCR_PREPROCESS env var (default "default")
+
+        Returns:
+            PreprocessOptions
+        """
+        spec = (spec if spec is not None else os.getenv("OCR_PREPROCESS", "default")).strip().lower()
+        steps = PREPROCESS_PRESETS.get(spec)
+        if steps is None:
+            steps = tuple(step.strip() for step in spec.split(",") if step.strip())
+        return cls(
+            steps,
+            target_dpi=int(os.getenv("OCR_TARGET_DPI", "300")),
+            max_side=int(os.getenv("OCR_MAX_SIDE", "3500"))
+        )
+
+def _downscale_factor(image: Image.Image, options: PreprocessOptions) -> float:
+    """Scale factor (<= 1) from DPI metadata, else from the longest side"""
+    scale = 1.0
+    dpi = image.info.get("dpi")
+    if dpi and float(dpi[0]) > options.target_dpi * 1.1:
+        scale = options.target_dpi / float(dpi[0])
+    longest = max(image.size)
+    if longest * scale > options.max_side:
+        scale = options.max_side / float(longest)
+    return scale
+
+def downscale(image: Image.Image, options: PreprocessOptions) -> Tuple[Image.Image, float]:
+    """
+    Shrink oversized images to OCR resolution
+
+    JPEGs are decoded directly at reduced size (libjpeg DCT scaling) when
+    the image has not been loaded yet, which skips most of the decode work.
+
+    Returns:
+        (image, scale) where scale maps original pixel coordinates to the new image
+    """
+    scale = _downscale_factor(image, options)
+    if scale >= 1.0:
+        return image, 1.0
+    original = image.size
+    target = (max(1, round(original[0] * scale)), max(1, round(original[1] * scale)))
+    if image.format == "JPEG" and getattr(image, "tile", None):  # Not decoded yet
+        image.draft("L" if "grayscale" in options.steps else image.mode, target)
+    if "grayscale" in options.steps:
+        image = to_grayscale(image)  # Resample one channel instead of three
+    if image.size != target:
+        # Pillow filters are area-aware when shrinking, so bilinear is antialiased and ~2.5x faster than Lanczos
+        image = image.resize(target, Image.BILINEAR, reducing_gap=2.0)
+    return image, target[0] / float(original[0])
+
+def to_grayscale(image: Image.Image) -> Image.Image:
+    """Convert to 8-bit grayscale (flattening transparency onto white)"""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        background = Image.new("RGBA", image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image.convert("RGBA"))
+    return image.convert("L")
+
+def _box_sum(values: np.ndarray, half: int, axis: int) -> np.ndarray:
+    """Sum over a centered window of 2 * half + 1 along one axis (clipped at the edges)"""
+    length = values.shape[axis]
+    padded_shape = list(values.shape)
+    padded_shape[axis] += 1
+    cumulative = np.zeros(padded_shape, dtype=np.int32)
+    np.cumsum(values, axis=axis, dtype=np.int32, out=cumulative[1:] if axis == 0 else cumulative[:, 1:])
+    index = np.arange(length)
+    upper = np.minimum(index + half + 1, length)
+    lower = np.maximum(index - half, 0)
+    return np.take(cumulative, upper, axis=axis) - np.take(cumulative, lower, axis=axis)
+
+def adaptive_threshold(gray: np.ndarray, window: int, offset: float) -> np.ndarray:
+    """
+    Binarize with a local-mean threshold (Bradley-Roth)
+
+    Handles uneven lighting that a single global threshold cannot. Window
+    means come from separable running sums, so cost is O(pixels) whatever
+    the window size.
+
+    Args:
+        gray: 2-D uint8 array
+        window: Side of the local window in pixels
+        offset: Fraction below the local mean that counts as ink
+
+    Returns:
+        2-D uint8 array of 0 (ink) and 255 (paper)
+    """
+    height, width = gray.shape
+    half = max(1, window // 2)
+    # Vertical then horizontal pass; int32 holds 255 * window * width comfortably
+    sums = _box_sum(_box_sum(gray, half, axis=0), half, axis=1)
+    rows = np.minimum(np.arange(height) + half + 1, height) - np.maximum(np.arange(height) - half, 0)
+    cols = np.minimum(np.arange(width) + half + 1, width) - np.maximum(np.arange(width) - half, 0)
+    counts = rows[:, None].astype(np.float32) * cols[None, :]
+    return np.where(gray * counts < sums * (1.0 - offset), 0, 255).astype(np.uint8)
+
+def estimate_skew(gray: Image.Image, max_angle: float = 5.0) -> float:
+    """
+    Estimate text skew by maximizing the row-projection variance
+
+    Text lines aligned with the x-axis give sharp peaks in the per-row ink
+    count. Searched coarse-to-fine on a downsampled copy.
+
+    Args:
+        gray: Grayscale image
+        max_angle: Search range in degrees
+
+    Returns:
+        Rotation in degrees (counter-clockwise) that straightens the text
+    """
+    small = gray.copy()
+    small.thumbnail((800, 800))
+    ink = Image.fromarray(np.where(np.asarray(small) < 128, 255, 0).astype(np.uint8))
+
+    def score(angle: float) -> float:
+        profile = np.asarray(ink.rotate(angle, resample=Image.NEAREST, fillcolor=0), dtype=np.float32).sum(axis=1)
+        return float(np.var(profile))
+
+    best = max(np.arange(-max_angle, max_angle + 0.01, 0.5), key=score)
+    best = max(np.arange(best - 0.4, best + 0.41, 0.1), key=score)
+    return round(float(best), 2)
+
+def map_box_to_source(left: float, top: float, width: float, height: float, report: Dict[str, Any]) -> Tuple[int, int, int, int]:
+    """
+    Map a box on the preprocessed image back to the original image
+
+    Undoes the deskew rotation (about the canvas centre, including the
+    expand margin) and then the downscale.
+
+    Args:
+        left, top, width, height: Box on the preprocessed image
+        report: Report from preprocess_image
+
+    Returns:
+        (left, top, width, height) of the axis-aligned bounding box in original pixels
+    """
+    corners = [(left, top), (left + width, top), (left, top + height), (left + width, top + height)]
+    angle = report.get("skew_angle")
+    if angle and report.get("rotated_to"):
+        # PIL rotates counter-clockwise on screen (y down); apply the inverse about the centres
+        theta = math.radians(angle)
+        cos, sin = math.cos(theta), math.sin(theta)
+        to_cx, to_cy = report["rotated_to"][0] / 2.0, report["rotated_to"][1] / 2.0
+        from_cx, from_cy = report["rotated_from"][0] / 2.0, report["rotated_from"][1] / 2.0
+        corners = [
+            (from_cx + cos * (x - to_cx) - sin * (y - to_cy), from_cy + sin * (x - to_cx) + cos * (y - to_cy))
+            for x, y in corners
+        ]
+    scale = report.get("scale", 1.0)
+    xs = [x / scale for x, _ in corners]
+    ys = [y / scale for _, y in corners]
+    x0, y0 = int(round(min(xs))), int(round(min(ys)))
+    return x0, y0, int(round(max(xs))) - x0, int(round(max(ys))) - y0
+
+def preprocess_image(image: Image.Image, options: PreprocessOptions) -> Tuple[Image.Image, Dict[str, Any]]:
+    """
+    Run the enabled preprocessing steps
+
+    Args:
+        image: Input image (ideally not yet loaded, so JPEG draft decoding applies)
+        options: Steps and parameters
+
+    Returns:
+        (processed image, report with applied steps, scale, skew angle and time)
+    """
+    start = time.perf_counter()
+    report: Dict[str, Any] = {"steps": list(options.steps), "scale": 1.0}
+
+    if "downscale" in options.steps:
+        image, report["scale"] = downscale(image, options)
+    if "grayscale" in options.steps or "deskew" in options.steps or "threshold" in options.steps:
+        image = to_grayscale(image)
+    if "deskew" in options.steps:
+        angle = estimate_skew(image, options.max_skew)
+        if angle:
+            # expand=True keeps the corners; the canvas grows, so box mapping needs both sizes
+            report["rotated_from"] = list(image.size)
+            image = image.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+            report["rotated_to"] = list(image.size)
+        report["skew_angle"] = angle
+    if "threshold" in options.steps:
+        image = Image.fromarray(adaptive_threshold(
+            np.asarray(image), options.threshold_window, options.threshold_offset
+        ))
+
+    report["size"] = list(image.size)
+    report["ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return image, report
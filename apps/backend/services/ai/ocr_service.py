@@ -1,35 +1,156 @@
 """
 OCR service for image text extraction
 Uses Tesseract OCR for text recognition
+
+A single Tesseract pass per image: the word table (image_to_data / TSV) gives
+the boxes and the full text is rebuilt from its block/paragraph/line
+numbering. With tesserocr installed, a persistent in-process Tesseract API
+(one per thread) replaces spawning the `tesseract` binary for every call.
 """
 from PIL import Image
 import pytesseract
 from typing import Dict, Any, List, Optional
 import logging
 import io
+import os
+import threading
+
+from .ocr_preprocess import PreprocessOptions, map_box_to_source, preprocess_image
 
 logger = logging.getLogger(__name__)
 
+# Try to import tesserocr (in-process Tesseract API)
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+OCR_BACKENDS = ("auto", "tesserocr", "pytesseract")
+
+# Columns of Tesseract's TSV output (same keys as pytesseract.image_to_data)
+TSV_COLUMNS = (
+    "level", "page_num", "block_num", "par_num", "line_num", "word_num",
+    "left", "top", "width", "height", "conf", "text",
+)
+
+WORD_LEVEL = 5
+
+def parse_tsv(tsv: str) -> Dict[str, List]:
+    """
+    Parse Tesseract TSV output into image_to_data's dict-of-columns form
+
+    Args:
+        tsv: TSV text, with or without the header row
+
+    Returns:
+        Dict mapping each TSV column to a list of values
+    """
+    data: Dict[str, List] = {column: [] for column in TSV_COLUMNS}
+    for row in tsv.splitlines():
+        fields = row.split("\t")
+        if len(fields) < len(TSV_COLUMNS) - 1 or fields[0] == "level":
+            continue
+        fields += [""] * (len(TSV_COLUMNS) - len(fields))  # empty text column may be stripped
+        for column, value in zip(TSV_COLUMNS, fields):
+            data[column].append(value if column == "text" else float(value) if column == "conf" else int(value))
+    return data
+
+def text_from_data(data: Dict[str, List]) -> str:
+    """
+    Rebuild the page text from word-level OCR data
+
+    Words on a line are joined by spaces, lines by newlines, and paragraphs
+    and blocks are separated by a blank line (as image_to_string lays them out).
+
+    Args:
+        data: image_to_data-style dict
+
+    Returns:
+        Full text
+    """
+    paragraphs: List[List[str]] = []
+    current_paragraph = None
+    current_line = None
+    words: List[str] = []
+
+    for i, text in enumerate(data["text"]):
+        text = str(text).strip()
+        if not text or int(data["level"][i]) != WORD_LEVEL:
+            continue
+        paragraph = (data["page_num"][i], data["block_num"][i], data["par_num"][i])
+        line = paragraph + (data["line_num"][i],)
+        if line != current_line:
+            if words:
+                paragraphs[-1].append(" ".join(words))
+            words = []
+            current_line = line
+            if paragraph != current_paragraph:
+                paragraphs.append([])
+                current_paragraph = paragraph
+        words.append(text)
+    if words:
+        paragraphs[-1].append(" ".join(words))
+
+    return "\n\n".join("\n".join(lines) for lines in paragraphs)
+
 class OCRService:
     """Image text extraction using Tesseract OCR"""
     
-    def __init__(self, tesseract_cmd: Optional[str] = None, lang: str = "eng"):
+    def __init__(self, tesseract_cmd: Optional[str] = None, lang: str = "eng", backend: Optional[str] = None):
         """
         Initialize OCR service
         
         Args:
             tesseract_cmd: Path to tesseract executable (if not in PATH)
             lang: Language code (e.g., 'eng', 'kor', 'eng+kor' for multiple)
+            backend: 'auto' (tesserocr if installed), 'tesserocr' or 'pytesseract';
+                defaults to OCR_BACKEND env var
         """
         if tesseract_cmd:
             pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
         self.lang = lang
-        logger.info(f"OCR service initialized with language: {lang}")
+        
+        self.backend = self.resolve_backend(backend)
+        # tesserocr API handles are not thread-safe: one per worker thread and language
+        self._local = threading.local()
+        
+        logger.info(f"OCR service initialized with language: {lang}, backend: {self.backend}")
+    
+    @staticmethod
+    def resolve_backend(backend: Optional[str] = None) -> str:
+        """Backend name after applying OCR_BACKEND and 'auto' detection"""
+        backend = (backend or os.getenv("OCR_BACKEND", "auto")).lower()
+        if backend not in OCR_BACKENDS:
+            raise ValueError(f"Unknown OCR backend: {backend}. Choose from {OCR_BACKENDS}")
+        if backend == "tesserocr" and not TESSEROCR_AVAILABLE:
+            raise ImportError("tesserocr is not installed. Install with: pip install tesserocr")
+        return "tesserocr" if backend != "pytesseract" and TESSEROCR_AVAILABLE else "pytesseract"
+    
+    def _tesserocr_api(self, lang: str):
+        """Get this thread's persistent Tesseract API for a language"""
+        apis = getattr(self._local, "apis", None)
+        if apis is None:
+            apis = self._local.apis = {}
+        api = apis.get(lang)
+        if api is None:
+            api = tesserocr.PyTessBaseAPI(lang=lang)
+            apis[lang] = api
+        return api
+    
+    def _image_to_data(self, image: Image.Image, lang: str) -> Dict[str, List]:
+        """Run one Tesseract recognition pass and return the word table"""
+        if self.backend == "tesserocr":
+            api = self._tesserocr_api(lang)
+            api.SetImage(image)
+            return parse_tsv(api.GetTSVText(0))
+        return pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
     
     def extract_text(
         self, 
         image_bytes: bytes,
-        lang: Optional[str] = None
+        lang: Optional[str] = None,
+        preprocess: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Extract text from image bytes
@@ -37,35 +158,63 @@ class OCRService:
         Args:
             image_bytes: Image file bytes
             lang: Language code (overrides default if provided)
+            preprocess: Preprocessing preset or step list (see PreprocessOptions.parse)
         
         Returns:
             Dict with text, confidence, bounding boxes, word count
         """
+        try:
+            # Load image from bytes (decoding is deferred so preprocessing can draft-decode JPEGs)
+            image = Image.open(io.BytesIO(image_bytes))
+        except Exception as e:
+            logger.error(f"OCR extraction failed: {e}", exc_info=True)
+            return self._error_result(e, lang)
+        return self.extract_text_from_image(image, lang, preprocess)
+    
+    def extract_text_from_image(
+        self,
+        image: Image.Image,
+        lang: Optional[str] = None,
+        preprocess: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract text from a decoded image (e.g. one page of a multi-page scan)
+        
+        Box coordinates are mapped back to the input image (undoing downscale
+        and deskew); a deskewed word's box is the upright bounds of its rotated box.
+        
+        Args:
+            image: PIL image
+            lang: Language code (overrides default if provided)
+            preprocess: Preprocessing preset or step list (see PreprocessOptions.parse)
+        
+        Returns:
+            Dict with text, confidence, bounding boxes, word count and a preprocessing report
+        """
         try:
             # Use provided language or default
             ocr_lang = lang or self.lang
             
-            # Load image from bytes
-            image = Image.open(io.BytesIO(image_bytes))
+            original_size = image.size
+            image, report = preprocess_image(image, PreprocessOptions.parse(preprocess))
             
-            logger.info(f"Running OCR on image: {image.size[0]}x{image.size[1]} pixels, lang: {ocr_lang}")
-            
-            # Get detailed data with bounding boxes
-            data = pytesseract.image_to_data(
-                image,
-                lang=ocr_lang,
-                output_type=pytesseract.Output.DICT
+            logger.info(
+                f"Running OCR on image: {original_size[0]}x{original_size[1]} pixels "
+                f"(preprocessed to {image.size[0]}x{image.size[1]}), lang: {ocr_lang}"
             )
             
-            # Extract full text
-            text = pytesseract.image_to_string(image, lang=ocr_lang)
+            # Single pass: word table with bounding boxes and layout numbering
+            data = self._image_to_data(image, ocr_lang)
+            
+            # Rebuild the full text from the same pass (no second image_to_string run)
+            text = text_from_data(data)
             
             # Calculate average confidence
-            confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
+            confidences = [float(conf) for conf in data['conf'] if float(conf) > 0]
             avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
             
             # Extract bounding boxes for words
-            boxes = self._extract_boxes(data)
+            boxes = self._extract_boxes(data, report)
             
             # Count words
             words = [w for w in data['text'] if w.strip()]
@@ -77,6 +226,7 @@ class OCRService:
                 "language": ocr_lang,
                 "word_count": word_count,
                 "boxes": boxes,
+                "preprocessing": report,
             }
             
             logger.info(f"OCR complete: {word_count} words, confidence: {response['confidence']:.2f}")
@@ -84,32 +234,38 @@ class OCRService:
             
         except Exception as e:
             logger.error(f"OCR extraction failed: {e}", exc_info=True)
-            return {
-                "text": "",
-                "confidence": 0.0,
-                "language": lang or self.lang,
-                "word_count": 0,
-                "boxes": [],
-                "error": str(e)
-            }
+            return self._error_result(e, lang)
+    
+    def _error_result(self, error: Exception, lang: Optional[str]) -> Dict[str, Any]:
+        return {
+            "text": "",
+            "confidence": 0.0,
+            "language": lang or self.lang,
+            "word_count": 0,
+            "boxes": [],
+            "error": str(error)
+        }
     
-    def _extract_boxes(self, data: Dict) -> List[Dict[str, Any]]:
-        """Extract bounding boxes for detected words"""
+    def _extract_boxes(self, data: Dict, report: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Extract bounding boxes for detected words, in original image coordinates (see map_box_to_source)"""
         boxes = []
         n_boxes = len(data['text'])
         
         for i in range(n_boxes):
-            conf = int(data['conf'][i])
+            conf = float(data['conf'][i])
             text = data['text'][i].strip()
             
             # Only include boxes with text and confidence > 0
             if conf > 0 and text:
+                left, top, width, height = map_box_to_source(
+                    int(data['left'][i]), int(data['top'][i]), int(data['width'][i]), int(data['height'][i]), report or {}
+                )
                 boxes.append({
                     "text": text,
-                    "left": int(data['left'][i]),
-                    "top": int(data['top'][i]),
-                    "width": int(data['width'][i]),
-                    "height": int(data['height'][i]),
+                    "left": left,
+                    "top": top,
+                    "width": width,
+                    "height": height,
                     "confidence": round(conf / 100.0, 3),  # Normalize to 0-1
                     "level": int(data['level'][i]),  # 5 = word level
                 })
@@ -0,0 +1,135 @@
+"""
+Image preparation before vision API calls
+Sniffs the real format from magic bytes and shrinks images to the largest
+resolution the provider actually uses, so a 12 MP phone photo is not
+base64-encoded and uploaded only to be downsampled server-side.
+"""
+from typing import Any, Dict, Optional, Tuple
+import io
+import logging
+import math
+import os
+import time
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Formats every supported provider accepts as-is
+SUPPORTED_FORMATS = ("jpeg", "png", "gif", "webp")
+
+# Resolution the provider resizes to anyway (larger inputs only cost upload time):
+#   max_side / min_side: longest and shortest side; max_pixels: total area;
+#   max_bytes: hard per-image request limit
+PROVIDER_LIMITS = {
+    # High-detail mode: fit in 2048x2048, then shortest side 768
+    "openai": {"max_side": 2048, "min_side": 768, "max_pixels": None, "max_bytes": 20 * 1024 * 1024},
+    # Long edge 1568 px and ~1.15 MP before the model downsamples
+    "anthropic": {"max_side": 1568, "min_side": None, "max_pixels": 1_150_000, "max_bytes": 5 * 1024 * 1024},
+}
+
+def detect_image_format(data: bytes) -> Optional[str]:
+    """
+    Identify an image format from its magic bytes
+
+    Args:
+        data: Encoded image bytes
+
+    Returns:
+        "jpeg", "png", "gif", "webp", "tiff", "bmp", or None if unrecognized
+    """
+    if data[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if data[:4] in (b"II*\x00", b"MM\x00*"):
+        return "tiff"
+    if data[:2] == b"BM":
+        return "bmp"
+    return None
+
+def target_scale(size: Tuple[int, int], limits: Dict[str, Any]) -> float:
+    """Scale factor (<= 1) that fits an image within a provider's limits"""
+    width, height = size
+    scale = 1.0
+    if limits.get("max_side"):
+        scale = min(scale, limits["max_side"] / float(max(width, height)))
+    if limits.get("min_side"):
+        scale = min(scale, limits["min_side"] / float(min(width, height)))
+    if limits.get("max_pixels"):
+        scale = min(scale, math.sqrt(limits["max_pixels"] / float(width * height)))
+    return scale
+
+def prepare_image(
+    data: bytes,
+    provider: str,
+    quality: Optional[int] = None
+) -> Tuple[bytes, str, Dict[str, Any]]:
+    """
+    Fit an image to the provider's optimal resolution and a supported format
+
+    Images already small enough, in a supported format and under the byte
+    limit are passed through untouched. Others are EXIF-rotated, resized and
+    re-encoded as JPEG (PNG if they have transparency).
+
+    Args:
+        data: Encoded image bytes
+        provider: Key of PROVIDER_LIMITS
+        quality: JPEG quality for re-encoding (default VISION_JPEG_QUALITY or 85)
+
+    Returns:
+        (image bytes, media type, report with format, sizes and time)
+
+    Raises:
+        ValueError: If the bytes are not a decodable image
+    """
+    start = time.perf_counter()
+    limits = PROVIDER_LIMITS[provider]
+    quality = quality or int(os.getenv("VISION_JPEG_QUALITY", "85"))
+    source_format = detect_image_format(data)
+
+    try:
+        image = Image.open(io.BytesIO(data))
+    except Exception as e:
+        raise ValueError(f"Unrecognized image data: {e}")
+
+    scale = target_scale(image.size, limits)
+    report: Dict[str, Any] = {
+        "source_format": source_format,
+        "source_size": list(image.size),
+        "source_bytes": len(data),
+    }
+    if scale >= 1.0 and source_format in SUPPORTED_FORMATS and len(data) <= limits["max_bytes"]:
+        report.update({"size": list(image.size), "bytes": len(data), "reencoded": False,
+                       "ms": round((time.perf_counter() - start) * 1000, 1)})
+        return data, f"image/{source_format}", report
+
+    if scale < 1.0 and image.format == "JPEG" and getattr(image, "tile", None):  # Not decoded yet
+        # libjpeg DCT scaling skips most of the decode (result is still >= the target)
+        image.draft("RGB", (round(image.width * scale), round(image.height * scale)))
+
+    image = ImageOps.exif_transpose(image)  # Orientation is lost when metadata is dropped
+    transparent = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if transparent else "RGB")
+    scale = target_scale(image.size, limits)
+    if scale < 1.0:
+        target = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(target, Image.BILINEAR, reducing_gap=2.0)
+
+    buffer = io.BytesIO()
+    if transparent:
+        image.save(buffer, format="PNG")
+        media_type = "image/png"
+    else:
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)
+        media_type = "image/jpeg"
+    prepared = buffer.getvalue()
+
+    report.update({"size": list(image.size), "bytes": len(prepared), "reencoded": True,
+                   "ms": round((time.perf_counter() - start) * 1000, 1)})
+    logger.debug(f"Vision image {report['source_size']} {len(data)} B -> {report['size']} {len(prepared)} B")
+    return prepared, media_type, report
@@ -4,9 +4,11 @@ Uses OpenAI GPT-4V or Anthropic Claude for image analysis
 """
 import os
 from typing import Dict, Any, Optional
+import asyncio
 import logging
 import base64
-from pathlib import Path
+
+from .vision_image import PROVIDER_LIMITS, prepare_image
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +24,15 @@ class VisionService:
             api_key: API key (if None, reads from environment)
         """
         self.provider = provider.lower()
+        self.async_client = None
+        # Bounds in-flight API calls on the async path (the sync path is bounded by its thread pool)
+        self._semaphore = asyncio.Semaphore(int(os.getenv("VISION_MAX_CONCURRENCY", "4")))
         
         if self.provider == "openai":
             try:
-                from openai import OpenAI
+                from openai import OpenAI, AsyncOpenAI
                 self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+                self.async_client = AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
                 self.model = "gpt-4o"  # or "gpt-4-vision-preview"
                 logger.info("Vision service initialized with OpenAI")
             except ImportError:
@@ -35,8 +41,9 @@ class VisionService:
                 
         elif self.provider == "anthropic":
             try:
-                from anthropic import Anthropic
+                from anthropic import Anthropic, AsyncAnthropic
                 self.client = Anthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"))
+                self.async_client = AsyncAnthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"))
                 self.model = "claude-3-5-sonnet-20241022"  # or "claude-3-opus-20240229"
                 logger.info("Vision service initialized with Anthropic")
             except ImportError:
@@ -45,91 +52,178 @@ class VisionService:
         else:
             raise ValueError(f"Unknown provider: {provider}. Use 'openai' or 'anthropic'")
     
+    def cache_params(self) -> Dict[str, Any]:
+        """Settings that determine a description (part of the ingest cache key)"""
+        return {
+            "provider": self.provider,
+            "model": getattr(self, "model", None),
+            "limits": PROVIDER_LIMITS[self.provider],
+            "quality": int(os.getenv("VISION_JPEG_QUALITY", "85")),
+        }
+    
+    def prepare(self, image_bytes: bytes) -> Dict[str, Any]:
+        """
+        Sniff, downscale and re-encode an image for this provider (CPU-bound)
+        
+        Args:
+            image_bytes: Image file bytes
+        
+        Returns:
+            Dict with base64 `data`, `media_type` and a size/format `report`
+        
+        Raises:
+            ValueError: If the bytes are not a decodable image
+        """
+        data, media_type, report = prepare_image(image_bytes, self.provider)
+        return {"data": base64.b64encode(data).decode("utf-8"), "media_type": media_type, "report": report}
+    
+    def _request(self, prepared: Dict[str, Any], prompt: str, max_tokens: int) -> Dict[str, Any]:
+        """Provider request arguments for one image"""
+        if self.provider == "openai":
+            return {
+                "model": self.model,
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": prompt},
+                            {
+                                "type": "image_url",
+                                "image_url": {
+                                    "url": f"data:{prepared['media_type']};base64,{prepared['data']}"
+                                }
+                            }
+                        ]
+                    }
+                ],
+                "max_tokens": max_tokens,
+            }
+        return {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "image",
+                            "source": {
+                                "type": "base64",
+                                "media_type": prepared["media_type"],
+                                "data": prepared["data"],
+                            }
+                        },
+                        {"type": "text", "text": prompt}
+                    ]
+                }
+            ]
+        }
+    
+    def _result(self, response: Any, prepared: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a provider response to the service result"""
+        usage = getattr(response, "usage", None)
+        if self.provider == "openai":
+            description = response.choices[0].message.content
+            tokens_used = getattr(usage, "total_tokens", 0) or 0
+        else:  # anthropic
+            description = response.content[0].text
+            tokens_used = (getattr(usage, "input_tokens", 0) or 0) + (getattr(usage, "output_tokens", 0) or 0)
+        
+        logger.info(f"Vision analysis complete: {len(description)} characters")
+        return {
+            "description": description,
+            "provider": self.provider,
+            "model": self.model,
+            "tokens_used": tokens_used,
+            "image": prepared["report"],
+        }
+    
+    def _client_error(self) -> Dict[str, Any]:
+        return {
+            "description": "",
+            "provider": self.provider,
+            "error": f"{self.provider.capitalize()} client not initialized. Check API key and library installation."
+        }
+    
     def describe_image(
         self, 
         image_bytes: bytes,
         prompt: str = "Describe this image in detail. Include any text, objects, layout, and context.",
-        max_tokens: int = 300
+        max_tokens: int = 300,
+        prepared: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
-        Get detailed description of image
+        Get detailed description of image (blocking; use describe_image_async from async code)
         
         Args:
             image_bytes: Image file bytes
             prompt: Custom prompt for description
             max_tokens: Maximum tokens in response
+            prepared: Output of prepare() if already computed
         
         Returns:
             Dict with description and metadata
         """
         if not self.client:
-            return {
-                "description": "",
-                "provider": self.provider,
-                "error": f"{self.provider.capitalize()} client not initialized. Check API key and library installation."
-            }
+            return self._client_error()
         
         try:
-            # Encode image to base64
-            image_data = base64.b64encode(image_bytes).decode('utf-8')
-            
-            # Determine image format (simplified - assumes JPEG/PNG)
-            image_format = "jpeg"  # Default, could be detected from bytes
-            
+            prepared = prepared or self.prepare(image_bytes)
             logger.info(f"Analyzing image with {self.provider} ({self.model})")
             
+            request = self._request(prepared, prompt, max_tokens)
             if self.provider == "openai":
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {"type": "text", "text": prompt},
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/{image_format};base64,{image_data}"
-                                    }
-                                }
-                            ]
-                        }
-                    ],
-                    max_tokens=max_tokens,
-                )
-                description = response.choices[0].message.content
-                
+                response = self.client.chat.completions.create(**request)
             else:  # anthropic
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=max_tokens,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "image",
-                                    "source": {
-                                        "type": "base64",
-                                        "media_type": f"image/{image_format}",
-                                        "data": image_data,
-                                    }
-                                },
-                                {"type": "text", "text": prompt}
-                            ]
-                        }
-                    ]
-                )
-                description = response.content[0].text
-            
-            logger.info(f"Vision analysis complete: {len(description)} characters")
+                response = self.client.messages.create(**request)
+            return self._result(response, prepared)
             
+        except Exception as e:
+            logger.error(f"Vision analysis failed: {e}", exc_info=True)
             return {
-                "description": description,
+                "description": "",
                 "provider": self.provider,
-                "model": self.model,
-                "tokens_used": getattr(response, 'usage', {}).get('total_tokens', 0) if hasattr(response, 'usage') else 0
+                "error": str(e)
             }
+    
+    async def describe_image_async(
+        self,
+        image_bytes: bytes,
+        prompt: str = "Describe this image in detail. Include any text, objects, layout, and context.",
+        max_tokens: int = 300,
+        prepared: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get detailed description of image without blocking the event loop
+        
+        Uses the provider's async client; image preparation runs in a worker
+        thread unless `prepared` is given.
+        
+        Args:
+            image_bytes: Image file bytes
+            prompt: Custom prompt for description
+            max_tokens: Maximum tokens in response
+            prepared: Output of prepare() if already computed
+        
+        Returns:
+            Dict with description and metadata
+        """
+        if not self.async_client:
+            if not self.client:
+                return self._client_error()
+            return await asyncio.to_thread(self.describe_image, image_bytes, prompt, max_tokens, prepared)
+        
+        try:
+            prepared = prepared or await asyncio.to_thread(self.prepare, image_bytes)
+            logger.info(f"Analyzing image with {self.provider} ({self.model})")
+            
+            request = self._request(prepared, prompt, max_tokens)
+            async with self._semaphore:
+                if self.provider == "openai":
+                    response = await self.async_client.chat.completions.create(**request)
+                else:  # anthropic
+                    response = await self.async_client.messages.create(**request)
+            return self._result(response, prepared)
             
         except Exception as e:
             logger.error(f"Vision analysis failed: {e}", exc_info=True)
@@ -1,79 +1,200 @@
 """
 Whisper-based audio transcription service
-Uses OpenAI Whisper for speech-to-text conversion
+Pluggable speech-to-text backends:
+- openai: OpenAI Whisper on PyTorch
+- faster-whisper: CTranslate2 (int8 on CPU) with VAD-based silence skipping
 """
-import whisper
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 import logging
-import tempfile
 import os
 
+import numpy as np
+
+from ..core.audio_decode import AudioInput, duration_seconds, ensure_samples
+
 logger = logging.getLogger(__name__)
 
+STT_BACKENDS = ("openai", "faster-whisper")
+
+def faster_whisper_available() -> bool:
+    """Check if the faster-whisper package can be imported"""
+    try:
+        import faster_whisper  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class OpenAIWhisperBackend:
+    """OpenAI Whisper (PyTorch) backend"""
+    
+    name = "openai"
+    
+    def __init__(self, model_size: str):
+        import whisper  # Imported lazily: pulls in PyTorch
+        self.model = whisper.load_model(model_size)
+    
+    def transcribe(self, samples: np.ndarray, language: Optional[str] = None, task: str = "transcribe") -> Dict[str, Any]:
+        """Transcribe samples, returning Whisper's result dict (text, language, segments)"""
+        return self.model.transcribe(
+            samples,
+            language=language,
+            task=task,
+            verbose=False,
+            fp16=False  # Use fp32 for better compatibility
+        )
+
+class FasterWhisperBackend:
+    """faster-whisper (CTranslate2) backend, int8 on CPU by default"""
+    
+    name = "faster-whisper"
+    
+    def __init__(
+        self,
+        model_size: str,
+        use_gpu: bool = False,
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        beam_size: int = 1,
+        vad_filter: bool = True,
+        min_silence_ms: int = 500
+    ):
+        """
+        Initialize faster-whisper backend
+        
+        Args:
+            model_size: Model size or path to a converted CTranslate2 model
+            use_gpu: Run on CUDA (compute_type should then be float16 / int8_float16)
+            compute_type: CTranslate2 compute type (int8, int8_float32, float32, ...)
+            cpu_threads: Intra-op threads (0 = CTranslate2 default)
+            beam_size: Beam width (1 = greedy, like openai-whisper's default)
+            vad_filter: Skip silence with the Silero VAD before decoding
+            min_silence_ms: Minimum silence length the VAD removes
+        """
+        from faster_whisper import WhisperModel
+        
+        self.beam_size = beam_size
+        self.vad_filter = vad_filter
+        self.min_silence_ms = min_silence_ms
+        self.model = WhisperModel(
+            model_size,
+            device="cuda" if use_gpu else "cpu",
+            compute_type=compute_type,
+            cpu_threads=cpu_threads
+        )
+    
+    def transcribe(self, samples: np.ndarray, language: Optional[str] = None, task: str = "transcribe") -> Dict[str, Any]:
+        """Transcribe samples, returning a dict in openai-whisper's result shape"""
+        segments, info = self.model.transcribe(
+            samples,
+            language=language,
+            task=task,
+            beam_size=self.beam_size,
+            vad_filter=self.vad_filter,
+            vad_parameters={"min_silence_duration_ms": self.min_silence_ms}
+        )
+        # Segments are produced lazily while decoding
+        segments = [
+            {"start": seg.start, "end": seg.end, "text": seg.text, "no_speech_prob": seg.no_speech_prob}
+            for seg in segments
+        ]
+        return {
+            "text": "".join(seg["text"] for seg in segments),
+            "language": info.language,
+            "segments": segments,
+            # Everything filtered out by the VAD counts as no speech
+            "no_speech_prob": float(np.mean([seg["no_speech_prob"] for seg in segments])) if segments else 1.0,
+            "duration_after_vad": getattr(info, "duration_after_vad", None),
+        }
+
 class WhisperService:
-    """Audio transcription using OpenAI Whisper"""
+    """Audio transcription using a Whisper backend"""
     
     _model_cache = {}  # Cache loaded models
     
-    def __init__(self, model_size: str = "base", use_gpu: bool = True):
+    def __init__(self, model_size: str = "base", use_gpu: bool = True, backend: Optional[str] = None):
         """
         Initialize Whisper service
         
         Args:
             model_size: Model size - tiny, base, small, medium, large, or large-v2
             use_gpu: Whether to use GPU if available
+            backend: 'openai', 'faster-whisper' or 'auto' (faster-whisper if installed).
+                Defaults to STT_BACKEND env var, then 'auto'
         """
         self.model_size = model_size
         self.use_gpu = use_gpu
+        self.backend = self.resolve_backend(backend)
         
-        # Load model (cached per size)
-        if model_size not in self._model_cache:
-            logger.info(f"Loading Whisper model: {model_size}")
-            self.model = whisper.load_model(model_size)
-            self._model_cache[model_size] = self.model
+        # Load model (cached per backend and configuration)
+        options = self.backend_options(self.backend, use_gpu)
+        cache_key = (self.backend, model_size, tuple(sorted(options.items())))
+        if cache_key not in self._model_cache:
+            logger.info(f"Loading Whisper model: {model_size} (backend: {self.backend})")
+            self.model = self._load_backend(options)
+            self._model_cache[cache_key] = self.model
             logger.info(f"Whisper model {model_size} loaded successfully")
         else:
-            self.model = self._model_cache[model_size]
+            self.model = self._model_cache[cache_key]
             logger.info(f"Using cached Whisper model: {model_size}")
     
+    @staticmethod
+    def resolve_backend(backend: Optional[str] = None) -> str:
+        """Backend name after applying STT_BACKEND and 'auto' detection"""
+        backend = (backend or os.getenv("STT_BACKEND", "auto")).lower()
+        if backend == "auto":
+            backend = "faster-whisper" if faster_whisper_available() else "openai"
+        if backend not in STT_BACKENDS:
+            raise ValueError(f"Unknown STT backend: {backend}. Use 'openai', 'faster-whisper' or 'auto'")
+        return backend
+    
+    @staticmethod
+    def backend_options(backend: str, use_gpu: bool = True) -> Dict[str, Any]:
+        """Backend options from STT_* environment variables (FasterWhisperBackend only)"""
+        if backend != "faster-whisper":
+            return {}
+        use_gpu = use_gpu and os.getenv("STT_DEVICE", "cpu").lower() == "cuda"
+        return {
+            "use_gpu": use_gpu,
+            "compute_type": os.getenv("STT_COMPUTE_TYPE", "float16" if use_gpu else "int8"),
+            "cpu_threads": int(os.getenv("STT_CPU_THREADS", "0")),
+            "beam_size": int(os.getenv("STT_BEAM_SIZE", "1")),
+            "vad_filter": os.getenv("STT_VAD", "true").lower() in ("1", "true", "yes"),
+            "min_silence_ms": int(os.getenv("STT_VAD_MIN_SILENCE_MS", "500")),
+        }
+    
+    def _load_backend(self, options: Dict[str, Any]):
+        if self.backend == "faster-whisper":
+            return FasterWhisperBackend(self.model_size, **options)
+        return OpenAIWhisperBackend(self.model_size)
+    
     def transcribe(
         self, 
-        audio_bytes: bytes,
+        audio: AudioInput,
         audio_format: str = "wav",
         language: Optional[str] = None,
         task: str = "transcribe"
     ) -> Dict[str, Any]:
         """
-        Transcribe audio bytes to text
+        Transcribe audio to text
         
         Args:
-            audio_bytes: Audio file bytes
-            audio_format: Audio format (wav, mp3, etc.)
+            audio: Audio file bytes, or float32 16 kHz mono samples from decode_audio
+            audio_format: Audio format hint (the container is detected from the bytes)
             language: Language code (e.g., 'en', 'ko') or None for auto-detect
             task: 'transcribe' or 'translate' (translate to English)
         
         Returns:
             Dict with text, language, segments, confidence, etc.
         """
-        temp_path = None
         try:
-            # Save audio bytes to temporary file
-            suffix = f".{audio_format}" if not audio_format.startswith('.') else audio_format
-            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-                temp_file.write(audio_bytes)
-                temp_path = temp_file.name
+            # Decode in memory (no temp file / ffmpeg re-read of a file)
+            samples = ensure_samples(audio)
             
-            logger.info(f"Transcribing audio: {temp_path} (size: {len(audio_bytes)} bytes)")
+            logger.info(f"Transcribing audio: {duration_seconds(samples):.1f}s ({audio_format})")
             
             # Transcribe with Whisper
-            result = self.model.transcribe(
-                temp_path,
-                language=language,
-                task=task,
-                verbose=False,
-                fp16=False  # Use fp32 for better compatibility
-            )
+            result = self.model.transcribe(samples, language=language, task=task)
             
             # Format response
             response = {
@@ -103,24 +224,17 @@ class WhisperService:
                 "confidence": 0.0,
                 "error": str(e)
             }
-        finally:
-            # Clean up temp file
-            if temp_path and os.path.exists(temp_path):
-                try:
-                    os.unlink(temp_path)
-                except Exception as e:
-                    logger.warning(f"Failed to delete temp file {temp_path}: {e}")
     
-    def translate(self, audio_bytes: bytes, audio_format: str = "wav", language: Optional[str] = None) -> Dict[str, Any]:
+    def translate(self, audio: AudioInput, audio_format: str = "wav", language: Optional[str] = None) -> Dict[str, Any]:
         """
         Translate audio to English
         
         Args:
-            audio_bytes: Audio file bytes
+            audio: Audio file bytes or decoded samples
             audio_format: Audio format
             language: Source language code (optional, auto-detect if None)
         
         Returns:
             Dict with translated text and metadata
         """
-        return self.transcribe(audio_bytes, audio_format=audio_format, language=language, task="translate")
+        return self.transcribe(audio, audio_format=audio_format, language=language, task="translate")
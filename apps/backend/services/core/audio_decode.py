@@ -0,0 +1,144 @@
+"""
+In-memory audio decoding
+Decodes uploaded audio bytes once into the float32 16 kHz mono array that
+Whisper and emotion analysis consume, without temp files: PCM WAV is parsed
+natively, anything else is piped through ffmpeg stdin/stdout.
+"""
+from math import gcd
+from typing import Union
+import io
+import logging
+import shutil
+import subprocess
+import wave
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Try to import scipy for polyphase resampling of WAV input
+try:
+    from scipy.signal import resample_poly
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+SAMPLE_RATE = 16000  # Whisper's expected input rate
+
+AudioInput = Union[bytes, np.ndarray]
+
+def _is_wav(audio_bytes: bytes) -> bool:
+    return len(audio_bytes) >= 12 and audio_bytes[:4] == b"RIFF" and audio_bytes[8:12] == b"WAVE"
+
+def _pcm_to_float(frames: bytes, sample_width: int) -> np.ndarray:
+    """Convert interleaved little-endian PCM to float32 in [-1, 1]"""
+    if sample_width == 1:
+        # 8-bit WAV is unsigned
+        return (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    if sample_width == 2:
+        return np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    if sample_width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        ints = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8) | (raw[:, 2].astype(np.int32) << 16))
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+        return ints.astype(np.float32) / float(1 << 23)
+    if sample_width == 4:
+        return np.frombuffer(frames, dtype="<i4").astype(np.float32) / float(1 << 31)
+    raise ValueError(f"Unsupported WAV sample width: {sample_width} bytes")
+
+def _decode_wav(audio_bytes: bytes, sample_rate: int) -> np.ndarray:
+    """
+    Parse PCM WAV in-process
+
+    Raises:
+        wave.Error / ValueError: If the WAV is not plain PCM or needs resampling without scipy
+    """
+    with wave.open(io.BytesIO(audio_bytes), "rb") as wav:
+        channels = wav.getnchannels()
+        source_rate = wav.getframerate()
+        sample_width = wav.getsampwidth()
+        frames = wav.readframes(wav.getnframes())
+
+    if source_rate != sample_rate and not SCIPY_AVAILABLE:
+        raise ValueError(f"Resampling {source_rate} Hz WAV requires scipy")
+
+    samples = _pcm_to_float(frames, sample_width)
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+
+    if source_rate != sample_rate:
+        samples = resample(samples, source_rate, sample_rate)
+    return np.ascontiguousarray(samples, dtype=np.float32)
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Polyphase resampling of mono float samples
+
+    Raises:
+        ValueError: If scipy is not installed
+    """
+    if source_rate == target_rate:
+        return samples
+    if not SCIPY_AVAILABLE:
+        raise ValueError(f"Resampling {source_rate} Hz audio requires scipy")
+    divisor = gcd(source_rate, target_rate)
+    return resample_poly(samples, target_rate // divisor, source_rate // divisor).astype(np.float32)
+
+def _decode_ffmpeg(audio_bytes: bytes, sample_rate: int) -> np.ndarray:
+    """Decode any ffmpeg-supported format through stdin/stdout pipes"""
+    if shutil.which("ffmpeg") is None:
+        raise ValueError("ffmpeg is not installed; only PCM WAV audio can be decoded")
+    command = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error", "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate),
+        "pipe:1",
+    ]
+    process = subprocess.run(command, input=audio_bytes, capture_output=True)
+    if process.returncode != 0:
+        message = process.stderr.decode("utf-8", errors="replace").strip().splitlines()
+        raise ValueError(f"ffmpeg could not decode audio: {message[-1] if message else process.returncode}")
+    return np.frombuffer(process.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+def decode_audio(audio_bytes: bytes, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode audio bytes to a mono float32 array
+
+    Args:
+        audio_bytes: Encoded audio (WAV, MP3, OGG, FLAC, WebM, ...)
+        sample_rate: Target sample rate
+
+    Returns:
+        Mono float32 samples in [-1, 1] at `sample_rate`
+
+    Raises:
+        ValueError: If the audio is empty or cannot be decoded
+    """
+    if not audio_bytes:
+        raise ValueError("Empty audio")
+    if _is_wav(audio_bytes):
+        try:
+            return _decode_wav(audio_bytes, sample_rate)
+        except (wave.Error, ValueError, EOFError) as e:
+            # Float/compressed WAV variants, or resampling without scipy
+            logger.debug(f"WAV fast path unavailable ({e}); decoding with ffmpeg")
+    return _decode_ffmpeg(audio_bytes, sample_rate)
+
+def ensure_samples(audio: AudioInput, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Return decoded samples, decoding only if given raw bytes
+
+    Args:
+        audio: Encoded audio bytes or already decoded samples
+        sample_rate: Target sample rate when decoding
+
+    Returns:
+        Mono float32 samples
+    """
+    if isinstance(audio, np.ndarray):
+        return audio.astype(np.float32, copy=False)
+    return decode_audio(audio, sample_rate)
+
+def duration_seconds(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> float:
+    """Duration of decoded samples in seconds"""
+    return len(samples) / float(sample_rate)
@@ -1,25 +1,25 @@
 """
 Audio emotion analysis service with dummy implementation
 """
-import tempfile
-import os
 from typing import Dict, Any
 
-async def predict_emotion_from_wav(audio_bytes: bytes) -> Dict[str, Any]:
+from .audio_decode import AudioInput, ensure_samples
+
+async def predict_emotion_from_wav(audio: AudioInput) -> Dict[str, Any]:
     """
-    Predict emotion from audio bytes
+    Predict emotion from audio
     
     Args:
-        audio_bytes: Audio file bytes
+        audio: Audio file bytes, or samples already decoded with decode_audio
+            (pass the samples shared with STT to avoid decoding twice)
         
     Returns:
         Dict with emotion label and confidence score
     """
     try:
-        # Save audio to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-            temp_file.write(audio_bytes)
-            temp_path = temp_file.name
+        samples = ensure_samples(audio)
+        if samples.size == 0:
+            raise ValueError("Empty audio")
         
         # Dummy implementation - replace with actual emotion model
         result = {
@@ -33,9 +33,6 @@ async def predict_emotion_from_wav(audio_bytes: bytes) -> Dict[str, Any]:
             }
         }
         
-        # Clean up temp file
-        os.unlink(temp_path)
-        
         return result
         
     except Exception as e:
@@ -43,4 +40,4 @@ async def predict_emotion_from_wav(audio_bytes: bytes) -> Dict[str, Any]:
             "label": "error",
             "score": 0.0,
             "error": str(e)
-        }
\ No newline at end of file
+        }
@@ -3,7 +3,10 @@ Speech-to-Text service using Whisper
 """
 from typing import Dict, Any
 import logging
+import os
 from ..ai import WhisperService
+from .audio_decode import AudioInput
+from .executor import ExecutorBusyError, LANE_INTERACTIVE, get_inference_executor
 
 logger = logging.getLogger(__name__)
 
@@ -14,22 +17,39 @@ def get_whisper_service() -> WhisperService:
     """Get or create Whisper service instance"""
     global _whisper_service
     if _whisper_service is None:
-        _whisper_service = WhisperService(model_size="base")
+        _whisper_service = WhisperService(model_size=os.getenv("STT_MODEL_SIZE", "base"))
     return _whisper_service
 
-async def transcribe(audio_bytes: bytes) -> Dict[str, Any]:
+def stt_cache_params() -> Dict[str, Any]:
+    """Model settings that determine a transcript (part of the ingest cache key)"""
+    backend = WhisperService.resolve_backend()
+    return {
+        "backend": backend,
+        "model_size": os.getenv("STT_MODEL_SIZE", "base"),
+        "options": WhisperService.backend_options(backend),
+    }
+
+async def transcribe(audio: AudioInput, lane: str = LANE_INTERACTIVE) -> Dict[str, Any]:
     """
-    Transcribe audio bytes to text using Whisper
+    Transcribe audio to text using Whisper
+    
+    Runs on the shared STT inference pool so the event loop stays responsive.
     
     Args:
-        audio_bytes: Audio file bytes
+        audio: Audio file bytes, or samples already decoded with decode_audio
+        lane: Executor priority lane (interactive uploads overtake batch jobs)
         
     Returns:
         Dict with text, segments, language, and confidence
+    
+    Raises:
+        ExecutorBusyError: If the STT pool queue is full
     """
     try:
-        whisper_service = get_whisper_service()
-        result = whisper_service.transcribe(audio_bytes, audio_format="wav")
+        # Model loading (first call) also happens on the pool, not the event loop
+        result = await get_inference_executor("stt").run_in_lane(
+            lane, lambda: get_whisper_service().transcribe(audio, audio_format="wav")
+        )
         
         # Format to match expected response structure
         return {
@@ -38,8 +58,12 @@ async def transcribe(audio_bytes: bytes) -> Dict[str, Any]:
             "lang": result.get("language", "unknown"),
             "confidence": result.get("confidence", 0.0),
             "no_speech_prob": result.get("no_speech_prob", 0.0),
+            # Keep model/decode failures visible (callers must not cache them)
+            **({"error": result["error"]} if result.get("error") else {}),
         }
         
+    except ExecutorBusyError:
+        raise
     except Exception as e:
         logger.error(f"Transcription failed: {e}", exc_info=True)
         return {
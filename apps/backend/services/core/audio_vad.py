@@ -0,0 +1,183 @@
+"""
+Energy-based voice activity segmentation for streaming transcription
+Splits an incoming sample stream into speech segments at pauses, so each
+segment can be transcribed as soon as the speaker pauses instead of after
+the whole recording.
+"""
+from typing import List, Optional
+import logging
+
+import numpy as np
+
+from .audio_decode import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+class SpeechSegment:
+    """A completed speech segment"""
+
+    def __init__(self, index: int, start: float, samples: np.ndarray, sample_rate: int = SAMPLE_RATE):
+        self.index = index
+        self.start = start
+        self.samples = samples
+        self.end = start + len(samples) / float(sample_rate)
+
+    def __repr__(self) -> str:
+        return f"SpeechSegment(index={self.index}, start={self.start:.2f}, end={self.end:.2f})"
+
+class EnergyVADSegmenter:
+    """
+    Frame-energy VAD with an adaptive noise floor
+
+    A frame is speech when its RMS exceeds both `min_rms` and `noise_ratio` times
+    the running noise floor, which follows quiet frames immediately and rises
+    only slowly (pauses between words re-anchor it to the background). A segment
+    closes after `min_silence_ms` of non-speech, or is cut at `max_segment_s` to
+    bound per-segment latency (and stay within Whisper's 30 s window). Bursts
+    shorter than `min_speech_ms` are dropped as clicks/noise.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        frame_ms: int = 30,
+        min_rms: float = 0.01,
+        noise_ratio: float = 3.0,
+        min_silence_ms: int = 600,
+        min_speech_ms: int = 250,
+        max_segment_s: float = 30.0,
+        padding_ms: int = 200
+    ):
+        """
+        Initialize segmenter
+
+        Args:
+            sample_rate: Input sample rate
+            frame_ms: Analysis frame length
+            min_rms: Absolute RMS floor for speech (float samples in [-1, 1])
+            noise_ratio: Speech threshold relative to the estimated noise floor
+            min_silence_ms: Pause length that ends a segment
+            min_speech_ms: Minimum voiced duration for a segment to be emitted
+            max_segment_s: Forced cut length for long uninterrupted speech
+            padding_ms: Audio kept before speech onset and after its end
+        """
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.min_rms = min_rms
+        self.noise_ratio = noise_ratio
+        self.silence_frames = max(1, min_silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_segment_frames = max(1, int(max_segment_s * 1000) // frame_ms)
+        self.padding_frames = padding_ms // frame_ms
+
+        self._pending = np.zeros(0, dtype=np.float32)  # samples not yet forming a full frame
+        self._frames_seen = 0
+        self._samples_seen = 0
+        self._noise_floor = min_rms / noise_ratio
+        self._pre_roll: List[np.ndarray] = []
+        self._segment: List[np.ndarray] = []
+        self._segment_start_frame = 0
+        self._voiced = 0
+        self._trailing_silence = 0
+        self._emitted = 0
+
+    @property
+    def duration(self) -> float:
+        """Seconds of audio consumed so far"""
+        return self._samples_seen / float(self.sample_rate)
+
+    def _is_speech(self, frame: np.ndarray) -> bool:
+        rms = float(np.sqrt(np.mean(frame * frame)))
+        speech = rms >= self.min_rms and rms >= self._noise_floor * self.noise_ratio
+        if rms < self._noise_floor:
+            self._noise_floor = rms
+        else:
+            # Creep up slowly during speech so loud steady noise is eventually learned
+            rate = 0.001 if speech else 0.05
+            self._noise_floor = (1 - rate) * self._noise_floor + rate * rms
+        return speech
+
+    def _close_segment(self, keep_frames: int) -> Optional[SpeechSegment]:
+        frames = self._segment[:keep_frames]
+        voiced = self._voiced
+        self._segment = []
+        self._voiced = 0
+        self._trailing_silence = 0
+        if voiced < self.min_speech_frames or not frames:
+            return None
+        segment = SpeechSegment(
+            self._emitted,
+            self._segment_start_frame * self.frame_size / float(self.sample_rate),
+            np.concatenate(frames),
+            self.sample_rate
+        )
+        self._emitted += 1
+        return segment
+
+    def push(self, samples: np.ndarray) -> List[SpeechSegment]:
+        """
+        Feed audio and collect segments completed by it
+
+        Args:
+            samples: Mono float32 samples at `sample_rate`
+
+        Returns:
+            Completed speech segments, in order
+        """
+        completed = []
+        self._samples_seen += len(samples)
+        data = np.concatenate([self._pending, np.asarray(samples, dtype=np.float32)])
+        usable = len(data) - len(data) % self.frame_size
+        self._pending = data[usable:]
+
+        for offset in range(0, usable, self.frame_size):
+            frame = data[offset:offset + self.frame_size]
+            frame_index = self._frames_seen
+            self._frames_seen += 1
+            speech = self._is_speech(frame)
+
+            if not self._segment:
+                if speech:
+                    self._segment = self._pre_roll + [frame]
+                    self._segment_start_frame = frame_index - len(self._pre_roll)
+                    self._pre_roll = []
+                    self._voiced = 1
+                else:
+                    self._pre_roll = (self._pre_roll + [frame])[-self.padding_frames:] if self.padding_frames else []
+                continue
+
+            self._segment.append(frame)
+            if speech:
+                self._voiced += 1
+                self._trailing_silence = 0
+            else:
+                self._trailing_silence += 1
+
+            if self._trailing_silence >= self.silence_frames:
+                # Keep `padding_frames` of the pause, drop the rest
+                keep = len(self._segment) - self._trailing_silence + self.padding_frames
+                segment = self._close_segment(keep)
+                if segment is not None:
+                    completed.append(segment)
+            elif len(self._segment) >= self.max_segment_frames:
+                # Speech continuing past the cut starts the next segment
+                segment = self._close_segment(len(self._segment))
+                if segment is not None:
+                    completed.append(segment)
+        return completed
+
+    def flush(self) -> List[SpeechSegment]:
+        """
+        End of stream: emit the segment in progress (if it has enough speech)
+
+        Returns:
+            Zero or one final segment
+        """
+        if self._segment and len(self._pending):
+            self._segment.append(self._pending)
+        self._pending = np.zeros(0, dtype=np.float32)
+        if not self._segment:
+            return []
+        keep = len(self._segment) - max(0, self._trailing_silence - self.padding_frames)
+        segment = self._close_segment(keep)
+        return [segment] if segment is not None else []
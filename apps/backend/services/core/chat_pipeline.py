@@ -0,0 +1,186 @@
+"""
+Helpers for the pipelined chat handler
+- StageTimer records per-stage wall time for a request (and feeds the latency histograms)
+- IndexStatusMonitor keeps ensure_index off the hot path (cached, refreshed in the background)
+- start_warmup / finish_warmup overlap LLM connection setup with retrieval
+"""
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+import asyncio
+import logging
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from .metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+READY_STATUSES = ("loaded", "built")
+
+# Strong references to fire-and-forget tasks (the event loop only keeps weak ones)
+_background_tasks: set = set()
+
+class StageTimer:
+    """Collects stage durations (milliseconds) for one request"""
+
+    def __init__(self, endpoint: str = "chat"):
+        """
+        Initialize stage timer
+
+        Args:
+            endpoint: Endpoint label for the chat_stage_latency_ms histogram
+        """
+        self.endpoint = endpoint
+        self._start = time.perf_counter()
+        self._stages: Dict[str, float] = {}
+        self._finished = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the wrapped block as `name` (repeated stages accumulate)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000.0)
+
+    def record(self, name: str, ms: float) -> None:
+        """Add a duration measured elsewhere"""
+        self._stages[name] = self._stages.get(name, 0.0) + ms
+        get_metrics_registry().observe("chat_stage_latency_ms", ms, endpoint=self.endpoint, stage=name)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Stage durations plus total elapsed time, rounded to 0.1 ms"""
+        total = (time.perf_counter() - self._start) * 1000.0
+        if not self._finished:
+            # The first call marks the end of the request
+            self._finished = True
+            get_metrics_registry().observe("chat_stage_latency_ms", total, endpoint=self.endpoint, stage="total")
+        timings = {name: round(ms, 1) for name, ms in self._stages.items()}
+        timings["total"] = round(total, 1)
+        return timings
+
+class IndexStatusMonitor:
+    """
+    Caches a ready index status so requests don't re-check the index inline
+
+    A ready status is served from cache; once older than `ttl_seconds` it is
+    still served while a single background refresh runs. Non-ready statuses
+    are never cached, so requests keep retrying until the index is usable;
+    concurrent requests share one inline check, so a cold index is built once.
+    """
+
+    def __init__(self, check: Callable[[], Dict[str, Any]], ttl_seconds: float = 30.0):
+        """
+        Initialize index status monitor
+
+        Args:
+            check: Blocking callable returning the index status dict (e.g. ensure_index)
+            ttl_seconds: Age after which a cached status is refreshed in the background
+        """
+        self.check = check
+        self.ttl_seconds = ttl_seconds
+        self._status: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+        self._inline: Optional[asyncio.Task] = None
+        self._hits = 0
+        self._checks = 0
+
+    async def _run_check(self) -> Dict[str, Any]:
+        self._checks += 1
+        status = await run_in_threadpool(self.check)
+        if status.get("status") in READY_STATUSES:
+            self._status = status
+            self._checked_at = time.monotonic()
+        else:
+            self._status = None
+        return status
+
+    async def _background_refresh(self) -> None:
+        try:
+            await self._run_check()
+        except Exception as e:
+            logger.error(f"Background index status refresh failed: {e}", exc_info=True)
+            self._status = None
+
+    async def get(self) -> Dict[str, Any]:
+        """
+        Get the index status, checking inline only when nothing usable is cached
+
+        Returns:
+            Index status dict
+        """
+        if self._status is None:
+            # Single-flight: a check (possibly an index build) is already running for other requests
+            if self._inline is None or self._inline.done():
+                self._inline = asyncio.create_task(self._run_check())
+            # Shielded so one cancelled request doesn't abort the check the others wait on
+            return await asyncio.shield(self._inline)
+        self._hits += 1
+        if time.monotonic() - self._checked_at > self.ttl_seconds and (self._refresh is None or self._refresh.done()):
+            self._refresh = asyncio.create_task(self._background_refresh())
+        return self._status
+
+    def invalidate(self) -> None:
+        """Forget the cached status (e.g. after a rebuild)"""
+        self._status = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache hit and inline check counters"""
+        return {
+            "cached": self._status is not None,
+            "age_s": round(time.monotonic() - self._checked_at, 1) if self._status is not None else None,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self._hits,
+            "checks": self._checks,
+        }
+
+def _consume_warmup_result(task: asyncio.Task) -> None:
+    """Retrieve a finished warm-up's exception so it is logged even if nobody awaits the task"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"LLM warm-up failed: {task.exception()}")
+
+def start_warmup(backend: Any) -> Optional[asyncio.Task]:
+    """
+    Start warming the generation backend (connection / model) in the background
+
+    Requests that return early (cached answer, no results, errors) may never
+    call finish_warmup; the task then still completes and its failure is logged.
+
+    Args:
+        backend: Generation backend; ignored if unconfigured or without warmup()
+
+    Returns:
+        Task to pass to finish_warmup, or None
+    """
+    warmup = getattr(backend, "warmup", None)
+    if warmup is None or not backend.is_configured():
+        return None
+    task = asyncio.create_task(warmup())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    task.add_done_callback(_consume_warmup_result)
+    return task
+
+async def finish_warmup(task: Optional[asyncio.Task], timer: StageTimer, timeout: float = 5.0) -> None:
+    """
+    Wait for a warm-up started with start_warmup before generating
+
+    The wait is recorded as the `llm_warmup_wait` stage; when the connection was
+    ready before retrieval finished it is ~0. Failures are ignored: generation
+    opens its own connection in that case.
+
+    Args:
+        task: Task from start_warmup (None is a no-op)
+        timer: Request stage timer
+        timeout: Maximum seconds to wait
+    """
+    if task is None:
+        return
+    with timer.stage("llm_warmup_wait"):
+        try:
+            await asyncio.wait_for(asyncio.shield(task), timeout)
+        except Exception as e:
+            logger.debug(f"LLM warm-up did not complete: {e}")
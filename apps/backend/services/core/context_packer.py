@@ -0,0 +1,219 @@
+"""
+Token-budgeted context packing for LLM prompts
+Merges adjacent chunks of the same document (removing the chunker overlap),
+drops near-duplicate passages, and fills a token budget in relevance order.
+"""
+from typing import Any, Callable, Dict, List, Optional
+import logging
+import math
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+_PIECE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+_token_counter: Optional[Callable[[str], int]] = None
+
+def _approximate_tokens(text: str) -> int:
+    """BPE-like estimate: one token per punctuation mark, ~4 characters per word piece"""
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in _PIECE.findall(text))
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens with tiktoken if available, otherwise with a local approximation
+
+    Args:
+        text: Input text
+
+    Returns:
+        Token count
+    """
+    global _token_counter
+    if _token_counter is None:
+        try:
+            import tiktoken
+            encoding = tiktoken.get_encoding(os.getenv("CONTEXT_TOKENIZER", "cl100k_base"))
+            _token_counter = lambda t: len(encoding.encode(t, disallowed_special=()))
+            logger.info("Context packer using tiktoken for token counting")
+        except Exception as e:
+            # Not installed, or the encoding file cannot be fetched offline
+            logger.warning(f"tiktoken unavailable ({e}), using approximate token counts. Install with: pip install tiktoken")
+            _token_counter = _approximate_tokens
+    return _token_counter(text)
+
+def _merge_overlap(left: str, right: str, max_overlap: int = 200, min_overlap: int = 8) -> str:
+    """Join two consecutive chunks, removing the longest suffix of left repeated at the start of right"""
+    limit = min(max_overlap, len(left), len(right))
+    for size in range(limit, min_overlap - 1, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    return f"{left} {right}"
+
+def _shingles(text: str, size: int) -> set:
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class ContextPacker:
+    """Builds the evidence context for a prompt within a token budget"""
+
+    def __init__(
+        self,
+        token_budget: int = 1500,
+        max_passages: int = 8,
+        dedup_threshold: float = 0.8,
+        shingle_size: int = 5,
+        min_passage_tokens: int = 48
+    ):
+        """
+        Initialize context packer
+
+        Args:
+            token_budget: Maximum tokens for the whole context block
+            max_passages: Maximum number of passages in the context
+            dedup_threshold: Shingle Jaccard similarity at which a passage counts as a duplicate
+            shingle_size: Words per shingle for duplicate detection
+            min_passage_tokens: Smallest truncated passage worth including
+        """
+        self.token_budget = token_budget
+        self.max_passages = max_passages
+        self.dedup_threshold = dedup_threshold
+        self.shingle_size = shingle_size
+        self.min_passage_tokens = min_passage_tokens
+
+    def _merge_adjacent(self, evidences: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge runs of consecutive chunks from the same document into single passages"""
+        by_doc: Dict[str, List[Dict[str, Any]]] = {}
+        for rank, ev in enumerate(evidences):
+            doc = ev.get("path") or ev.get("filename") or f"_doc{rank}"
+            by_doc.setdefault(doc, []).append({**ev, "_rank": rank})
+
+        passages = []
+        for doc, chunks in by_doc.items():
+            chunks.sort(key=lambda c: c.get("chunk_index", 0))
+            run = [chunks[0]]
+            for chunk in chunks[1:]:
+                if chunk.get("chunk_index", 0) == run[-1].get("chunk_index", 0) + 1:
+                    run.append(chunk)
+                else:
+                    passages.append(self._passage(run))
+                    run = [chunk]
+            passages.append(self._passage(run))
+
+        # Relevance order: best score in the passage, ties by original retrieval rank
+        passages.sort(key=lambda p: (-p["score"], p["rank"]))
+        return passages
+
+    def _passage(self, run: List[Dict[str, Any]]) -> Dict[str, Any]:
+        text = run[0].get("text", "")
+        for chunk in run[1:]:
+            text = _merge_overlap(text, chunk.get("text", ""))
+        return {
+            "text": text,
+            "source": run[0].get("filename") or run[0].get("path") or "Unknown",
+            "score": max(c.get("score", 0.0) for c in run),
+            "rank": min(c["_rank"] for c in run),
+            "chunk_ids": [c.get("doc_id", "") for c in run],
+        }
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text at a word boundary so it fits in max_tokens"""
+        words = text.split()
+        low, high = 0, len(words)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if count_tokens(" ".join(words[:mid]) + " ...") <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        return " ".join(words[:low]) + " ..." if low else ""
+
+    @staticmethod
+    def _render(index: int, source: str, text: str) -> str:
+        return f"[Document {index}]\nSource: {source}\nContent: {text}\n"
+
+    def pack(self, evidences: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Pack evidences into a context string
+
+        Args:
+            evidences: Retrieved chunks (text, path/filename, chunk_index, doc_id, score)
+
+        Returns:
+            Dict with the context string (None when empty), the packed passages,
+            token count, and how many chunks were merged, deduplicated or left out
+        """
+        passages = self._merge_adjacent(evidences)
+
+        kept = []
+        kept_shingles = []
+        duplicates = 0
+        for passage in passages:
+            shingles = _shingles(passage["text"], self.shingle_size)
+            if any(_jaccard(shingles, other) >= self.dedup_threshold for other in kept_shingles):
+                duplicates += 1
+                continue
+            kept.append(passage)
+            kept_shingles.append(shingles)
+
+        blocks = []
+        packed = []
+        used_tokens = 0
+        truncated = False
+        separator_tokens = count_tokens("\n\n")
+        for passage in kept:
+            if len(packed) >= self.max_passages:
+                break
+            index = len(packed) + 1
+            block = self._render(index, passage["source"], passage["text"])
+            cost = count_tokens(block) + (separator_tokens if blocks else 0)
+            remaining = self.token_budget - used_tokens
+            if cost > remaining:
+                overhead = cost - count_tokens(passage["text"])
+                room = remaining - overhead
+                if room >= self.min_passage_tokens:
+                    text = self._truncate(passage["text"], room)
+                    if text:
+                        block = self._render(index, passage["source"], text)
+                        cost = count_tokens(block) + (separator_tokens if blocks else 0)
+                        blocks.append(block)
+                        packed.append({**passage, "text": text, "truncated": True})
+                        used_tokens += cost
+                truncated = True
+                break
+            blocks.append(block)
+            packed.append({**passage, "truncated": False})
+            used_tokens += cost
+
+        return {
+            "context": "\n\n".join(blocks) if blocks else None,
+            "passages": packed,
+            "tokens": used_tokens,
+            "token_budget": self.token_budget,
+            "merged_chunks": len(evidences) - len(passages),
+            "dropped_duplicates": duplicates,
+            "omitted_passages": len(kept) - len(packed),
+            "truncated": truncated,
+        }
+
+# Global instance
+_context_packer: Optional[ContextPacker] = None
+
+def get_context_packer() -> ContextPacker:
+    """Get or create the context packer configured from CONTEXT_* environment variables"""
+    global _context_packer
+    if _context_packer is None:
+        _context_packer = ContextPacker(
+            token_budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500")),
+            max_passages=int(os.getenv("CONTEXT_MAX_PASSAGES", "8")),
+            dedup_threshold=float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.8"))
+        )
+    return _context_packer
@@ -0,0 +1,184 @@
+"""
+Session-scoped conversation memory for multi-turn chat
+Keeps recent turns and the last evidence set per session so follow-up questions
+can reuse retrieval and send only context the LLM has not seen yet. Sessions
+live in a bounded in-memory LRU with TTL eviction.
+"""
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class ConversationSession:
+    """Turns and evidence for one chat session"""
+
+    def __init__(self, session_id: str, max_turns: int = 6, history_tokens: int = 3000):
+        """
+        Initialize conversation session
+
+        Args:
+            session_id: Client-supplied session ID
+            max_turns: Maximum number of turns kept
+            history_tokens: Token budget for replayed history (oldest turns dropped first)
+        """
+        self.session_id = session_id
+        self.history_tokens = history_tokens
+        # Each turn: query, context sent with it (None if nothing new), answer, chunk IDs in that context
+        self.turns: Deque[Dict[str, Any]] = deque(maxlen=max_turns)
+        self.evidences: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add_turn(self, query: str, context: Optional[str], answer: str, context_ids: List[str]) -> None:
+        """Record a completed question/answer exchange"""
+        with self._lock:
+            self.turns.append({
+                "query": query,
+                "context": context,
+                "answer": answer,
+                "context_ids": list(context_ids),
+            })
+
+    def set_evidences(self, evidences: List[Dict[str, Any]]) -> None:
+        """Remember the evidence set retrieved for the latest turn"""
+        with self._lock:
+            self.evidences = list(evidences)
+
+    def recent_turns(self) -> List[Dict[str, Any]]:
+        """Snapshot of the kept turns, oldest first"""
+        with self._lock:
+            return list(self.turns)
+
+class ConversationStore:
+    """Bounded LRU of conversation sessions with idle TTL"""
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        ttl_seconds: float = 1800.0,
+        max_turns: int = 6,
+        history_tokens: int = 3000
+    ):
+        """
+        Initialize conversation store
+
+        Args:
+            max_sessions: Maximum number of live sessions (least recently used evicted beyond this)
+            ttl_seconds: Idle time after which a session expires
+            max_turns: Maximum turns kept per session
+            history_tokens: Token budget for the history replayed to the LLM
+        """
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_turns = max_turns
+        self.history_tokens = history_tokens
+
+        # session_id -> (expires_at, session)
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._created = 0
+        self._resumed = 0
+        self._expired = 0
+        self._evictions = 0
+
+    def _purge_expired(self, now: float) -> None:
+        # Sessions are kept in last-access order, so expired ones sit at the front
+        while self._sessions:
+            session_id, (expires_at, _) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            del self._sessions[session_id]
+            self._expired += 1
+
+    def get(self, session_id: str) -> Optional[ConversationSession]:
+        """
+        Get a live session and extend its TTL
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            Session, or None if unknown or expired
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._purge_expired(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            session = entry[1]
+            self._sessions[session_id] = (now + self.ttl_seconds, session)
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def get_or_create(self, session_id: str) -> ConversationSession:
+        """
+        Resume a session, or start a new one under this ID
+
+        Args:
+            session_id: Client-supplied session ID
+
+        Returns:
+            Session
+        """
+        session = self.get(session_id)
+        if session is not None:
+            self._resumed += 1
+            return session
+
+        now = time.monotonic()
+        session = ConversationSession(session_id, self.max_turns, self.history_tokens)
+        with self._lock:
+            self._sessions[session_id] = (now + self.ttl_seconds, session)
+            self._created += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._evictions += 1
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        """
+        Forget a session
+
+        Returns:
+            True if the session existed
+        """
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get session counters"""
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "max_turns": self.max_turns,
+                "history_tokens": self.history_tokens,
+                "created": self._created,
+                "resumed": self._resumed,
+                "expired": self._expired,
+                "evictions": self._evictions,
+            }
+
+# Global instance
+_conversation_store: Optional[ConversationStore] = None
+
+def get_conversation_store() -> Optional[ConversationStore]:
+    """Get or create the conversation store (None if disabled via CONVERSATION_ENABLED)"""
+    global _conversation_store
+    if os.getenv("CONVERSATION_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    if _conversation_store is None:
+        _conversation_store = ConversationStore(
+            max_sessions=int(os.getenv("CONVERSATION_MAX_SESSIONS", "1000")),
+            ttl_seconds=float(os.getenv("CONVERSATION_TTL_SECONDS", "1800")),
+            max_turns=int(os.getenv("CONVERSATION_MAX_TURNS", "6")),
+            history_tokens=int(os.getenv("CONVERSATION_HISTORY_TOKENS", "3000"))
+        )
+    return _conversation_store
@@ -0,0 +1,201 @@
+"""
+Small on-disk key/value cache with TTL and an optional size cap
+One JSON file per entry (named by the SHA-256 of the key), written atomically,
+so the cache survives restarts and can be shared by worker processes.
+Recency for size eviction is tracked in memory (seeded from file mtimes at
+startup), so an eviction never rescans the directory.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class DiskCache:
+    """JSON value cache stored under a directory, with TTL and LRU-by-mtime size eviction"""
+
+    def __init__(self, directory: str, ttl_seconds: Optional[float] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize disk cache
+
+        Args:
+            directory: Cache directory (created if missing)
+            ttl_seconds: Time-to-live for each entry (None = no expiry)
+            max_bytes: Maximum total size of cache files (None = unbounded)
+        """
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+        self._errors = 0
+
+        os.makedirs(directory, exist_ok=True)
+        # path -> size, least recently used first
+        self._index: "OrderedDict[str, int]" = OrderedDict(
+            (path, size) for path, size, _ in sorted(self._scan(), key=lambda item: item[2])
+        )
+        self._total_bytes = sum(self._index.values())
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.json")
+
+    def _scan(self):
+        """Yield (path, size, mtime) for every cache file"""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def _remove(self, path: str) -> None:
+        """Delete a cache file and update the index and size counter (caller holds the lock)"""
+        size = self._index.pop(path, None)
+        try:
+            if size is None:
+                size = os.path.getsize(path)  # Written by another process
+            os.remove(path)
+        except OSError:
+            pass  # Already gone (e.g. evicted by another process)
+        if size is not None:
+            self._total_bytes = max(0, self._total_bytes - size)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a value
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except FileNotFoundError:
+                self._misses += 1
+                if path in self._index:  # Removed by another process
+                    self._total_bytes = max(0, self._total_bytes - self._index.pop(path))
+                return None
+            except (OSError, ValueError) as e:
+                logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+                self._errors += 1
+                self._misses += 1
+                self._remove(path)
+                return None
+
+            expires_at = entry.get("expires_at")
+            if expires_at is not None and expires_at < time.time():
+                self._misses += 1
+                self._remove(path)
+                return None
+
+            try:
+                os.utime(path)  # recency for the index rebuilt on the next start
+            except OSError:
+                pass
+            if path in self._index:
+                self._index.move_to_end(path)
+            else:
+                try:
+                    self._index[path] = os.path.getsize(path)  # Written by another process
+                    self._total_bytes += self._index[path]
+                except OSError:
+                    pass
+            self._hits += 1
+            return entry.get("value")
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a JSON-serializable value
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        path = self._path(key)
+        entry = {
+            "expires_at": time.time() + self.ttl_seconds if self.ttl_seconds else None,
+            "value": value
+        }
+        try:
+            data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Value for cache key is not JSON-serializable: {e}")
+            self._errors += 1
+            return
+
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if os.path.exists(path):
+                    self._remove(path)
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._index[path] = len(data)
+                self._total_bytes += len(data)
+                self._writes += 1
+            except OSError as e:
+                logger.warning(f"Failed to write cache entry {path}: {e}")
+                self._errors += 1
+                return
+            self._enforce_size()
+
+    def _enforce_size(self) -> None:
+        """Evict least recently used files until under max_bytes (caller holds the lock)"""
+        if not self.max_bytes:
+            return
+        while self._total_bytes > self.max_bytes and self._index:
+            self._remove(next(iter(self._index)))
+            self._evictions += 1
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present"""
+        with self._lock:
+            self._remove(self._path(key))
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            for path, _, _ in list(self._scan()):
+                self._remove(path)
+            self._index.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and disk usage"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "directory": self.directory,
+                "ttl_seconds": self.ttl_seconds,
+                "max_bytes": self.max_bytes,
+                "bytes": self._total_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "writes": self._writes,
+                "evictions": self._evictions,
+                "errors": self._errors,
+            }
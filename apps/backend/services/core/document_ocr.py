@@ -0,0 +1,173 @@
+"""
+Multi-page document OCR (multi-frame TIFF and scanned PDF)
+Pages are decoded lazily one at a time and recognized in a process pool, so
+a 500-page scan never sits fully rendered in memory and Tesseract runs on
+several cores at once.
+"""
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+import io
+import logging
+import multiprocessing
+import os
+
+from PIL import Image, ImageSequence
+
+logger = logging.getLogger(__name__)
+
+# Try to import pypdfium2 for rendering PDF pages
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+# Try to import pypdf for extracting embedded page scans (fallback without pypdfium2)
+try:
+    from pypdf import PdfReader
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+PDF_MAGIC = b"%PDF-"
+
+def pdf_renderer() -> Optional[str]:
+    """Library used to turn PDF pages into images ("pypdfium2", "pypdf" or None)"""
+    if PDFIUM_AVAILABLE:
+        return "pypdfium2"
+    return "pypdf" if PYPDF_AVAILABLE else None
+
+def is_pdf(data: bytes) -> bool:
+    """Whether the bytes are a PDF document"""
+    return data[:1024].lstrip().startswith(PDF_MAGIC)
+
+def is_multipage(data: bytes) -> bool:
+    """Whether the bytes are a PDF or a multi-frame image (e.g. TIFF scan)"""
+    if is_pdf(data):
+        return True
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            return getattr(image, "n_frames", 1) > 1
+    except Exception:
+        return False
+
+def _iter_pdf_pages(data: bytes, dpi: int) -> Iterator[Optional[Image.Image]]:
+    if PDFIUM_AVAILABLE:
+        pdf = pdfium.PdfDocument(data)
+        try:
+            for index in range(len(pdf)):
+                page = pdf[index]
+                try:
+                    yield page.render(scale=dpi / 72.0, grayscale=True).to_pil()
+                finally:
+                    page.close()
+        finally:
+            pdf.close()
+        return
+
+    if not PYPDF_AVAILABLE:
+        raise ValueError("PDF OCR requires pypdfium2 or pypdf")
+    # Scanner PDFs carry one full-page image per page; use the largest one
+    for page in PdfReader(io.BytesIO(data)).pages:
+        images = [embedded.image for embedded in page.images]
+        yield max(images, key=lambda image: image.width * image.height) if images else None
+
+def iter_pages(data: bytes, dpi: int = 300) -> Iterator[Optional[Image.Image]]:
+    """
+    Lazily decode the pages of a document
+
+    Args:
+        data: PDF, multi-frame TIFF or single image bytes
+        dpi: Render resolution for PDF pages
+
+    Yields:
+        One PIL image per page (None if a PDF page has no renderable scan)
+    """
+    if is_pdf(data):
+        yield from _iter_pdf_pages(data, dpi)
+        return
+    with Image.open(io.BytesIO(data)) as image:
+        for frame in ImageSequence.Iterator(image):
+            yield frame.copy()  # The iterator reuses one frame object
+
+# Per-process OCR service for pool workers
+_worker_service = None
+
+def _init_worker() -> None:
+    # One Tesseract thread per process; the pool provides the parallelism
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+def _ocr_page(image: Optional[Image.Image], lang: Optional[str], preprocess: Optional[str] = None) -> Dict[str, Any]:
+    """Recognize one page (runs in a pool worker)"""
+    global _worker_service
+    if image is None:
+        return {
+            "text": "", "confidence": 0.0, "language": lang, "word_count": 0, "boxes": [],
+            "error": "Page has no scanned image (install pypdfium2 to render vector pages)",
+        }
+    if _worker_service is None:
+        from ..ai.ocr_service import OCRService
+        _worker_service = OCRService(lang=lang or "eng")
+    return _worker_service.extract_text_from_image(image, lang, preprocess)
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def ocr_processes() -> int:
+    """Configured OCR worker processes (OCR_PROCESSES; 0 or 1 = recognize in-process)"""
+    return int(os.getenv("OCR_PROCESSES", str(max(1, (os.cpu_count() or 2) // 2))))
+
+def get_ocr_process_pool() -> Optional[ProcessPoolExecutor]:
+    """Get or create the OCR process pool (None when OCR runs in-process)"""
+    global _process_pool
+    processes = ocr_processes()
+    if processes <= 1:
+        return None
+    if _process_pool is None:
+        # spawn: forking a process with live model/HTTP threads is unsafe
+        _process_pool = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context(os.getenv("OCR_START_METHOD", "spawn")),
+            initializer=_init_worker
+        )
+        logger.info(f"OCR process pool started (processes={processes})")
+    return _process_pool
+
+def ocr_document(
+    data: bytes,
+    lang: Optional[str] = None,
+    dpi: int = 300,
+    pool: Optional[Executor] = None,
+    window: Optional[int] = None,
+    preprocess: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    OCR every page of a document
+
+    Args:
+        data: PDF, multi-frame TIFF or single image bytes
+        lang: Tesseract language (defaults to the worker's)
+        dpi: Render resolution for PDF pages
+        pool: Executor for page OCR (defaults to the shared process pool; None runs in-process)
+        window: Maximum pages decoded ahead of the slowest in-flight page
+        preprocess: Preprocessing preset or step list applied to every page
+
+    Returns:
+        Per-page OCRService results, in page order
+    """
+    pool = pool if pool is not None else get_ocr_process_pool()
+    pages = iter_pages(data, dpi)
+    if pool is None:
+        return [_ocr_page(page, lang, preprocess) for page in pages]
+
+    # Keep a bounded window of pages in flight so decoding stays lazy
+    window = window or 2 * max(1, ocr_processes())
+    results = []
+    in_flight = deque()
+    for page in pages:
+        in_flight.append(pool.submit(_ocr_page, page, lang, preprocess))
+        if len(in_flight) >= window:
+            results.append(in_flight.popleft().result())
+    while in_flight:
+        results.append(in_flight.popleft().result())
+    return results
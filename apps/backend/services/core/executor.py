@@ -0,0 +1,250 @@
+"""
+Bounded thread-pool executor for running blocking work off the event loop
+Rejects new work once the queue is full so callers can shed load (HTTP 503).
+Queued work is served by priority lane, so interactive requests overtake
+batch jobs waiting on the same pool.
+"""
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import contextvars
+import functools
+import itertools
+import logging
+import os
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes, served in this order
+LANE_INTERACTIVE = "interactive"
+LANE_BATCH = "batch"
+LANES = (LANE_INTERACTIVE, LANE_BATCH)
+
+_STOP_RANK = len(LANES)  # sorts after all real work
+
+class ExecutorBusyError(Exception):
+    """Raised when a bounded executor has no free queue slot"""
+
+    def __init__(self, name: str, retry_after: int = 1):
+        super().__init__(f"Executor '{name}' is at capacity. Retry after {retry_after}s.")
+        self.name = name
+        self.retry_after = retry_after
+
+class BoundedExecutor:
+    """Thread pool with a hard limit on queued work, priority lanes and queue-depth stats"""
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int = 4,
+        max_queue: int = 32,
+        retry_after: int = 1,
+        max_batch_queue: Optional[int] = None
+    ):
+        """
+        Initialize bounded executor
+
+        Args:
+            name: Executor name (used for thread names and stats)
+            max_workers: Number of worker threads
+            max_queue: Maximum number of tasks waiting for a worker
+            retry_after: Seconds clients should wait after a rejection
+            max_batch_queue: Maximum queued batch-lane tasks (defaults to max_queue);
+                keeps headroom in the queue for interactive work
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_batch_queue = max_queue if max_batch_queue is None else min(max_batch_queue, max_queue)
+        self.retry_after = retry_after
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._sequence = itertools.count()  # FIFO within a lane
+        self._lock = threading.Lock()
+        self._pending = 0   # queued + running
+        self._running = 0
+        self._queued_by_lane = {lane: 0 for lane in LANES}
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"{name}_{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        logger.info(f"Bounded executor '{name}' initialized (workers={max_workers}, max_queue={max_queue})")
+
+    def _acquire(self, lane: str) -> None:
+        with self._lock:
+            waiting = self._pending - self._running
+            if self._pending >= self.max_workers + self.max_queue or (
+                lane == LANE_BATCH and waiting >= self.max_batch_queue
+            ):
+                self._rejected += 1
+                raise ExecutorBusyError(self.name, self.retry_after)
+            self._pending += 1
+            self._queued_by_lane[lane] += 1
+            self._submitted += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    def _dequeued(self, lane: str) -> None:
+        with self._lock:
+            self._queued_by_lane[lane] -= 1
+
+    def _worker(self) -> None:
+        while True:
+            rank, _, future, call = self._queue.get()
+            if rank == _STOP_RANK:
+                return
+            self._dequeued(LANES[rank])
+            if not future.set_running_or_notify_cancel():
+                continue  # Cancelled while queued; its slot was freed by the done callback
+            with self._lock:
+                self._running += 1
+            try:
+                result = call()
+            except BaseException as e:
+                with self._lock:
+                    self._running -= 1
+                future.set_exception(e)
+            else:
+                with self._lock:
+                    self._running -= 1
+                future.set_result(result)
+
+    def submit(self, lane: str, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Queue a blocking callable in a priority lane
+
+        Args:
+            lane: LANE_INTERACTIVE or LANE_BATCH
+            fn: Blocking callable
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            concurrent.futures.Future for fn's result
+
+        Raises:
+            ExecutorBusyError: If the queue (or the lane's share of it) is full
+        """
+        if lane not in LANES:
+            raise ValueError(f"Unknown executor lane: {lane}")
+        self._acquire(lane)
+        # Carry context variables (e.g. request-scoped state) into the worker thread
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, fn, *args, **kwargs)
+        future: Future = Future()
+        # Free the slot when the work actually finishes (or is cancelled before starting),
+        # not when the awaiting coroutine goes away
+        future.add_done_callback(lambda _: self._release())
+        self._queue.put((LANES.index(lane), next(self._sequence), future, call))
+        return future
+
+    async def run_in_lane(self, lane: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking callable in a priority lane and await its result
+
+        Raises:
+            ExecutorBusyError: If the queue is full
+        """
+        return await asyncio.wrap_future(self.submit(lane, fn, *args, **kwargs))
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking callable in the pool (interactive lane) and await its result
+
+        Args:
+            fn: Blocking callable
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            fn's return value
+
+        Raises:
+            ExecutorBusyError: If the queue is full
+        """
+        return await self.run_in_lane(LANE_INTERACTIVE, fn, *args, **kwargs)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of tasks waiting for a worker"""
+        with self._lock:
+            return max(0, self._pending - self._running)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get executor statistics"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": max(0, self._pending - self._running),
+                "queued_by_lane": dict(self._queued_by_lane),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker threads once queued work has drained"""
+        for _ in self._threads:
+            self._queue.put((_STOP_RANK, next(self._sequence), None, None))
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+# Per-model inference pools: (workers, queue, retry-after seconds)
+# Models are large and mostly single-instance, so pools are narrow; STT jobs run longest.
+INFERENCE_POOLS = {
+    "stt": (1, 4, 10),
+    "ocr": (2, 8, 2),
+    "vision": (4, 16, 2),
+}
+
+_inference_executors: Dict[str, BoundedExecutor] = {}
+_inference_lock = threading.Lock()
+
+def get_inference_executor(kind: str) -> BoundedExecutor:
+    """
+    Get or create the bounded pool for one model type
+
+    Sized from <KIND>_MAX_WORKERS, <KIND>_MAX_QUEUE, <KIND>_MAX_BATCH_QUEUE and
+    <KIND>_RETRY_AFTER (e.g. STT_MAX_WORKERS), so a slow model can't starve the others.
+
+    Args:
+        kind: "stt", "ocr" or "vision"
+
+    Returns:
+        Shared executor for that model type
+    """
+    if kind not in INFERENCE_POOLS:
+        raise ValueError(f"Unknown inference pool: {kind}")
+    with _inference_lock:
+        executor = _inference_executors.get(kind)
+        if executor is None:
+            workers, max_queue, retry_after = INFERENCE_POOLS[kind]
+            prefix = kind.upper()
+            batch_queue = os.getenv(f"{prefix}_MAX_BATCH_QUEUE")
+            executor = BoundedExecutor(
+                name=kind,
+                max_workers=int(os.getenv(f"{prefix}_MAX_WORKERS", str(workers))),
+                max_queue=int(os.getenv(f"{prefix}_MAX_QUEUE", str(max_queue))),
+                retry_after=int(os.getenv(f"{prefix}_RETRY_AFTER", str(retry_after))),
+                max_batch_queue=int(batch_queue) if batch_queue else None
+            )
+            _inference_executors[kind] = executor
+        return executor
+
+def inference_stats() -> Dict[str, Dict[str, Any]]:
+    """Statistics for the inference pools created so far"""
+    with _inference_lock:
+        executors = dict(_inference_executors)
+    return {kind: executor.stats() for kind, executor in executors.items()}
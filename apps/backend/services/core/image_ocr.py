@@ -1,12 +1,17 @@
 """
 Image OCR service using Tesseract
 """
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import logging
 from ..ai import OCRService
+from ..ai.ocr_preprocess import PreprocessOptions
+from .document_ocr import is_multipage, ocr_document, pdf_renderer
+from .executor import ExecutorBusyError, LANE_INTERACTIVE, get_inference_executor
 
 logger = logging.getLogger(__name__)
 
+OCR_LANG = "eng"
+
 # Initialize OCR service (singleton pattern)
 _ocr_service = None
 
@@ -14,44 +19,111 @@ def get_ocr_service() -> OCRService:
     """Get or create OCR service instance"""
     global _ocr_service
     if _ocr_service is None:
-        _ocr_service = OCRService(lang="eng")
+        _ocr_service = OCRService(lang=OCR_LANG)
     return _ocr_service
 
-async def run_ocr(image_bytes: bytes) -> Dict[str, Any]:
+def ocr_cache_params(preprocess: Optional[str] = None) -> Dict[str, Any]:
+    """
+    OCR settings that determine a result (part of the ingest cache key)
+    
+    Args:
+        preprocess: Preprocessing preset or step list (None = OCR_PREPROCESS default)
+    
+    Returns:
+        Dict with backend, PDF renderer, language and resolved preprocessing parameters
+    """
+    options = PreprocessOptions.parse(preprocess)
+    return {
+        "backend": OCRService.resolve_backend(),
+        "pdf_renderer": pdf_renderer(),
+        "lang": OCR_LANG,
+        "preprocess": list(options.steps),
+        "target_dpi": options.target_dpi,
+        "max_side": options.max_side,
+    }
+
+def _format_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an OCRService result to the API response structure"""
+    formatted = {
+        "text": result.get("text", ""),
+        "boxes": [
+            {
+                "text": box.get("text", ""),
+                "bbox": [
+                    box.get("left", 0),
+                    box.get("top", 0),
+                    box.get("left", 0) + box.get("width", 0),
+                    box.get("top", 0) + box.get("height", 0)
+                ],
+                "confidence": box.get("confidence", 0.0)
+            }
+            for box in result.get("boxes", [])
+        ],
+        "confidence": result.get("confidence", 0.0),
+        "word_count": result.get("word_count", 0),
+        "language": result.get("language", "eng"),
+    }
+    if result.get("preprocessing"):
+        formatted["preprocessing"] = result["preprocessing"]
+    if result.get("error"):
+        formatted["error"] = result["error"]
+    return formatted
+
+def _merge_pages(pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-page results into a document result (pages are kept as-is)"""
+    words = sum(page["word_count"] for page in pages)
+    merged = {
+        "text": "\n\n".join(page["text"] for page in pages if page["text"]),
+        "boxes": [dict(box, page=number) for number, page in enumerate(pages, 1) for box in page["boxes"]],
+        # Word-weighted so blank pages don't drag the score down
+        "confidence": round(sum(page["confidence"] * page["word_count"] for page in pages) / words, 3) if words else 0.0,
+        "word_count": words,
+        "language": pages[0]["language"] if pages else "eng",
+        "page_count": len(pages),
+        "pages": [dict(page, page=number) for number, page in enumerate(pages, 1)],
+    }
+    # Surface page failures so callers (and the ingest cache) treat the document as failed
+    failed = [page for page in pages if page.get("error")]
+    if failed:
+        merged["error"] = f"{len(failed)} of {len(pages)} pages failed: {failed[0]['error']}"
+    return merged
+
+def _ocr_document_blocking(image_bytes: bytes, preprocess: Optional[str]) -> Dict[str, Any]:
+    return _merge_pages([_format_result(page) for page in ocr_document(image_bytes, preprocess=preprocess)])
+
+async def run_ocr(image_bytes: bytes, lane: str = LANE_INTERACTIVE, preprocess: Optional[str] = None) -> Dict[str, Any]:
     """
     Extract text from image bytes using Tesseract OCR
     
+    Runs on the shared OCR inference pool so the event loop stays responsive.
+    Multi-page TIFFs and PDFs are recognized page by page in the OCR process
+    pool; the result then also carries `page_count` and per-page `pages`.
+    
     Args:
-        image_bytes: Image file bytes
+        image_bytes: Image, multi-page TIFF or PDF file bytes
+        lane: Executor priority lane (interactive uploads overtake batch jobs)
+        preprocess: Preprocessing preset or step list (None = OCR_PREPROCESS default)
         
     Returns:
         Dict with extracted text, bounding boxes, and confidence
+    
+    Raises:
+        ExecutorBusyError: If the OCR pool queue is full
     """
     try:
-        ocr_service = get_ocr_service()
-        result = ocr_service.extract_text(image_bytes)
+        executor = get_inference_executor("ocr")
+        if is_multipage(image_bytes):
+            return await executor.run_in_lane(lane, _ocr_document_blocking, image_bytes, preprocess)
+        
+        result = await executor.run_in_lane(
+            lane, lambda: get_ocr_service().extract_text(image_bytes, preprocess=preprocess)
+        )
         
         # Format to match expected response structure
-        return {
-            "text": result.get("text", ""),
-            "boxes": [
-                {
-                    "text": box.get("text", ""),
-                    "bbox": [
-                        box.get("left", 0),
-                        box.get("top", 0),
-                        box.get("left", 0) + box.get("width", 0),
-                        box.get("top", 0) + box.get("height", 0)
-                    ],
-                    "confidence": box.get("confidence", 0.0)
-                }
-                for box in result.get("boxes", [])
-            ],
-            "confidence": result.get("confidence", 0.0),
-            "word_count": result.get("word_count", 0),
-            "language": result.get("language", "eng"),
-        }
+        return _format_result(result)
         
+    except ExecutorBusyError:
+        raise
     except Exception as e:
         logger.error(f"OCR extraction failed: {e}", exc_info=True)
         return {
@@ -0,0 +1,114 @@
+"""
+Content-addressed cache of ingest results (STT, OCR, vision)
+Entries are keyed on the SHA-256 of the uploaded bytes plus everything that
+changes the output (model, backend, language, preprocessing), so re-uploading
+the same file answers from disk without touching an inference pool, while a
+model or parameter change misses instead of serving stale results.
+"""
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from .disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+def content_digest(data: bytes) -> str:
+    """SHA-256 hex digest of uploaded file bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+def ingest_cache_key(kind: str, digest: str, params: Dict[str, Any]) -> str:
+    """
+    Build the cache key for one ingest result
+
+    Args:
+        kind: Result type ("stt", "ocr", "vision", ...)
+        digest: content_digest of the input bytes
+        params: Model and parameters that affect the result (JSON-serializable)
+
+    Returns:
+        Key string (DiskCache hashes it into a file name)
+    """
+    return json.dumps([kind, digest, params], sort_keys=True, ensure_ascii=False, default=str)
+
+class IngestCache:
+    """Disk-backed ingest result cache with per-kind hit/miss counters"""
+
+    def __init__(self, disk_cache: DiskCache):
+        """
+        Initialize ingest cache
+
+        Args:
+            disk_cache: Storage (its TTL and max_bytes bound the cache)
+        """
+        self.disk_cache = disk_cache
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, kind: str, counter: str) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(kind, {"hits": 0, "misses": 0, "writes": 0})
+            counters[counter] += 1
+
+    def get(self, kind: str, digest: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result
+
+        Args:
+            kind: Result type
+            digest: content_digest of the input bytes
+            params: Model and parameters the result must have been produced with
+
+        Returns:
+            Cached result, or None on a miss
+        """
+        value = self.disk_cache.get(ingest_cache_key(kind, digest, params))
+        self._count(kind, "hits" if value is not None else "misses")
+        return value
+
+    def set(self, kind: str, digest: str, params: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """
+        Store a result (results carrying an "error" are not cached)
+
+        Args:
+            kind: Result type
+            digest: content_digest of the input bytes
+            params: Model and parameters the result was produced with
+            result: JSON-serializable result
+        """
+        if not result or result.get("error"):
+            return
+        self.disk_cache.set(ingest_cache_key(kind, digest, params), result)
+        self._count(kind, "writes")
+
+    def clear(self) -> None:
+        """Remove all cached results"""
+        self.disk_cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Disk usage plus per-kind hit/miss/write counters"""
+        stats = self.disk_cache.stats()
+        with self._lock:
+            stats["kinds"] = {kind: dict(counters) for kind, counters in self._counters.items()}
+        return stats
+
+_ingest_cache: Optional[IngestCache] = None
+
+def get_ingest_cache() -> Optional[IngestCache]:
+    """Get or create the ingest result cache (None if disabled via INGEST_CACHE_ENABLED)"""
+    global _ingest_cache
+    if os.getenv("INGEST_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    if _ingest_cache is None:
+        ttl_seconds = os.getenv("INGEST_CACHE_TTL_SECONDS")
+        cache_dir = os.getenv("INGEST_CACHE_DIR", "./ingest_cache")
+        _ingest_cache = IngestCache(DiskCache(
+            cache_dir,
+            ttl_seconds=float(ttl_seconds) if ttl_seconds else None,
+            max_bytes=int(os.getenv("INGEST_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+        ))
+        logger.info(f"Ingest result cache at {cache_dir}")
+    return _ingest_cache
@@ -0,0 +1,319 @@
+"""
+Durable local job queue for ingest work
+Jobs live in a SQLite database and their uploads are spooled to disk, so
+queued work survives restarts. Worker tasks claim jobs one at a time, which
+bounds ingest throughput by worker count instead of HTTP timeouts.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from .executor import ExecutorBusyError
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    filename TEXT,
+    content_type TEXT,
+    batch_id TEXT,
+    spool_path TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    not_before REAL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch_id);
+"""
+
+# Job handler: (file bytes, job row) -> JSON-serializable result
+JobHandler = Callable[[bytes, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+class JobQueue:
+    """SQLite-backed FIFO of ingest jobs with spooled payloads"""
+
+    def __init__(self, directory: str, max_attempts: int = 3):
+        """
+        Initialize job queue
+
+        Args:
+            directory: Directory for the database and the spooled uploads (created if missing)
+            max_attempts: Times a job may be started before it is marked failed
+                (a crash mid-job counts as an attempt)
+        """
+        self.directory = directory
+        self.spool_dir = os.path.join(directory, "spool")
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(directory, "jobs.sqlite3"), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "not_before" not in columns:  # Queue created before delayed requeues existed
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN not_before REAL")
+            self._conn.commit()
+
+    def _row(self, row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def submit(
+        self,
+        kind: str,
+        data: bytes,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+        batch_id: Optional[str] = None
+    ) -> str:
+        """
+        Spool an upload and enqueue a job for it
+
+        Args:
+            kind: Handler name (e.g. "audio", "image")
+            data: File bytes
+            filename: Original file name
+            content_type: Upload content type
+            batch_id: Groups jobs submitted together
+
+        Returns:
+            Job ID
+        """
+        job_id = uuid.uuid4().hex
+        spool_path = os.path.join(self.spool_dir, job_id)
+        with open(spool_path, "wb") as f:
+            f.write(data)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, filename, content_type, batch_id, spool_path, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, JOB_QUEUED, filename, content_type, batch_id, spool_path, time.time())
+            )
+            self._conn.commit()
+        return job_id
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take the oldest queued job that is due and mark it running
+
+        Returns:
+            Job row, or None if the queue is empty
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? AND (not_before IS NULL OR not_before <= ?) "
+                "ORDER BY created_at LIMIT 1",
+                (JOB_QUEUED, time.time())
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (JOB_RUNNING, time.time(), row["id"])
+            )
+            self._conn.commit()
+            job = self._row(row)
+        job["status"] = JOB_RUNNING
+        job["attempts"] += 1
+        return job
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str]) -> None:
+        with self._lock:
+            row = self._conn.execute("SELECT spool_path FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ?, spool_path = NULL WHERE id = ?",
+                (status, time.time(), json.dumps(result, ensure_ascii=False) if result is not None else None, error, job_id)
+            )
+            self._conn.commit()
+        if row is not None and row["spool_path"]:
+            try:
+                os.remove(row["spool_path"])
+            except OSError:
+                pass
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        """Store a job's result and drop its spooled upload"""
+        self._finish(job_id, JOB_DONE, result, None)
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Mark a job failed and drop its spooled upload"""
+        self._finish(job_id, JOB_FAILED, None, error)
+
+    def requeue(self, job_id: str, delay: float = 0.0) -> None:
+        """
+        Put a claimed job back; the attempt is not counted
+
+        Args:
+            job_id: Job to requeue
+            delay: Seconds before the job may be claimed again (other jobs go first meanwhile)
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL, attempts = MAX(0, attempts - 1), not_before = ? "
+                "WHERE id = ?",
+                (JOB_QUEUED, time.time() + delay if delay else None, job_id)
+            )
+            self._conn.commit()
+
+    def recover(self) -> int:
+        """
+        Requeue jobs left running by a previous process (call before starting workers)
+
+        Returns:
+            Number of jobs requeued; jobs out of attempts are marked failed instead
+        """
+        with self._lock:
+            exhausted = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? AND attempts >= ?", (JOB_RUNNING, self.max_attempts)
+            ).fetchall()
+        for row in exhausted:
+            self.fail(row["id"], "Interrupted too many times")
+        with self._lock:
+            recovered = self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (JOB_QUEUED, JOB_RUNNING)
+            ).rowcount
+            self._conn.commit()
+        if recovered:
+            logger.info(f"Requeued {recovered} interrupted ingest job(s)")
+        return recovered
+
+    def read_payload(self, job: Dict[str, Any]) -> bytes:
+        """Read a job's spooled upload"""
+        with open(job["spool_path"], "rb") as f:
+            return f.read()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a job by ID"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row)
+
+    def batch(self, batch_id: str) -> List[Dict[str, Any]]:
+        """Jobs of a batch, in submission order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE batch_id = ? ORDER BY created_at", (batch_id,)
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """Job counts per status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED)}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+class JobWorkerPool:
+    """Asyncio worker tasks that drain a JobQueue through per-kind handlers"""
+
+    def __init__(self, job_queue: JobQueue, handlers: Dict[str, JobHandler], workers: int = 2, poll_interval: float = 1.0):
+        """
+        Initialize worker pool
+
+        Args:
+            job_queue: Queue to drain
+            handlers: Job kind -> async handler
+            workers: Number of concurrent jobs
+            poll_interval: Seconds between polls when idle (submissions wake workers immediately)
+        """
+        self.job_queue = job_queue
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def notify(self) -> None:
+        """Wake idle workers after a submission"""
+        self._wakeup.set()
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            await asyncio.to_thread(self.job_queue.fail, job["id"], f"No handler for job kind '{job['kind']}'")
+            return
+        try:
+            data = await asyncio.to_thread(self.job_queue.read_payload, job)
+            result = await handler(data, job)
+        except ExecutorBusyError as e:
+            # Model pool full (interactive traffic has priority): delay this job and
+            # move on, so jobs for other (idle) model pools are not held up behind it
+            await asyncio.to_thread(self.job_queue.requeue, job["id"], e.retry_after)
+            return
+        except asyncio.CancelledError:
+            # Shutting down: put the job back without counting the attempt, so
+            # redeploys don't exhaust max_attempts. Synchronous: the task is being cancelled.
+            self.job_queue.requeue(job["id"])
+            raise
+        except Exception as e:
+            logger.error(f"Ingest job {job['id']} failed: {e}", exc_info=True)
+            await asyncio.to_thread(self.job_queue.fail, job["id"], str(e))
+            return
+        await asyncio.to_thread(self.job_queue.complete, job["id"], result)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await asyncio.to_thread(self.job_queue.claim)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run_job(job)
+
+    def start(self) -> None:
+        """Recover interrupted jobs and start the worker tasks"""
+        self.job_queue.recover()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Ingest job workers started (workers={self.workers})")
+
+    async def stop(self) -> None:
+        """Cancel the worker tasks (running jobs go back to the queue without counting the attempt)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+_job_queue: Optional[JobQueue] = None
+
+def get_job_queue() -> JobQueue:
+    """Get or create the ingest job queue"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(
+            directory=os.getenv("JOB_QUEUE_DIR", "./ingest_jobs"),
+            max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        )
+    return _job_queue
@@ -0,0 +1,223 @@
+"""
+Latency histograms and per-request stage traces
+Stage timings always feed the process-wide histogram registry (exported at
+/metrics for alerting on p95 regressions); when a request opts into debug
+tracing, the same measurements are also collected into a RequestTrace that is
+returned with the response.
+"""
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import bisect
+import contextvars
+import threading
+import time
+
+# Latency buckets in milliseconds (upper bounds)
+DEFAULT_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+class Histogram:
+    """Fixed-bucket histogram with percentile estimates"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot = +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record one sample"""
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+            self._count += 1
+            self._max = max(self._max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside the containing bucket"""
+        with self._lock:
+            if not self._count:
+                return 0.0
+            rank = q * self._count
+            seen = 0
+            for i, count in enumerate(self._counts):
+                if count and seen + count >= rank:
+                    lower = self.buckets[i - 1] if i > 0 else 0.0
+                    upper = self.buckets[i] if i < len(self.buckets) else self._max
+                    return lower + (upper - lower) * (rank - seen) / count
+                seen += count
+            return self._max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Count, mean and p50/p95/p99 estimates"""
+        p50, p95, p99 = self.quantile(0.5), self.quantile(0.95), self.quantile(0.99)
+        with self._lock:
+            return {
+                "count": self._count,
+                "mean_ms": round(self._sum / self._count, 3) if self._count else 0.0,
+                "p50_ms": round(p50, 3),
+                "p95_ms": round(p95, 3),
+                "p99_ms": round(p99, 3),
+                "max_ms": round(self._max, 3),
+            }
+
+    def prometheus_lines(self, name: str, labels: str) -> List[str]:
+        """Cumulative bucket, sum and count lines in Prometheus text format"""
+        with self._lock:
+            lines = []
+            cumulative = 0
+            sep = "," if labels else ""
+            for bound, count in zip(list(self.buckets) + ["+Inf"], self._counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {self._sum}")
+            lines.append(f"{name}_count{{{labels}}} {self._count}")
+            return lines
+
+class MetricsRegistry:
+    """Named, labelled histograms"""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help_text: str = "", **labels: str) -> Histogram:
+        """Get or create the histogram for a metric name and label set"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+                if help_text:
+                    self._help.setdefault(name, help_text)
+            return histogram
+
+    def describe(self, name: str, help_text: str) -> None:
+        """Set the HELP text for a metric"""
+        with self._lock:
+            self._help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record one sample"""
+        self.histogram(name, **labels).observe(value)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Percentile summary per metric and label set"""
+        with self._lock:
+            items = list(self._histograms.items())
+        output: Dict[str, Dict[str, Any]] = {}
+        for (name, labels), histogram in sorted(items):
+            label_key = ",".join(f"{k}={v}" for k, v in labels) or "_"
+            output.setdefault(name, {})[label_key] = histogram.snapshot()
+        return output
+
+    def render_prometheus(self) -> str:
+        """All histograms in Prometheus text exposition format"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            help_texts = dict(self._help)
+        lines = []
+        current = None
+        for (name, labels), histogram in items:
+            if name != current:
+                current = name
+                if name in help_texts:
+                    lines.append(f"# HELP {name} {help_texts[name]}")
+                lines.append(f"# TYPE {name} histogram")
+            label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+            lines.extend(histogram.prometheus_lines(name, label_text))
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Drop all histograms"""
+        with self._lock:
+            self._histograms.clear()
+
+class RequestTrace:
+    """Stage timings, candidate counts and cache outcomes for one request"""
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._stages: List[Dict[str, Any]] = []
+        self._attributes: Dict[str, Any] = {}
+        self._lock = threading.Lock()  # stages are recorded from executor threads too
+
+    def add_stage(self, stage: str, ms: float, start_ms: float, **attributes: Any) -> None:
+        with self._lock:
+            self._stages.append({"stage": stage, "start_ms": round(start_ms, 2), "ms": round(ms, 2), **attributes})
+
+    def annotate(self, key: str, value: Any) -> None:
+        """Attach a request-level attribute (candidate counts, cache outcomes, ...)"""
+        with self._lock:
+            self._attributes[key] = value
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "stages": sorted(self._stages, key=lambda s: s["start_ms"]),
+                **self._attributes,
+            }
+
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("request_trace", default=None)
+
+def start_trace() -> RequestTrace:
+    """Begin collecting a debug trace for the current request context"""
+    trace = RequestTrace()
+    _current_trace.set(trace)
+    return trace
+
+def current_trace() -> Optional[RequestTrace]:
+    """The active debug trace, if the request asked for one"""
+    return _current_trace.get()
+
+def annotate(key: str, value: Any) -> None:
+    """Attach an attribute to the active trace (no-op without one)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.annotate(key, value)
+
+@contextmanager
+def trace_stage(stage: str, metric: str = "rag_stage_latency_ms", **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time a pipeline stage into the metrics registry (and the debug trace if active)
+
+    The yielded dict can be filled with extra attributes (e.g. result counts)
+    that are stored with the stage in the trace.
+
+    Args:
+        stage: Stage name (histogram label)
+        metric: Histogram metric name
+        **attributes: Attributes recorded with the stage in the trace
+    """
+    trace = _current_trace.get()
+    start = time.perf_counter()
+    start_ms = trace.elapsed_ms() if trace is not None else 0.0
+    extra = dict(attributes)
+    try:
+        yield extra
+    finally:
+        ms = (time.perf_counter() - start) * 1000.0
+        get_metrics_registry().observe(metric, ms, stage=stage)
+        if trace is not None:
+            trace.add_stage(stage, ms, start_ms, **extra)
+
+# Global instance
+_metrics_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get or create the process-wide metrics registry"""
+    global _metrics_registry
+    if _metrics_registry is None:
+        with _registry_lock:
+            if _metrics_registry is None:
+                registry = MetricsRegistry()
+                registry.describe("rag_stage_latency_ms", "Latency of RAG pipeline components (embed, ann, bm25, fuse, rerank, llm) in milliseconds")
+                registry.describe("chat_stage_latency_ms", "Latency of chat request stages (index, cache_lookup, retrieve, generate, total) in milliseconds")
+                _metrics_registry = registry
+    return _metrics_registry
@@ -0,0 +1,234 @@
+"""
+Two-level query result cache for RAG chat
+Level 1 matches the normalized query text exactly; level 2 matches semantically
+similar queries by embedding cosine similarity. Entries are keyed on the index
+version, so a reindex invalidates everything cached before it.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import logging
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = re.compile(r"^[\s\W_]+|[\s\W_]+$")
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and strip leading/trailing punctuation"""
+    return _EDGE_PUNCTUATION.sub("", _WHITESPACE.sub(" ", query.lower())).strip()
+
+class QueryCache:
+    """LRU + TTL cache with exact and embedding-similarity lookups"""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 3600.0,
+        similarity_threshold: float = 0.95
+    ):
+        """
+        Initialize query cache
+
+        Args:
+            max_entries: Maximum number of cached queries (LRU eviction beyond this)
+            ttl_seconds: Time-to-live for each entry
+            similarity_threshold: Minimum cosine similarity for a semantic hit (> 1 disables level 2)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+
+        # key -> (expires_at, normalized embedding or None, value)
+        self._entries: "OrderedDict[Tuple, Tuple[float, Optional[np.ndarray], Dict[str, Any]]]" = OrderedDict()
+        self._index_version: Optional[Hashable] = None
+        self._lock = threading.Lock()
+
+        self._exact_hits = 0
+        self._semantic_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._stale_writes = 0
+
+    @property
+    def semantic_enabled(self) -> bool:
+        """Whether semantic (level 2) lookups are enabled"""
+        return self.similarity_threshold <= 1.0
+
+    def _check_version(self, index_version: Hashable) -> None:
+        """Drop everything when the index version changes (caller holds the lock)"""
+        if index_version != self._index_version:
+            if self._entries:
+                self._invalidations += 1
+                logger.info(f"Query cache invalidated: index version {self._index_version} -> {index_version}")
+            self._entries.clear()
+            self._index_version = index_version
+
+    def _live(self, key: Tuple, now: float) -> Optional[Tuple[float, Optional[np.ndarray], Dict[str, Any]]]:
+        """Return a non-expired entry, removing it if stale (caller holds the lock)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < now:
+            del self._entries[key]
+            return None
+        return entry
+
+    def get_exact(self, query: str, params: Tuple, index_version: Hashable) -> Optional[Dict[str, Any]]:
+        """
+        Level 1 lookup by normalized query text
+
+        Args:
+            query: Raw user query
+            params: Retrieval parameters that affect the result (top_k, weights, ...)
+            index_version: Current index version
+
+        Returns:
+            Cached value or None
+        """
+        key = (params, normalize_query(query))
+        with self._lock:
+            self._check_version(index_version)
+            entry = self._live(key, time.monotonic())
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self._exact_hits += 1
+            return entry[2]
+
+    def get_semantic(
+        self,
+        query_embedding: List[float],
+        params: Tuple,
+        index_version: Hashable
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Level 2 lookup by embedding similarity
+
+        Args:
+            query_embedding: Embedding of the incoming query
+            params: Retrieval parameters that affect the result
+            index_version: Current index version
+
+        Returns:
+            Cached value of the most similar query above the threshold, or None
+        """
+        if not self.semantic_enabled:
+            return None
+
+        vector = _unit(query_embedding)
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(index_version)
+            keys = []
+            vectors = []
+            for key in list(self._entries.keys()):
+                entry = self._live(key, now)
+                if entry is None or key[0] != params or entry[1] is None:
+                    continue
+                keys.append(key)
+                vectors.append(entry[1])
+
+            if vectors:
+                similarities = np.stack(vectors) @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.similarity_threshold:
+                    self._entries.move_to_end(keys[best])
+                    self._semantic_hits += 1
+                    return self._entries[keys[best]][2]
+
+            return None
+
+    def record_miss(self) -> None:
+        """Count a lookup that missed both levels"""
+        with self._lock:
+            self._misses += 1
+
+    def put(
+        self,
+        query: str,
+        params: Tuple,
+        index_version: Hashable,
+        value: Dict[str, Any],
+        query_embedding: Optional[List[float]] = None
+    ) -> None:
+        """
+        Store a result
+
+        Results computed against an index version other than the current one
+        are dropped: a slow request finishing after a re-index must neither
+        wipe the fresh entries nor be served as current.
+
+        Args:
+            query: Raw user query
+            params: Retrieval parameters that affect the result
+            index_version: Index version the result was computed against
+            value: Result to cache
+            query_embedding: Query embedding for semantic lookups (optional)
+        """
+        key = (params, normalize_query(query))
+        vector = _unit(query_embedding) if query_embedding is not None else None
+        with self._lock:
+            if self._index_version is None:
+                self._index_version = index_version
+            elif index_version != self._index_version:
+                self._stale_writes += 1
+                logger.debug(f"Query cache write dropped: index version {index_version} != {self._index_version}")
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, vector, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and size"""
+        with self._lock:
+            lookups = self._exact_hits + self._semantic_hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "similarity_threshold": self.similarity_threshold,
+                "index_version": self._index_version,
+                "exact_hits": self._exact_hits,
+                "semantic_hits": self._semantic_hits,
+                "misses": self._misses,
+                "hit_rate": round((self._exact_hits + self._semantic_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "stale_writes": self._stale_writes,
+            }
+
+def _unit(vector: List[float]) -> np.ndarray:
+    """Convert to a unit-length float32 vector"""
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm > 0 else array
+
+# Global instance
+_query_cache: Optional[QueryCache] = None
+
+def get_query_cache() -> Optional[QueryCache]:
+    """Get or create the chat query cache (None if disabled via CHAT_CACHE_ENABLED)"""
+    global _query_cache
+    if os.getenv("CHAT_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    if _query_cache is None:
+        _query_cache = QueryCache(
+            max_entries=int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "512")),
+            ttl_seconds=float(os.getenv("CHAT_CACHE_TTL_SECONDS", "3600")),
+            similarity_threshold=float(os.getenv("CHAT_CACHE_SIMILARITY", "0.95"))
+        )
+    return _query_cache
@@ -19,6 +19,17 @@ _vector_store: Optional[VectorStore] = None
 _embedding_service: Optional[EmbeddingService] = None
 _hybrid_search: Optional[HybridSearch] = None
 
+# Bumped on every (re)index so caches keyed on it invalidate automatically
+_index_version: int = 0
+
+def get_index_version() -> int:
+    """Get the current index version (incremented whenever the index changes)"""
+    return _index_version
+
+def _bump_index_version() -> None:
+    global _index_version
+    _index_version += 1
+
 def get_services():
     """Get or create RAG services"""
     global _vector_store, _embedding_service, _hybrid_search
@@ -55,10 +66,20 @@ def enumerate_pdfs(root_dir: str) -> List[str]:
     
     return pdf_files
 
+def _ocr_pdf(pdf_path: str) -> str:
+    """OCR a scanned (image-only) PDF page by page"""
+    from .document_ocr import ocr_document
+    with open(pdf_path, "rb") as f:
+        pages = ocr_document(f.read())
+    return "\n".join(page.get("text", "") for page in pages)
+
 def pdf_to_text(pdf_path: str) -> str:
     """
     Extract text from PDF file
     
+    Falls back to OCR when the PDF has no text layer (scanned pages), unless
+    RAG_PDF_OCR=false.
+    
     Args:
         pdf_path: Path to PDF file
         
@@ -72,7 +93,17 @@ def pdf_to_text(pdf_path: str) -> str:
             reader = PdfReader(pdf_path)
             text = ""
             for page in reader.pages:
-                text += page.extract_text() + "\n"
+                text += (page.extract_text() or "") + "\n"
+            
+            # Fewer characters than pages: treat as a scan without a text layer
+            if len(text.strip()) < len(reader.pages) and os.getenv("RAG_PDF_OCR", "true").lower() == "true":
+                logger.info(f"No text layer in {os.path.basename(pdf_path)}; running OCR on {len(reader.pages)} page(s)")
+                try:
+                    ocr_text = _ocr_pdf(pdf_path)
+                    if ocr_text.strip():
+                        return ocr_text
+                except Exception as e:
+                    logger.warning(f"OCR fallback failed for {pdf_path}: {e}")
             return text
         except ImportError:
             logger.warning("pypdf not installed. Install with: pip install pypdf")
@@ -130,6 +161,7 @@ def build_index(papers_root: str, reset: bool = False) -> Dict[str, Any]:
         # Reset if requested
         if reset:
             vector_store.reset_collection()
+            _bump_index_version()
             logger.info("Vector store reset")
         
         # Find all PDFs
@@ -198,6 +230,7 @@ def build_index(papers_root: str, reset: bool = False) -> Dict[str, Any]:
         hybrid_search.documents = all_texts
         hybrid_search.metadatas = all_metadatas
         hybrid_search.ids = all_ids
+        _bump_index_version()
         
         logger.info(f"Index built successfully: {len(all_texts)} chunks from {len(pdf_files)} documents")
         
@@ -206,7 +239,8 @@ def build_index(papers_root: str, reset: bool = False) -> Dict[str, Any]:
             "total_pdfs": len(pdf_files),
             "total_chunks": len(all_texts),
             "papers_root": papers_root,
-            "vector_store_count": vector_store.get_collection_count()
+            "vector_store_count": vector_store.get_collection_count(),
+            "index_version": get_index_version()
         }
         
     except Exception as e:
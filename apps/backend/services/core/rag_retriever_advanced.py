@@ -3,16 +3,23 @@ Advanced RAG document retrieval service
 Uses hybrid search (BM25 + vector) and re-ranking
 """
 from typing import List, Dict, Any, Optional
+import asyncio
 import logging
+import os
 
 from ..rag.hybrid_search import HybridSearch
 from ..rag.reranker import Reranker
+from ..rag.retrieval_planner import RetrievalPlanner
+from .executor import BoundedExecutor, ExecutorBusyError
+from .metrics import annotate, trace_stage
 
 logger = logging.getLogger(__name__)
 
 # Global services (singleton pattern)
 _hybrid_search: Optional[HybridSearch] = None
 _reranker: Optional[Reranker] = None
+_retrieval_executor: Optional[BoundedExecutor] = None
+_retrieval_planner: Optional[RetrievalPlanner] = None
 
 def get_services():
     """Get or create retrieval services"""
@@ -35,11 +42,86 @@ def get_services():
     
     return _hybrid_search, _reranker
 
+def get_retrieval_executor() -> BoundedExecutor:
+    """Get or create the bounded executor used for CPU-bound retrieval stages"""
+    global _retrieval_executor
+    if _retrieval_executor is None:
+        _retrieval_executor = BoundedExecutor(
+            name="retrieval",
+            max_workers=int(os.getenv("RETRIEVAL_MAX_WORKERS", "4")),
+            max_queue=int(os.getenv("RETRIEVAL_MAX_QUEUE", "32"))
+        )
+    return _retrieval_executor
+
+def get_retrieval_planner() -> RetrievalPlanner:
+    """Get or create the adaptive retrieval planner"""
+    global _retrieval_planner
+    if _retrieval_planner is None:
+        _retrieval_planner = RetrievalPlanner(
+            decisive_lead=float(os.getenv("RAG_PLANNER_DECISIVE_LEAD", "0.1")),
+            decisive_agreement=float(os.getenv("RAG_PLANNER_DECISIVE_AGREEMENT", "0.0")),
+            narrow_lead=float(os.getenv("RAG_PLANNER_NARROW_LEAD", "0.05")),
+            widen_lead=float(os.getenv("RAG_PLANNER_WIDEN_LEAD", "0.02"))
+        )
+    return _retrieval_planner
+
+def _candidate_depth(top_k: int, use_reranking: bool, adaptive: bool) -> int:
+    """Number of fused candidates to pull from the first stage"""
+    if use_reranking and adaptive:
+        return get_retrieval_planner().max_candidates(top_k)
+    return top_k * 2  # Get more results for reranking
+
+def _rerank_depth(results: List[Dict[str, Any]], top_k: int, use_reranking: bool, adaptive: bool) -> int:
+    """Number of fused candidates to re-rank (0 = return first-stage order)"""
+    if not use_reranking:
+        return 0
+    if adaptive:
+        return get_retrieval_planner().plan(results, top_k)["rerank_depth"]
+    return len(results)
+
+def _format_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert search results to the evidence format returned to callers"""
+    formatted_results = []
+    for result in results:
+        formatted_results.append({
+            "text": result.get("text", ""),
+            "path": result.get("metadata", {}).get("doc_path", ""),
+            "filename": result.get("metadata", {}).get("doc_filename", ""),
+            "score": result.get("score", 0.0),
+            "vector_score": result.get("vector_score", 0.0),
+            "bm25_score": result.get("bm25_score", 0.0),
+            "rerank_score": result.get("rerank_score"),
+            "chunk_index": result.get("metadata", {}).get("chunk_index", 0),
+            "doc_id": result.get("id", "")
+        })
+    return formatted_results
+
+def _annotate_candidates(
+    vector_scores: Dict[str, Any],
+    bm25_scores: Dict[str, Any],
+    fused: int,
+    rerank_depth: int,
+    returned: int
+) -> None:
+    """Record per-stage candidate counts on the debug trace"""
+    annotate("candidates", {
+        "vector": len(vector_scores),
+        "bm25": sum(1 for hit in bm25_scores.values() if hit["score"] > 0),
+        "fused": fused,
+        "reranked": rerank_depth,
+        "returned": returned,
+    })
+
+def _embed_query(hybrid_search: HybridSearch, query: str) -> List[float]:
+    with trace_stage("embed"):
+        return hybrid_search.embedding_service.embed_query(query)
+
 def retrieve(
     query: str, 
     top_k: int = 5,
     use_reranking: bool = True,
-    vector_weight: float = 0.5
+    vector_weight: float = 0.5,
+    adaptive: bool = False
 ) -> List[Dict[str, Any]]:
     """
     Retrieve relevant document chunks using hybrid search and re-ranking
@@ -49,6 +131,7 @@ def retrieve(
         top_k: Number of results to return
         use_reranking: Whether to use re-ranking
         vector_weight: Weight for vector search (0-1, rest is BM25)
+        adaptive: Let the retrieval planner pick the re-ranking depth (or skip it)
         
     Returns:
         List of relevant chunks with scores and metadata
@@ -61,36 +144,26 @@ def retrieve(
             return []
         
         # Perform hybrid search
-        results = hybrid_search.search(
-            query=query,
-            n_results=top_k * 2,  # Get more results for reranking
-            vector_weight=vector_weight
-        )
+        n_results = _candidate_depth(top_k, use_reranking, adaptive)
+        vector_scores = hybrid_search.vector_search(query, n_results=top_k * 4)
+        bm25_scores = hybrid_search.bm25_search(query)
+        results = hybrid_search.fuse(vector_scores, bm25_scores, n_results, alpha=vector_weight)
         
         if not results:
             logger.info(f"No results found for query: {query}")
             return []
         
         # Re-rank results
-        if use_reranking:
-            results = reranker.rerank(query, results, top_k=top_k)
+        rerank_depth = _rerank_depth(results, top_k, use_reranking, adaptive)
+        fused = len(results)
+        if rerank_depth:
+            results = reranker.rerank(query, results[:rerank_depth], top_k=top_k)
         else:
             results = results[:top_k]
         
         # Format results
-        formatted_results = []
-        for result in results:
-            formatted_results.append({
-                "text": result.get("text", ""),
-                "path": result.get("metadata", {}).get("doc_path", ""),
-                "filename": result.get("metadata", {}).get("doc_filename", ""),
-                "score": result.get("score", 0.0),
-                "vector_score": result.get("vector_score", 0.0),
-                "bm25_score": result.get("bm25_score", 0.0),
-                "rerank_score": result.get("rerank_score"),
-                "chunk_index": result.get("metadata", {}).get("chunk_index", 0),
-                "doc_id": result.get("id", "")
-            })
+        formatted_results = _format_results(results)
+        _annotate_candidates(vector_scores, bm25_scores, fused, rerank_depth, len(formatted_results))
         
         logger.info(f"Retrieved {len(formatted_results)} results for query: {query}")
         return formatted_results
@@ -99,6 +172,159 @@ def retrieve(
         logger.error(f"Error in retrieval: {e}", exc_info=True)
         return []
 
+async def embed_query_async(query: str) -> Optional[List[float]]:
+    """
+    Embed a query on the retrieval executor
+    
+    Args:
+        query: Query text
+    
+    Returns:
+        Embedding vector, or None if the embedding service is unavailable
+    
+    Raises:
+        ExecutorBusyError: If the retrieval executor queue is full
+    """
+    try:
+        executor = get_retrieval_executor()
+        hybrid_search, _ = await executor.run(get_services)
+        if not hybrid_search:
+            return None
+        return await executor.run(_embed_query, hybrid_search, query)
+    except ExecutorBusyError:
+        raise
+    except Exception as e:
+        logger.warning(f"Query embedding failed: {e}")
+        return None
+
+async def retrieve_async(
+    query: str,
+    top_k: int = 5,
+    use_reranking: bool = True,
+    vector_weight: float = 0.5,
+    query_embedding: Optional[List[float]] = None,
+    adaptive: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Non-blocking variant of retrieve for use inside async request handlers
+    
+    The vector leg (query embedding + ANN lookup) and the BM25 leg run concurrently
+    on the bounded retrieval executor; re-ranking also runs there, so the event loop
+    never blocks on model inference.
+    
+    Args:
+        query: Search query
+        top_k: Number of results to return
+        use_reranking: Whether to use re-ranking
+        vector_weight: Weight for vector search (0-1, rest is BM25)
+        query_embedding: Precomputed query embedding (e.g. from the query cache lookup)
+        adaptive: Let the retrieval planner pick the re-ranking depth (or skip it)
+        
+    Returns:
+        List of relevant chunks with scores and metadata
+    
+    Raises:
+        ExecutorBusyError: If the retrieval executor queue is full
+    """
+    try:
+        executor = get_retrieval_executor()
+        hybrid_search, reranker = await executor.run(get_services)
+        
+        if not hybrid_search:
+            logger.warning("Hybrid search not initialized. Returning empty results.")
+            return []
+        
+        n_results = _candidate_depth(top_k, use_reranking, adaptive)
+        vector_scores, bm25_scores = await asyncio.gather(
+            executor.run(hybrid_search.vector_search, query, top_k * 4, query_embedding),
+            executor.run(hybrid_search.bm25_search, query)
+        )
+        results = hybrid_search.fuse(vector_scores, bm25_scores, n_results, alpha=vector_weight)
+        
+        if not results:
+            logger.info(f"No results found for query: {query}")
+            return []
+        
+        # Re-rank results
+        rerank_depth = _rerank_depth(results, top_k, use_reranking, adaptive)
+        fused = len(results)
+        if rerank_depth:
+            results = await executor.run(reranker.rerank, query, results[:rerank_depth], top_k)
+        else:
+            results = results[:top_k]
+        
+        formatted_results = _format_results(results)
+        _annotate_candidates(vector_scores, bm25_scores, fused, rerank_depth, len(formatted_results))
+        
+        logger.info(f"Retrieved {len(formatted_results)} results for query: {query}")
+        return formatted_results
+        
+    except ExecutorBusyError:
+        raise
+    except Exception as e:
+        logger.error(f"Error in retrieval: {e}", exc_info=True)
+        return []
+
+def retrieve_batch(
+    queries: List[str],
+    top_k: int = 5,
+    use_reranking: bool = True,
+    vector_weight: float = 0.5,
+    adaptive: bool = False
+) -> List[List[Dict[str, Any]]]:
+    """
+    Retrieve evidence for many queries at once
+    
+    All queries are embedded in one pass and sent to the vector store in one
+    query; BM25 and fusion run per query; re-ranking scores every query's
+    candidates in a single cross-encoder call.
+    
+    Args:
+        queries: Search queries
+        top_k: Number of results per query
+        use_reranking: Whether to use re-ranking
+        vector_weight: Weight for vector search (0-1, rest is BM25)
+        adaptive: Let the retrieval planner pick the re-ranking depth per query
+        
+    Returns:
+        List of evidence lists, one per query (same format as retrieve)
+    """
+    try:
+        hybrid_search, reranker = get_services()
+        
+        if not hybrid_search:
+            logger.warning("Hybrid search not initialized. Returning empty results.")
+            return [[] for _ in queries]
+        
+        n_results = _candidate_depth(top_k, use_reranking, adaptive)
+        vector_scores_list = hybrid_search.vector_search_batch(queries, top_k * 4)
+        
+        fused = []
+        rerank_inputs = []
+        for query, vector_scores in zip(queries, vector_scores_list):
+            results = hybrid_search.fuse(vector_scores, hybrid_search.bm25_search(query), n_results, alpha=vector_weight)
+            rerank_depth = _rerank_depth(results, top_k, use_reranking, adaptive) if results else 0
+            fused.append(results)
+            rerank_inputs.append(results[:rerank_depth])
+        
+        # One cross-encoder call over every query's candidates
+        reranked = iter(reranker.rerank_batch(
+            [query for query, inputs in zip(queries, rerank_inputs) if inputs],
+            [inputs for inputs in rerank_inputs if inputs],
+            top_k
+        ))
+        
+        batch_results = []
+        for results, inputs in zip(fused, rerank_inputs):
+            batch_results.append(_format_results(next(reranked) if inputs else results[:top_k]))
+        
+        logger.info(f"Retrieved evidence for {len(queries)} queries in batch")
+        return batch_results
+        
+    except Exception as e:
+        logger.error(f"Error in batch retrieval: {e}", exc_info=True)
+        return [[] for _ in queries]
+
 def get_index_stats() -> Dict[str, Any]:
     """
     Get statistics about the index
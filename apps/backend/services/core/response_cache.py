@@ -0,0 +1,178 @@
+"""
+LLM answer cache keyed on the exact prompt inputs
+The key covers model, system prompt, normalized query and the ordered evidence
+chunk IDs (plus a hash of the rendered context), so a repeated question over the
+same evidence skips the LLM call. An in-process LRU tier sits in front of an
+optional on-disk TTL tier.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from .disk_cache import DiskCache
+from .query_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+def response_cache_key(
+    model: str,
+    system_prompt: Optional[str],
+    query: str,
+    evidences: List[Dict[str, Any]],
+    context: Optional[str] = None
+) -> str:
+    """
+    Build the cache key for one generation
+
+    Args:
+        model: LLM model name
+        system_prompt: System prompt sent with the request
+        query: User query
+        evidences: Evidences in the order they are placed in the context
+        context: Rendered context (hashed so edited chunks with reused IDs miss)
+
+    Returns:
+        Hex digest key
+    """
+    payload = json.dumps([
+        model,
+        hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest(),
+        normalize_query(query),
+        [ev.get("doc_id") or ev.get("path", "") for ev in evidences],
+        hashlib.sha256((context or "").encode("utf-8")).hexdigest(),
+    ], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """Two-tier (memory LRU, optional disk) cache of generated answers"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400.0,
+        disk_cache: Optional[DiskCache] = None
+    ):
+        """
+        Initialize response cache
+
+        Args:
+            max_entries: Maximum number of in-memory entries (LRU eviction beyond this)
+            ttl_seconds: Time-to-live for in-memory entries
+            disk_cache: Optional persistent second tier
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_cache = disk_cache
+
+        # key -> (expires_at, value)
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _put_memory(self, key: str, value: Dict[str, Any]) -> None:
+        """Insert into the LRU tier (caller holds the lock)"""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Look up an answer
+
+        Args:
+            key: Key from response_cache_key
+
+        Returns:
+            (cached value or None, tier that served it: "memory" / "disk")
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._memory_hits += 1
+                    return entry[1], "memory"
+                del self._entries[key]
+
+        if self.disk_cache is not None:
+            value = self.disk_cache.get(key)
+            if value is not None:
+                with self._lock:
+                    self._put_memory(key, value)
+                    self._disk_hits += 1
+                return value, "disk"
+
+        with self._lock:
+            self._misses += 1
+        return None, None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store an answer in both tiers
+
+        Args:
+            key: Key from response_cache_key
+            value: JSON-serializable answer dict
+        """
+        with self._lock:
+            self._put_memory(key, value)
+        if self.disk_cache is not None:
+            self.disk_cache.set(key, value)
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers"""
+        with self._lock:
+            self._entries.clear()
+        if self.disk_cache is not None:
+            self.disk_cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get per-tier hit counters and size"""
+        with self._lock:
+            lookups = self._memory_hits + self._disk_hits + self._misses
+            stats = {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": round((self._memory_hits + self._disk_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+        stats["disk"] = self.disk_cache.stats() if self.disk_cache is not None else None
+        return stats
+
+# Global instance
+_response_cache: Optional[ResponseCache] = None
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get or create the LLM response cache (None if disabled via RESPONSE_CACHE_ENABLED)"""
+    global _response_cache
+    if os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    if _response_cache is None:
+        ttl_seconds = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400"))
+        disk_cache = None
+        cache_dir = os.getenv("RESPONSE_CACHE_DIR")
+        if cache_dir:
+            max_bytes = os.getenv("RESPONSE_CACHE_MAX_BYTES")
+            disk_cache = DiskCache(cache_dir, ttl_seconds=ttl_seconds, max_bytes=int(max_bytes) if max_bytes else None)
+            logger.info(f"Response cache disk tier at {cache_dir}")
+        _response_cache = ResponseCache(
+            max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024")),
+            ttl_seconds=ttl_seconds,
+            disk_cache=disk_cache
+        )
+    return _response_cache
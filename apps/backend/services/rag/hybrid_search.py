@@ -8,6 +8,7 @@ import numpy as np
 
 from .vector_store import VectorStore
 from .embedding_service import EmbeddingService
+from ..core.metrics import trace_stage
 
 logger = logging.getLogger(__name__)
 
@@ -55,55 +56,103 @@ class HybridSearch:
             logger.error(f"Failed to build BM25 index: {e}", exc_info=True)
             self.bm25_index = None
     
-    def search(
+    def vector_search(
         self,
         query: str,
-        n_results: int = 5,
-        vector_weight: Optional[float] = None
-    ) -> List[Dict[str, Any]]:
+        n_results: int,
+        query_embedding: Optional[List[float]] = None
+    ) -> Dict[str, Dict[str, Any]]:
         """
-        Perform hybrid search
+        Run the vector leg of hybrid search (query embedding + ANN lookup)
         
         Args:
             query: Search query
-            n_results: Number of results to return
-            vector_weight: Override default alpha for this search
+            n_results: Number of nearest neighbours to fetch
+            query_embedding: Precomputed query embedding (skips embedding the query)
         
         Returns:
-            List of results with combined scores
+            Dict of doc_id -> normalized similarity, text, metadata, distance
         """
-        alpha = vector_weight if vector_weight is not None else self.alpha
-        
-        results = []
-        
-        # 1. Vector search
+        vector_scores = {}
         try:
-            query_embedding = self.embedding_service.embed_query(query)
-            vector_results = self.vector_store.search(query_embedding, n_results=n_results * 2)
-            
-            # Normalize vector scores (distance to similarity)
-            vector_scores = {}
-            if vector_results["distances"]:
-                max_dist = max(vector_results["distances"]) if vector_results["distances"] else 1.0
-                for i, (doc_id, distance) in enumerate(zip(vector_results["ids"], vector_results["distances"])):
-                    # Convert distance to similarity (1 - normalized_distance)
-                    similarity = 1.0 - (distance / max_dist) if max_dist > 0 else 1.0
-                    vector_scores[doc_id] = {
-                        "score": similarity,
-                        "text": vector_results["documents"][i],
-                        "metadata": vector_results["metadatas"][i],
-                        "distance": distance
-                    }
+            if query_embedding is None:
+                with trace_stage("embed"):
+                    query_embedding = self.embedding_service.embed_query(query)
+            with trace_stage("ann", requested=n_results) as stage:
+                vector_results = self.vector_store.search(query_embedding, n_results=n_results)
+                stage["candidates"] = len(vector_results["ids"])
+            vector_scores = self._normalize_vector_results(vector_results)
         except Exception as e:
             logger.warning(f"Vector search failed: {e}")
             vector_scores = {}
         
-        # 2. BM25 search
+        return vector_scores
+    
+    def vector_search_batch(
+        self,
+        queries: List[str],
+        n_results: int,
+        query_embeddings: Optional[List[List[float]]] = None
+    ) -> List[Dict[str, Dict[str, Any]]]:
+        """
+        Run the vector leg for several queries: one embedding pass, one ANN query
+        
+        Args:
+            queries: Search queries
+            n_results: Number of nearest neighbours to fetch per query
+            query_embeddings: Precomputed query embeddings (skips embedding)
+        
+        Returns:
+            One doc_id -> score dict per query (same shape as vector_search)
+        """
+        try:
+            if query_embeddings is None:
+                with trace_stage("embed_batch", queries=len(queries)):
+                    query_embeddings = self.embedding_service.embed(queries)
+            with trace_stage("ann_batch", queries=len(queries), requested=n_results):
+                batch_results = self.vector_store.search_batch(query_embeddings, n_results=n_results)
+            return [self._normalize_vector_results(vector_results) for vector_results in batch_results]
+        except Exception as e:
+            logger.warning(f"Batch vector search failed: {e}")
+            return [{} for _ in queries]
+    
+    @staticmethod
+    def _normalize_vector_results(vector_results: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Convert raw vector store results to doc_id -> normalized similarity"""
+        vector_scores = {}
+        
+        # Normalize vector scores (distance to similarity)
+        if vector_results["distances"]:
+            max_dist = max(vector_results["distances"]) if vector_results["distances"] else 1.0
+            for i, (doc_id, distance) in enumerate(zip(vector_results["ids"], vector_results["distances"])):
+                # Convert distance to similarity (1 - normalized_distance)
+                similarity = 1.0 - (distance / max_dist) if max_dist > 0 else 1.0
+                vector_scores[doc_id] = {
+                    "score": similarity,
+                    "text": vector_results["documents"][i],
+                    "metadata": vector_results["metadatas"][i],
+                    "distance": distance
+                }
+        
+        return vector_scores
+    
+    def bm25_search(self, query: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Run the BM25 leg of hybrid search
+        
+        Args:
+            query: Search query
+        
+        Returns:
+            Dict of doc_id -> normalized BM25 score, text, metadata
+        """
         bm25_scores = {}
         try:
             if self.bm25_index and self.documents:
                 tokenized_query = query.lower().split()
-                bm25_scores_raw = self.bm25_index.get_scores(tokenized_query)
+                with trace_stage("bm25") as stage:
+                    bm25_scores_raw = self.bm25_index.get_scores(tokenized_query)
+                    stage["candidates"] = int(np.count_nonzero(bm25_scores_raw))
                 
                 # Normalize BM25 scores
                 max_bm25 = max(bm25_scores_raw) if len(bm25_scores_raw) > 0 and max(bm25_scores_raw) > 0 else 1.0
@@ -121,35 +170,85 @@ class HybridSearch:
             logger.warning(f"BM25 search failed: {e}")
             bm25_scores = {}
         
-        # 3. Combine scores
-        combined_scores = {}
-        all_doc_ids = set(vector_scores.keys()) | set(bm25_scores.keys())
+        return bm25_scores
+    
+    def fuse(
+        self,
+        vector_scores: Dict[str, Dict[str, Any]],
+        bm25_scores: Dict[str, Dict[str, Any]],
+        n_results: int,
+        alpha: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Combine vector and BM25 leg results into a single ranking
         
-        for doc_id in all_doc_ids:
-            vector_score = vector_scores.get(doc_id, {}).get("score", 0.0)
-            bm25_score = bm25_scores.get(doc_id, {}).get("score", 0.0)
-            
-            # Weighted combination
-            combined_score = alpha * vector_score + (1 - alpha) * bm25_score
+        Args:
+            vector_scores: Output of vector_search
+            bm25_scores: Output of bm25_search
+            n_results: Number of results to return
+            alpha: Vector weight (defaults to self.alpha)
+        
+        Returns:
+            List of results with combined scores, best first
+        """
+        alpha = alpha if alpha is not None else self.alpha
+        
+        with trace_stage("fuse") as stage:
+            combined_scores = {}
+            all_doc_ids = set(vector_scores.keys()) | set(bm25_scores.keys())
             
-            # Get text and metadata from either source
-            text = vector_scores.get(doc_id, {}).get("text") or bm25_scores.get(doc_id, {}).get("text", "")
-            metadata = vector_scores.get(doc_id, {}).get("metadata") or bm25_scores.get(doc_id, {}).get("metadata", {})
+            for doc_id in all_doc_ids:
+                vector_score = vector_scores.get(doc_id, {}).get("score", 0.0)
+                bm25_score = bm25_scores.get(doc_id, {}).get("score", 0.0)
+                
+                # Weighted combination
+                combined_score = alpha * vector_score + (1 - alpha) * bm25_score
+                
+                # Get text and metadata from either source
+                text = vector_scores.get(doc_id, {}).get("text") or bm25_scores.get(doc_id, {}).get("text", "")
+                metadata = vector_scores.get(doc_id, {}).get("metadata") or bm25_scores.get(doc_id, {}).get("metadata", {})
+                
+                combined_scores[doc_id] = {
+                    "id": doc_id,
+                    "text": text,
+                    "metadata": metadata,
+                    "score": combined_score,
+                    "vector_score": vector_score,
+                    "bm25_score": bm25_score
+                }
             
-            combined_scores[doc_id] = {
-                "id": doc_id,
-                "text": text,
-                "metadata": metadata,
-                "score": combined_score,
-                "vector_score": vector_score,
-                "bm25_score": bm25_score
-            }
-        
-        # 4. Sort and return top results
-        sorted_results = sorted(
-            combined_scores.values(),
-            key=lambda x: x["score"],
-            reverse=True
-        )
+            # Sort and return top results
+            sorted_results = sorted(
+                combined_scores.values(),
+                key=lambda x: x["score"],
+                reverse=True
+            )
+            stage["candidates"] = min(len(sorted_results), n_results)
         
         return sorted_results[:n_results]
+    
+    def search(
+        self,
+        query: str,
+        n_results: int = 5,
+        vector_weight: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Perform hybrid search
+        
+        Args:
+            query: Search query
+            n_results: Number of results to return
+            vector_weight: Override default alpha for this search
+        
+        Returns:
+            List of results with combined scores
+        """
+        # 1. Vector search
+        vector_scores = self.vector_search(query, n_results=n_results * 2)
+        
+        # 2. BM25 search
+        bm25_scores = self.bm25_search(query)
+        
+        # 3. Combine scores and return top results
+        return self.fuse(vector_scores, bm25_scores, n_results, alpha=vector_weight)
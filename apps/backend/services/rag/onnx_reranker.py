@@ -0,0 +1,208 @@
+"""
+ONNX Runtime backend for cross-encoder re-ranking
+Exports the Hugging Face cross-encoder to ONNX once, optionally quantizes it to int8,
+and scores query-document pairs without PyTorch on the request path
+"""
+from typing import List, Optional, Sequence, Tuple
+from pathlib import Path
+import inspect
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def _model_dir(model_name: str, cache_dir: Optional[str] = None) -> Path:
+    """Directory holding the exported ONNX files for a model"""
+    root = cache_dir or os.getenv("ONNX_MODEL_DIR", "./models/onnx")
+    return Path(root) / model_name.strip("/").replace("/", "__")
+
+def export_cross_encoder_onnx(
+    model_name: str,
+    output_dir: Path,
+    quantize: bool = True,
+    opset: int = 14
+) -> Path:
+    """
+    Export a cross-encoder to ONNX (and int8 if requested)
+
+    Args:
+        model_name: Hugging Face model name or local path
+        output_dir: Directory to write model.onnx / model.int8.onnx into
+        quantize: Whether to also write a dynamically quantized int8 model
+        opset: ONNX opset version
+
+    Returns:
+        Path of the model that should be loaded
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    fp32_path = output_dir / "model.onnx"
+
+    if not fp32_path.exists():
+        logger.info(f"Exporting {model_name} to ONNX: {fp32_path}")
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        # Eager attention traces cleanly with dynamic batch/sequence axes
+        model = AutoModelForSequenceClassification.from_pretrained(model_name, attn_implementation="eager")
+        model.eval()
+
+        sample = tokenizer(
+            ["sample query"], ["sample document text"],
+            padding=True, truncation=True, return_tensors="pt"
+        )
+        input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["logits"] = {0: "batch"}
+
+        export_kwargs = {}
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+            # The TorchScript exporter handles dynamic_axes without onnxscript
+            export_kwargs["dynamo"] = False
+
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                tuple(sample[name] for name in input_names),
+                str(fp32_path),
+                input_names=input_names,
+                output_names=["logits"],
+                dynamic_axes=dynamic_axes,
+                opset_version=opset,
+                do_constant_folding=True,
+                **export_kwargs
+            )
+
+    if not quantize:
+        return fp32_path
+
+    int8_path = output_dir / "model.int8.onnx"
+    if not int8_path.exists():
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        logger.info(f"Quantizing {fp32_path} to int8: {int8_path}")
+        quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+
+    return int8_path
+
+def _resolve_activation(config) -> str:
+    """
+    Pick the activation sentence-transformers' CrossEncoder would apply,
+    so scores stay comparable between backends
+    """
+    activation_path = None
+    st_config = getattr(config, "sentence_transformers", None)
+    if isinstance(st_config, dict) and "activation_fn" in st_config:
+        activation_path = st_config["activation_fn"]
+    elif getattr(config, "sbert_ce_default_activation_function", None):
+        activation_path = config.sbert_ce_default_activation_function
+
+    if activation_path:
+        name = activation_path.rsplit(".", 1)[-1].lower()
+        if name in ("sigmoid", "identity"):
+            return name
+        logger.warning(f"Unsupported activation {activation_path} for ONNX reranker, using default")
+
+    return "sigmoid" if getattr(config, "num_labels", 1) == 1 else "identity"
+
+class OnnxCrossEncoder:
+    """Drop-in replacement for sentence-transformers CrossEncoder.predict on ONNX Runtime"""
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = True,
+        num_threads: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        max_length: int = 512
+    ):
+        """
+        Initialize ONNX cross-encoder
+
+        Args:
+            model_name: Hugging Face model name or local path
+            quantize: Use the int8 dynamically quantized model
+            num_threads: Intra-op thread count (None = onnxruntime default)
+            cache_dir: Where exported models are stored (default: ONNX_MODEL_DIR or ./models/onnx)
+            max_length: Maximum sequence length for query-document pairs
+        """
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoTokenizer
+
+        self.model_name = model_name
+        self.quantize = quantize
+        self.num_threads = num_threads
+
+        onnx_path = export_cross_encoder_onnx(
+            model_name,
+            _model_dir(model_name, cache_dir),
+            quantize=quantize
+        )
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.max_length = min(max_length, self.tokenizer.model_max_length or max_length)
+        self.activation = _resolve_activation(AutoConfig.from_pretrained(model_name))
+
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            session_options.intra_op_num_threads = num_threads
+            session_options.inter_op_num_threads = 1
+
+        self.session = ort.InferenceSession(
+            str(onnx_path),
+            sess_options=session_options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+        logger.info(
+            f"ONNX reranker loaded: {onnx_path} "
+            f"(int8={quantize}, threads={num_threads or 'default'}, activation={self.activation})"
+        )
+
+    def predict(
+        self,
+        pairs: Sequence[Tuple[str, str]],
+        batch_size: int = 32
+    ) -> np.ndarray:
+        """
+        Score query-document pairs
+
+        Args:
+            pairs: List of (query, document) tuples
+            batch_size: Pairs per ONNX Runtime call
+
+        Returns:
+            Array of relevance scores, one per pair
+        """
+        if not pairs:
+            return np.zeros(0, dtype=np.float32)
+
+        scores: List[np.ndarray] = []
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start + batch_size]
+            encoded = self.tokenizer(
+                [q for q, _ in batch],
+                [d for _, d in batch],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np"
+            )
+            feeds = {
+                name: encoded[name].astype(np.int64)
+                for name in self.input_names
+                if name in encoded
+            }
+            logits = self.session.run(None, feeds)[0]
+            if logits.ndim == 2 and logits.shape[1] == 1:
+                logits = logits[:, 0]
+            scores.append(logits)
+
+        result = np.concatenate(scores).astype(np.float32)
+        if self.activation == "sigmoid":
+            result = 1.0 / (1.0 + np.exp(-result))
+        return result
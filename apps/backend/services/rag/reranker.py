@@ -4,6 +4,9 @@ Uses cross-encoder models for better relevance scoring
 """
 from typing import List, Dict, Any, Optional
 import logging
+import os
+
+from ..core.metrics import trace_stage
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +18,10 @@ class Reranker:
     def __init__(
         self,
         model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
-        use_reranking: bool = True
+        use_reranking: bool = True,
+        backend: Optional[str] = None,
+        quantize: Optional[bool] = None,
+        num_threads: Optional[int] = None
     ):
         """
         Initialize reranker
@@ -23,25 +29,42 @@ class Reranker:
         Args:
             model_name: Cross-encoder model name
             use_reranking: Whether to actually use reranking (can disable for testing)
+            backend: 'torch' (sentence-transformers) or 'onnx' (onnxruntime).
+                Defaults to RERANKER_BACKEND env var, then 'torch'
+            quantize: Use int8 quantized weights (onnx only, default RERANKER_ONNX_QUANTIZE or True)
+            num_threads: Intra-op thread count (onnx only, default RERANKER_NUM_THREADS)
         """
         self.model_name = model_name
         self.use_reranking = use_reranking
+        self.backend = (backend or os.getenv("RERANKER_BACKEND", "torch")).lower()
         self.model = None
         
+        if self.backend not in ("torch", "onnx"):
+            raise ValueError(f"Unknown reranker backend: {self.backend}. Use 'torch' or 'onnx'")
+        
+        if quantize is None:
+            quantize = os.getenv("RERANKER_ONNX_QUANTIZE", "true").lower() in ("1", "true", "yes")
+        if num_threads is None and os.getenv("RERANKER_NUM_THREADS"):
+            num_threads = int(os.getenv("RERANKER_NUM_THREADS"))
+        
         if use_reranking:
+            cache_key = (self.backend, model_name, quantize, num_threads) if self.backend == "onnx" else model_name
             try:
-                from sentence_transformers import CrossEncoder
-                
-                if model_name not in self._model_cache:
-                    logger.info(f"Loading reranker model: {model_name}")
-                    self.model = CrossEncoder(model_name)
-                    self._model_cache[model_name] = self.model
+                if cache_key not in self._model_cache:
+                    logger.info(f"Loading reranker model: {model_name} (backend: {self.backend})")
+                    if self.backend == "onnx":
+                        from .onnx_reranker import OnnxCrossEncoder
+                        self.model = OnnxCrossEncoder(model_name, quantize=quantize, num_threads=num_threads)
+                    else:
+                        from sentence_transformers import CrossEncoder
+                        self.model = CrossEncoder(model_name)
+                    self._model_cache[cache_key] = self.model
                     logger.info(f"Reranker model {model_name} loaded")
                 else:
-                    self.model = self._model_cache[model_name]
+                    self.model = self._model_cache[cache_key]
                     logger.info(f"Using cached reranker model: {model_name}")
-            except ImportError:
-                logger.warning("sentence-transformers not installed. Reranking disabled.")
+            except ImportError as e:
+                logger.warning(f"Reranker backend '{self.backend}' dependencies not installed ({e}). Reranking disabled.")
                 self.use_reranking = False
             except Exception as e:
                 logger.warning(f"Failed to load reranker: {e}. Reranking disabled.")
@@ -76,24 +99,77 @@ class Reranker:
             pairs = [(query, result.get("text", "")) for result in results]
             
             # Get reranking scores
-            scores = self.model.predict(pairs)
+            with trace_stage("rerank", pairs=len(pairs)):
+                scores = self.model.predict(pairs)
             
-            # Update scores in results
-            reranked = []
-            for i, result in enumerate(results):
-                new_result = result.copy()
-                new_result["rerank_score"] = float(scores[i])
-                new_result["original_score"] = result.get("score", 0.0)
-                # Use rerank score as primary score
-                new_result["score"] = float(scores[i])
-                reranked.append(new_result)
-            
-            # Sort by rerank score
-            reranked.sort(key=lambda x: x["rerank_score"], reverse=True)
-            
-            return reranked[:top_k] if top_k else reranked
+            return self._apply_scores(results, scores, top_k)
             
         except Exception as e:
             logger.error(f"Reranking failed: {e}", exc_info=True)
             # Return original results on error
             return results[:top_k] if top_k else results
+    
+    def rerank_batch(
+        self,
+        queries: List[str],
+        results_list: List[List[Dict[str, Any]]],
+        top_k: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Re-rank results for several queries with a single model call
+        
+        Args:
+            queries: Search queries
+            results_list: Search results for each query
+            top_k: Number of top results to return per query (None = all)
+        
+        Returns:
+            Re-ranked results for each query
+        """
+        if not self.use_reranking or not self.model:
+            return [results[:top_k] if top_k else results for results in results_list]
+        
+        pairs = [
+            (query, result.get("text", ""))
+            for query, results in zip(queries, results_list)
+            for result in results
+        ]
+        if not pairs:
+            return [[] for _ in results_list]
+        
+        try:
+            with trace_stage("rerank_batch", queries=len(queries), pairs=len(pairs)):
+                scores = self.model.predict(pairs)
+            
+            reranked = []
+            offset = 0
+            for results in results_list:
+                reranked.append(self._apply_scores(results, scores[offset:offset + len(results)], top_k))
+                offset += len(results)
+            return reranked
+            
+        except Exception as e:
+            logger.error(f"Batch reranking failed: {e}", exc_info=True)
+            return [results[:top_k] if top_k else results for results in results_list]
+    
+    @staticmethod
+    def _apply_scores(
+        results: List[Dict[str, Any]],
+        scores,
+        top_k: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        """Attach cross-encoder scores to results and sort by them"""
+        # Update scores in results
+        reranked = []
+        for i, result in enumerate(results):
+            new_result = result.copy()
+            new_result["rerank_score"] = float(scores[i])
+            new_result["original_score"] = result.get("score", 0.0)
+            # Use rerank score as primary score
+            new_result["score"] = float(scores[i])
+            reranked.append(new_result)
+        
+        # Sort by rerank score
+        reranked.sort(key=lambda x: x["rerank_score"], reverse=True)
+        
+        return reranked[:top_k] if top_k else reranked
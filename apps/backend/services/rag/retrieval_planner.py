@@ -0,0 +1,145 @@
+"""
+Adaptive retrieval planner
+Decides how many first-stage candidates to send to the cross-encoder, based on how
+decisive the hybrid search ranking is. The signal is the fused score lead of the
+top-1 result over the runner-up: a clear leader is almost always already correct,
+so re-ranking is skipped, while a near-tie gets a wider candidate set.
+
+Default thresholds were calibrated with benchmarks/run_rag_bench.py (30 docs, 120
+queries, top_k=5): every query with a lead >= 0.1 already had MRR 1.0 without
+re-ranking, while near-ties (lead < 0.02) gained most from a wider pool. BM25/vector top-k agreement
+is reported but does not gate skipping by default, since on that set it was
+inversely correlated with first-stage correctness, and the top-k boundary gap
+was below 0.02 for ~90% of queries, so it cannot separate easy from hard ones.
+"""
+from typing import Any, Dict, List
+import logging
+import math
+import threading
+
+logger = logging.getLogger(__name__)
+
+class RetrievalPlanner:
+    """Choose re-ranking depth from first-stage confidence signals"""
+
+    DECISIONS = ("skip", "narrow", "default", "widen")
+
+    def __init__(
+        self,
+        decisive_lead: float = 0.1,
+        decisive_agreement: float = 0.0,
+        narrow_lead: float = 0.05,
+        widen_lead: float = 0.02,
+        narrow_factor: float = 1.5,
+        default_factor: float = 2.0,
+        widen_factor: float = 3.0
+    ):
+        """
+        Initialize retrieval planner
+
+        Args:
+            decisive_lead: Minimum top-1 fused score lead to skip re-ranking
+            decisive_agreement: Minimum BM25/vector top-k overlap also required to skip
+            narrow_lead: Minimum top-1 lead to re-rank a narrower candidate set
+            widen_lead: Top-1 lead below which the candidate set is widened
+            narrow_factor: Candidate depth multiplier (of top_k) when narrowing
+            default_factor: Candidate depth multiplier for the default plan
+            widen_factor: Candidate depth multiplier when widening
+        """
+        self.decisive_lead = decisive_lead
+        self.decisive_agreement = decisive_agreement
+        self.narrow_lead = narrow_lead
+        self.widen_lead = widen_lead
+        self.narrow_factor = narrow_factor
+        self.default_factor = default_factor
+        self.widen_factor = widen_factor
+
+        self._lock = threading.Lock()
+        self._decisions = {decision: 0 for decision in self.DECISIONS}
+
+    def max_candidates(self, top_k: int) -> int:
+        """Largest number of fused candidates any plan can ask for"""
+        return int(math.ceil(top_k * self.widen_factor))
+
+    @staticmethod
+    def agreement(candidates: List[Dict[str, Any]], top_k: int) -> float:
+        """
+        Overlap between the BM25-only and vector-only top-k within the candidate pool
+
+        Args:
+            candidates: Fused candidates carrying vector_score and bm25_score
+            top_k: Number of results the caller wants
+
+        Returns:
+            Fraction of the top-k shared by both rankings (0-1)
+        """
+        k = min(top_k, len(candidates))
+        if k == 0:
+            return 0.0
+        by_vector = sorted(candidates, key=lambda c: c.get("vector_score", 0.0), reverse=True)[:k]
+        by_bm25 = sorted(candidates, key=lambda c: c.get("bm25_score", 0.0), reverse=True)[:k]
+        shared = {c.get("id") for c in by_vector} & {c.get("id") for c in by_bm25}
+        return len(shared) / k
+
+    @staticmethod
+    def top_lead(candidates: List[Dict[str, Any]]) -> float:
+        """Fused score lead of the first result over the second"""
+        if len(candidates) < 2:
+            return 1.0
+        return candidates[0].get("score", 0.0) - candidates[1].get("score", 0.0)
+
+    @staticmethod
+    def boundary_gap(candidates: List[Dict[str, Any]], top_k: int) -> float:
+        """Fused score gap between the last result kept and the first one dropped"""
+        if len(candidates) <= top_k:
+            return 1.0
+        return candidates[top_k - 1].get("score", 0.0) - candidates[top_k].get("score", 0.0)
+
+    def plan(self, candidates: List[Dict[str, Any]], top_k: int) -> Dict[str, Any]:
+        """
+        Decide the re-ranking depth for a fused candidate list
+
+        Args:
+            candidates: Fused first-stage results, best first
+            top_k: Number of results the caller wants
+
+        Returns:
+            Dict with decision, rerank_depth (0 = skip re-ranking) and the signals used
+        """
+        agreement = self.agreement(candidates, top_k)
+        gap = self.boundary_gap(candidates, top_k)
+        lead = self.top_lead(candidates)
+
+        if lead >= self.decisive_lead and agreement >= self.decisive_agreement:
+            decision, factor = "skip", 0.0
+        elif lead < self.widen_lead:
+            decision, factor = "widen", self.widen_factor
+        elif lead >= self.narrow_lead:
+            decision, factor = "narrow", self.narrow_factor
+        else:
+            decision, factor = "default", self.default_factor
+
+        rerank_depth = min(len(candidates), int(math.ceil(top_k * factor)))
+
+        with self._lock:
+            self._decisions[decision] += 1
+
+        logger.debug(
+            f"Retrieval plan: {decision} (depth={rerank_depth}, lead={lead:.3f}, agreement={agreement:.2f})"
+        )
+        return {
+            "decision": decision,
+            "rerank_depth": rerank_depth,
+            "lead": round(lead, 4),
+            "agreement": round(agreement, 4),
+            "boundary_gap": round(gap, 4),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Get decision counters"""
+        with self._lock:
+            total = sum(self._decisions.values())
+            return {
+                "decisions": dict(self._decisions),
+                "skip_rate": round(self._decisions["skip"] / total, 4) if total else 0.0,
+            }
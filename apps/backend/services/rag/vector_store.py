@@ -131,6 +131,51 @@ class VectorStore:
                 "ids": [],
             }
     
+    def search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        where: Optional[Dict] = None,
+        where_document: Optional[Dict] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for several queries in a single collection query
+        
+        Args:
+            query_embeddings: Query embedding vectors
+            n_results: Number of results per query
+            where: Metadata filter
+            where_document: Document content filter
+        
+        Returns:
+            One dict per query with documents, metadatas, distances, and ids
+        """
+        if not query_embeddings:
+            return []
+        try:
+            results = self.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=where,
+                where_document=where_document
+            )
+            
+            return [
+                {
+                    "documents": results["documents"][i] if results["documents"] else [],
+                    "metadatas": results["metadatas"][i] if results["metadatas"] else [],
+                    "distances": results["distances"][i] if results["distances"] else [],
+                    "ids": results["ids"][i] if results["ids"] else [],
+                }
+                for i in range(len(query_embeddings))
+            ]
+        except Exception as e:
+            logger.error(f"Batch vector search failed: {e}", exc_info=True)
+            return [
+                {"documents": [], "metadatas": [], "distances": [], "ids": []}
+                for _ in query_embeddings
+            ]
+    
     def get_collection_count(self) -> int:
         """Get number of documents in collection"""
         return self.collection.count()
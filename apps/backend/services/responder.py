@@ -1,78 +1,235 @@
 """
 Response generation service
-Uses DeepSeek API when configured, falls back to dummy responses otherwise
+Uses the DeepSeek API or a local llama.cpp model (LLM_BACKEND), falls back to dummy responses otherwise
 """
-from typing import Dict, List, Any
+from typing import Dict, List, Any, AsyncIterator, Optional, Protocol, Set, Tuple
 import logging
+import os
+
+from .ai.llm_gateway import CircuitOpenError
+from .core.context_packer import count_tokens, get_context_packer
+from .core.conversation_store import ConversationSession
+from .core.metrics import annotate, trace_stage
+from .core.response_cache import get_response_cache, response_cache_key
 
 logger = logging.getLogger(__name__)
 
-async def draft_reply(query: str, evidences: List[Dict[str, Any]]) -> Dict[str, Any]:
+# Kept constant and sent first so provider-side prefix caching (DeepSeek context
+# caching, the llama.cpp prompt cache) can reuse the evaluated prefix across requests
+SYSTEM_PROMPT = (
+    "You are a helpful AI assistant that answers questions based on provided documents. "
+    "Use the context from the documents to provide accurate and relevant answers. "
+    "Cite specific documents when possible. "
+    "If the context doesn't contain enough information to answer the question, "
+    "say so clearly."
+)
+
+class GenerationBackend(Protocol):
+    """Interface shared by generation services (DeepSeekService, LocalLLMService)"""
+    
+    provider: str
+    model: str
+    
+    def is_configured(self) -> bool: ...
+    
+    async def start(self) -> None: ...
+    
+    async def aclose(self) -> None: ...
+    
+    async def warmup(self) -> bool: ...
+    
+    async def generate_response(
+        self, query: str, context: Optional[str] = None, system_prompt: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> str: ...
+    
+    def generate_response_stream(
+        self, query: str, context: Optional[str] = None, system_prompt: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]: ...
+
+def get_generation_backend() -> GenerationBackend:
+    """
+    Select the generation backend from LLM_BACKEND
+    
+    deepseek: remote DeepSeek API
+    local: llama.cpp model from LOCAL_LLM_MODEL_PATH (offline sites)
+    auto (default): DeepSeek if an API key is set, else the local model if available
+    
+    Returns:
+        Backend instance (may be unconfigured, in which case callers use the dummy response)
+    """
+    choice = os.getenv("LLM_BACKEND", "auto").lower()
+    if choice == "local":
+        from .ai.local_llm_service import get_local_llm_service
+        return get_local_llm_service()
+    
+    from .ai.deepseek_service import get_deepseek_service
+    deepseek = get_deepseek_service()
+    if choice == "auto" and not deepseek.is_configured():
+        from .ai.local_llm_service import get_local_llm_service
+        local = get_local_llm_service()
+        if local.is_configured():
+            return local
+    return deepseek
+
+def _pack_evidences(evidences: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Run the context packer over evidences (None when there are none)"""
+    if not evidences:
+        return None
+    packed = get_context_packer().pack(evidences)
+    logger.debug(
+        f"Packed context: {packed['tokens']}/{packed['token_budget']} tokens, "
+        f"{len(packed['passages'])} passages, {packed['merged_chunks']} merged, "
+        f"{packed['dropped_duplicates']} duplicates dropped"
+    )
+    annotate("context", {"tokens": packed["tokens"], "passages": len(packed["passages"])})
+    return packed
+
+def _build_context(evidences: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Build the LLM context block from retrieved evidences
+    
+    Adjacent chunks are merged, near-duplicates dropped, and passages added by
+    relevance until the CONTEXT_TOKEN_BUDGET is filled.
+    
+    Args:
+        evidences: List of retrieved document chunks
+        
+    Returns:
+        Context string, or None when there are no evidences
+    """
+    packed = _pack_evidences(evidences)
+    return packed["context"] if packed else None
+
+def _conversation_history(conversation: ConversationSession) -> Tuple[List[Dict[str, str]], Set[str]]:
+    """
+    Replayable history for a conversation, newest turns kept within its token budget
+    
+    Returns:
+        (user/assistant messages oldest first, chunk IDs whose text those messages already carry)
+    """
+    from .ai.deepseek_service import user_message
+    
+    kept = []
+    used = 0
+    for turn in reversed(conversation.recent_turns()):
+        messages = [user_message(turn["query"], turn["context"]), {"role": "assistant", "content": turn["answer"]}]
+        cost = sum(count_tokens(m["content"]) for m in messages)
+        if kept and used + cost > conversation.history_tokens:
+            break
+        kept.append((messages, turn["context_ids"]))
+        used += cost
+    
+    history = [message for messages, _ in reversed(kept) for message in messages]
+    sent_ids = {chunk_id for _, context_ids in kept for chunk_id in context_ids}
+    return history, sent_ids
+
+def _conversation_context(
+    evidences: List[Dict[str, Any]], conversation: Optional[ConversationSession]
+) -> Tuple[Optional[str], List[str], Optional[List[Dict[str, str]]]]:
+    """
+    Build the context for one turn
+    
+    In a conversation only evidence not already carried by the replayed history
+    is packed, so follow-ups send incremental context.
+    
+    Args:
+        evidences: List of retrieved document chunks
+        conversation: Session for multi-turn chat, or None
+        
+    Returns:
+        (context string or None, chunk IDs packed into it, history messages or None outside a conversation)
+    """
+    if conversation is None:
+        return _build_context(evidences), [], None
+    history, sent_ids = _conversation_history(conversation)
+    new = [ev for ev in evidences if ev.get("doc_id") not in sent_ids]
+    annotate("conversation", {
+        "history_turns": len(history) // 2,
+        "evidence_in_history": len(evidences) - len(new),
+        "evidence_new": len(new),
+    })
+    packed = _pack_evidences(new)
+    if packed is None:
+        return None, [], history
+    context_ids = [chunk_id for passage in packed["passages"] for chunk_id in passage["chunk_ids"]]
+    return packed["context"], context_ids, history
+
+
+async def draft_reply(
+    query: str,
+    evidences: List[Dict[str, Any]],
+    conversation: Optional[ConversationSession] = None
+) -> Dict[str, Any]:
     """
     Generate response based on query and retrieved evidence
-    Uses DeepSeek API if configured, otherwise uses dummy responses
+    Uses the configured generation backend, otherwise uses dummy responses
     
     Args:
         query: User query
         evidences: List of retrieved document chunks
+        conversation: Session for multi-turn chat; earlier turns are replayed and the turn is recorded
         
     Returns:
         Dict with generated answer
     """
     try:
-        # Try to use DeepSeek API if configured
+        # Try to use the configured generation backend
         try:
-            from .ai.deepseek_service import get_deepseek_service
+            backend = get_generation_backend()
             
-            deepseek = get_deepseek_service()
-            
-            if deepseek.is_configured():
-                # Build context from evidences
-                if evidences:
-                    context_parts = []
-                    for i, ev in enumerate(evidences[:5], 1):  # Use top 5 evidences
-                        context_parts.append(
-                            f"[Document {i}]\n"
-                            f"Source: {ev.get('filename', ev.get('path', 'Unknown'))}\n"
-                            f"Content: {ev.get('text', '')[:500]}\n"
-                        )
-                    context = "\n\n".join(context_parts)
-                else:
-                    context = None
+            if backend.is_configured():
+                context, context_ids, history = _conversation_context(evidences, conversation)
                 
-                # Generate response using DeepSeek
-                system_prompt = (
-                    "You are a helpful AI assistant that answers questions based on provided documents. "
-                    "Use the context from the documents to provide accurate and relevant answers. "
-                    "Cite specific documents when possible. "
-                    "If the context doesn't contain enough information to answer the question, "
-                    "say so clearly."
-                )
+                # Same model, prompt, query and evidence as a previous answer: reuse it
+                # (not for follow-ups, whose answers depend on the earlier turns)
+                cache = get_response_cache() if not history else None
+                cache_key = None
+                if cache is not None:
+                    cache_key = response_cache_key(backend.model, SYSTEM_PROMPT, query, evidences, context)
+                    cached, tier = cache.get(cache_key)
+                    annotate("response_cache", tier or "miss")
+                    if cached is not None:
+                        if conversation is not None:
+                            conversation.add_turn(query, context, cached["answer"], context_ids)
+                        return {**cached, "cache": tier}
                 
-                answer = await deepseek.generate_response(
-                    query=query,
-                    context=context,
-                    system_prompt=system_prompt
-                )
+                with trace_stage("llm", provider=backend.provider):
+                    answer = await backend.generate_response(
+                        query=query,
+                        context=context,
+                        system_prompt=SYSTEM_PROMPT,
+                        **({"history": history} if history else {})
+                    )
+                if conversation is not None:
+                    conversation.add_turn(query, context, answer, context_ids)
                 
-                return {
+                response = {
                     "answer": answer,
                     "evidence_count": len(evidences),
                     "confidence": 0.9 if evidences else 0.5,
-                    "provider": "deepseek"
+                    "provider": backend.provider
                 }
+                if cache_key is not None:
+                    cache.put(cache_key, response)
+                return response
             else:
-                # DeepSeek not configured, use dummy response
-                logger.warning("DeepSeek API not configured. Using dummy response.")
+                # No backend configured, use dummy response
+                logger.warning(f"{backend.provider} generation backend not configured. Using dummy response.")
                 return _generate_dummy_response(query, evidences)
                 
         except ImportError:
-            # DeepSeek service not available
-            logger.warning("DeepSeek service not available. Using dummy response.")
+            # Backend service not available
+            logger.warning("Generation backend not available. Using dummy response.")
+            return _generate_dummy_response(query, evidences)
+        except CircuitOpenError as e:
+            # Provider degraded: shed immediately instead of queueing more failing calls
+            logger.warning(f"{e} Using dummy response.")
             return _generate_dummy_response(query, evidences)
         except Exception as e:
-            # DeepSeek API error, fall back to dummy
-            logger.error(f"DeepSeek API error: {e}. Falling back to dummy response.")
+            # Backend error, fall back to dummy
+            logger.error(f"Generation backend error: {e}. Falling back to dummy response.")
             return _generate_dummy_response(query, evidences)
         
     except Exception as e:
@@ -85,6 +242,99 @@ async def draft_reply(query: str, evidences: List[Dict[str, Any]]) -> Dict[str,
         }
 
 
+async def draft_reply_stream(
+    query: str,
+    evidences: List[Dict[str, Any]],
+    conversation: Optional[ConversationSession] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a response based on query and retrieved evidence
+    
+    Yields {"type": "token", "text": ...} events as the answer is generated,
+    then a final {"type": "done", ...} event with the provider metadata.
+    Failures before the first token fall back to the dummy response (sent as
+    a single token); failures mid-stream end with {"type": "error", ...}.
+    
+    Args:
+        query: User query
+        evidences: List of retrieved document chunks
+        conversation: Session for multi-turn chat; earlier turns are replayed and the turn is recorded
+        
+    Yields:
+        Event dicts
+    """
+    provider = "dummy"
+    started = False
+    try:
+        backend = get_generation_backend()
+        if not backend.is_configured():
+            logger.warning(f"{backend.provider} generation backend not configured. Using dummy response.")
+            raise LookupError("Generation backend not configured")
+        provider = backend.provider
+        
+        context, context_ids, history = _conversation_context(evidences, conversation)
+        cache = get_response_cache() if not history else None
+        cache_key = None
+        if cache is not None:
+            cache_key = response_cache_key(backend.model, SYSTEM_PROMPT, query, evidences, context)
+            cached, tier = cache.get(cache_key)
+            annotate("response_cache", tier or "miss")
+            if cached is not None:
+                if conversation is not None:
+                    conversation.add_turn(query, context, cached["answer"], context_ids)
+                yield {"type": "token", "text": cached["answer"]}
+                yield {
+                    "type": "done",
+                    "evidence_count": cached["evidence_count"],
+                    "confidence": cached["confidence"],
+                    "provider": cached["provider"],
+                    "cache": tier
+                }
+                return
+        
+        parts = []
+        with trace_stage("llm", provider=provider, streamed=True) as stage:
+            async for token in backend.generate_response_stream(
+                query=query,
+                context=context,
+                system_prompt=SYSTEM_PROMPT,
+                **({"history": history} if history else {})
+            ):
+                started = True
+                parts.append(token)
+                stage["tokens"] = len(parts)
+                yield {"type": "token", "text": token}
+        
+        if conversation is not None:
+            conversation.add_turn(query, context, "".join(parts), context_ids)
+        if cache_key is not None:
+            cache.put(cache_key, {
+                "answer": "".join(parts),
+                "evidence_count": len(evidences),
+                "confidence": 0.9 if evidences else 0.5,
+                "provider": provider
+            })
+    except Exception as e:
+        if started:
+            logger.error(f"Generation stream interrupted: {e}")
+            yield {"type": "error", "message": f"Generation interrupted: {str(e)}"}
+            return
+        if isinstance(e, CircuitOpenError):
+            logger.warning(f"{e} Using dummy response.")
+        elif not isinstance(e, LookupError):
+            logger.error(f"Generation backend error: {e}. Falling back to dummy response.")
+        fallback = _generate_dummy_response(query, evidences)
+        provider = fallback["provider"]
+        yield {"type": "token", "text": fallback["answer"]}
+    
+    yield {
+        "type": "done",
+        "evidence_count": len(evidences),
+        "confidence": (0.85 if evidences else 0.3) if provider == "dummy" else (0.9 if evidences else 0.5),
+        "provider": provider
+    }
+
+
 def _generate_dummy_response(query: str, evidences: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Generate dummy response when DeepSeek API is not available
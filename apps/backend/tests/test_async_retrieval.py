@@ -0,0 +1,146 @@
+"""
+Tests for the bounded executor and non-blocking retrieval path
+"""
+import pytest
+import asyncio
+import threading
+import time
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.core.executor import BoundedExecutor, ExecutorBusyError
+from apps.backend.services.core import rag_retriever_advanced
+
+def test_executor_rejects_when_queue_full():
+    """Work beyond workers + queue slots is rejected, and slots free up afterwards"""
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run(release.wait, 5))
+        second = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+
+        stats = executor.stats()
+        assert stats["running"] == 1
+        assert stats["queue_depth"] == 1
+
+        with pytest.raises(ExecutorBusyError):
+            await executor.run(time.sleep, 0)
+
+        release.set()
+        await asyncio.gather(first, second)
+        return await executor.run(lambda: "ok")
+
+    assert asyncio.run(scenario()) == "ok"
+    stats = executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["queue_depth"] == 0
+    executor.shutdown()
+
+class _SlowHybridSearch:
+    """Hybrid search stub whose legs block for a fixed time"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.alpha = 0.5
+
+    def vector_search(self, query, n_results, query_embedding=None):
+        time.sleep(self.delay)
+        return {"a": {"score": 1.0, "text": "spindle limit 60C", "metadata": {"doc_filename": "m.pdf"}}}
+
+    def bm25_search(self, query):
+        time.sleep(self.delay)
+        return {"b": {"score": 1.0, "text": "coolant pressure", "metadata": {"doc_filename": "n.pdf"}}}
+
+    def fuse(self, vector_scores, bm25_scores, n_results, alpha=None):
+        from apps.backend.services.rag.hybrid_search import HybridSearch
+        return HybridSearch.fuse(self, vector_scores, bm25_scores, n_results, alpha)
+
+def test_retrieve_async_runs_legs_concurrently_without_blocking_loop(monkeypatch):
+    """Vector and BM25 legs overlap and the event loop keeps ticking meanwhile"""
+    delay = 0.2
+    monkeypatch.setattr(rag_retriever_advanced, "_hybrid_search", _SlowHybridSearch(delay))
+    monkeypatch.setattr(rag_retriever_advanced, "_reranker", object())
+    monkeypatch.setattr(rag_retriever_advanced, "_retrieval_executor", BoundedExecutor("test-retrieval", 4, 4))
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        tick_task = asyncio.ensure_future(ticker())
+        start = time.perf_counter()
+        results = await rag_retriever_advanced.retrieve_async("spindle", top_k=2, use_reranking=False)
+        elapsed = time.perf_counter() - start
+        tick_task.cancel()
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(scenario())
+
+    assert {r["doc_id"] for r in results} == {"a", "b"}
+    assert elapsed < delay * 1.8
+    assert ticks >= 5
+
+def test_index_status_checked_off_the_hot_path():
+    """A ready status is served from cache and refreshed in the background once stale"""
+    from apps.backend.services.core.chat_pipeline import IndexStatusMonitor
+    statuses = [{"status": "error"}, {"status": "loaded"}, {"status": "loaded", "refreshed": True}]
+    monitor = IndexStatusMonitor(lambda: statuses.pop(0), ttl_seconds=0.0)
+
+    async def scenario():
+        first = await monitor.get()           # not ready: checked inline, not cached
+        second = await monitor.get()          # ready: checked inline, cached
+        third = await monitor.get()           # stale: served from cache, refresh scheduled
+        await asyncio.sleep(0.1)
+        monitor.ttl_seconds = 60.0
+        return first, second, third, await monitor.get()
+
+    first, second, third, fourth = asyncio.run(scenario())
+
+    assert first["status"] == "error"
+    assert second == third == {"status": "loaded"}
+    assert fourth.get("refreshed")
+    assert monitor.stats()["checks"] == 3
+
+    # Concurrent first requests on an unbuilt index share one check (one build)
+    def slow_build():
+        time.sleep(0.05)
+        return {"status": "built"}
+
+    cold = IndexStatusMonitor(slow_build)
+
+    async def concurrent():
+        return await asyncio.gather(*(cold.get() for _ in range(8)))
+
+    assert all(status == {"status": "built"} for status in asyncio.run(concurrent()))
+    assert cold.stats()["checks"] == 1
+
+def test_unawaited_warmup_failure_is_consumed(caplog):
+    """A request that returns early never awaits its warm-up; the failure is still retrieved and logged"""
+    from apps.backend.services.core.chat_pipeline import start_warmup
+
+    class _Backend:
+        def is_configured(self):
+            return True
+
+        async def warmup(self):
+            raise RuntimeError("model file missing")
+
+    async def scenario():
+        task = start_warmup(_Backend())
+        await asyncio.sleep(0.01)
+        return task
+
+    with caplog.at_level("WARNING"):
+        task = asyncio.run(scenario())
+    assert task.done() and "model file missing" in caplog.text
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,109 @@
+"""
+Tests for in-memory audio decoding shared by STT and emotion analysis
+"""
+import pytest
+import asyncio
+import io
+import shutil
+import wave
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.core import audio_decode
+from apps.backend.services.core.audio_decode import decode_audio, SAMPLE_RATE
+
+def _wav_bytes(samples: np.ndarray, rate: int, channels: int = 1) -> bytes:
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+def _tone(rate: int, seconds: float = 0.5, freq: float = 440.0) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    return 0.5 * np.sin(2 * np.pi * freq * t)
+
+def test_wav_fast_path_without_ffmpeg(monkeypatch):
+    """16 kHz PCM WAV is parsed in-process; ffmpeg is never spawned"""
+    monkeypatch.setattr(audio_decode, "_decode_ffmpeg", lambda *a: pytest.fail("ffmpeg should not run"))
+    tone = _tone(SAMPLE_RATE)
+
+    samples = decode_audio(_wav_bytes(tone, SAMPLE_RATE))
+
+    assert samples.dtype == np.float32
+    assert len(samples) == len(tone)
+    assert np.max(np.abs(samples - tone)) < 1e-3
+
+@pytest.mark.skipif(not audio_decode.SCIPY_AVAILABLE, reason="scipy not installed")
+def test_wav_stereo_is_downmixed_and_resampled(monkeypatch):
+    """Stereo 8 kHz input comes out mono at 16 kHz"""
+    monkeypatch.setattr(audio_decode, "_decode_ffmpeg", lambda *a: pytest.fail("ffmpeg should not run"))
+    tone = _tone(8000)
+    stereo = np.stack([tone, tone], axis=1).reshape(-1)
+
+    samples = decode_audio(_wav_bytes(stereo, 8000, channels=2))
+
+    assert len(samples) == 2 * len(tone)
+    assert 0.45 < np.max(np.abs(samples)) < 0.55
+
+def test_non_wav_is_piped_through_ffmpeg(monkeypatch):
+    """Other formats go to ffmpeg over stdin/stdout, never a temp file"""
+    calls = []
+
+    class _Completed:
+        returncode = 0
+        stdout = (np.ones(160, dtype=np.int16) * 16384).tobytes()
+        stderr = b""
+
+    def fake_run(command, input, capture_output):
+        calls.append((command, input))
+        return _Completed()
+
+    monkeypatch.setattr(audio_decode.shutil, "which", lambda name: "/usr/bin/ffmpeg")
+    monkeypatch.setattr(audio_decode.subprocess, "run", fake_run)
+
+    samples = decode_audio(b"ID3\x03fake-mp3-bytes")
+
+    command, piped = calls[0]
+    assert command[command.index("-i") + 1] == "pipe:0" and command[-1] == "pipe:1"
+    assert piped == b"ID3\x03fake-mp3-bytes"
+    assert len(samples) == 160 and samples[0] == pytest.approx(0.5)
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_ffmpeg_decodes_real_audio():
+    """A real ffmpeg pipe decodes and resamples to 16 kHz"""
+    samples = audio_decode._decode_ffmpeg(_wav_bytes(_tone(22050), 22050), SAMPLE_RATE)
+    assert abs(len(samples) - SAMPLE_RATE // 2) < 200
+
+def test_decoded_samples_are_shared_by_stt_and_emotion(monkeypatch):
+    """WhisperService and emotion analysis accept the decoded array directly"""
+    from apps.backend.services.ai.whisper_service import WhisperService
+    from apps.backend.services.core.audio_emotion import predict_emotion_from_wav
+
+    received = []
+
+    class _FakeModel:
+        def transcribe(self, audio, **kwargs):
+            received.append(audio)
+            return {"text": " hello ", "language": "en", "segments": []}
+
+    service = WhisperService.__new__(WhisperService)
+    service.model = _FakeModel()
+    samples = decode_audio(_wav_bytes(_tone(SAMPLE_RATE), SAMPLE_RATE))
+
+    result = service.transcribe(samples)
+    emotion = asyncio.run(predict_emotion_from_wav(samples))
+
+    assert result["text"] == "hello"
+    assert received[0] is samples
+    assert emotion["label"] == "neutral"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,99 @@
+"""
+Tests for VAD segmentation and the streaming transcription WebSocket
+"""
+import pytest
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.core.audio_vad import EnergyVADSegmenter
+
+RATE = 16000
+
+def _tone(seconds: float, amplitude: float = 0.3) -> np.ndarray:
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+def _silence(seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return (0.001 * rng.standard_normal(int(RATE * seconds))).astype(np.float32)
+
+def _speech_with_pause() -> np.ndarray:
+    return np.concatenate([_silence(0.5), _tone(1.0), _silence(1.0), _tone(1.5), _silence(1.0)])
+
+def test_segmenter_splits_at_pauses():
+    """Two bursts separated by a pause become two segments with stream-relative starts"""
+    segmenter = EnergyVADSegmenter(min_silence_ms=600, padding_ms=150)
+    audio = _speech_with_pause()
+
+    segments = []
+    for offset in range(0, len(audio), 1000):  # arbitrary frame sizes
+        segments.extend(segmenter.push(audio[offset:offset + 1000]))
+    segments.extend(segmenter.flush())
+
+    assert len(segments) == 2
+    assert segments[0].start == pytest.approx(0.35, abs=0.05)
+    assert segments[1].start == pytest.approx(2.35, abs=0.05)
+    assert 1.0 <= segments[1].end - segments[1].start <= 2.0
+    assert segmenter.duration == pytest.approx(5.0)
+
+def test_segmenter_cuts_long_speech_and_drops_clicks():
+    segmenter = EnergyVADSegmenter(max_segment_s=2.0)
+    click = np.concatenate([_silence(0.5), _tone(0.06), _silence(1.0)])
+
+    assert segmenter.push(click) + segmenter.flush() == []
+
+    segments = segmenter.push(_tone(5.0)) + segmenter.flush()
+    assert len(segments) == 3
+    assert all(s.end - s.start <= 2.0 for s in segments)
+    assert segments[1].start == pytest.approx(segments[0].end)
+
+class _FakeWhisper:
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, audio_format="wav", language=None):
+        self.calls.append((len(audio), language))
+        text = f"segment {len(self.calls)}"
+        return {"text": text, "language": "en", "segments": [{"start": 0.1, "end": 0.9, "text": text}]}
+
+def test_stream_audio_websocket_pushes_partials(monkeypatch):
+    """PCM frames in, one partial per speech segment, then a final transcript"""
+    from fastapi.testclient import TestClient
+    from apps.backend.api import routes_ingest
+    from apps.backend.main import app
+
+    fake = _FakeWhisper()
+    monkeypatch.setattr(routes_ingest, "get_whisper_service", lambda: fake)
+    pcm = (_speech_with_pause() * 32767).astype("<i2").tobytes()
+
+    with TestClient(app).websocket_connect("/ingest/stream-audio") as ws:
+        assert ws.receive_json()["type"] == "ready"
+        for offset in range(0, len(pcm), 3201):  # odd size splits samples across frames
+            ws.send_bytes(pcm[offset:offset + 3201])
+        ws.send_text('{"type": "end"}')
+
+        messages = []
+        while not messages or messages[-1]["type"] != "final":
+            messages.append(ws.receive_json())
+
+    partials, final = messages[:-1], messages[-1]
+    assert [p["type"] for p in partials] == ["partial", "partial"]
+    assert partials[1]["segments"][0]["start"] == pytest.approx(partials[1]["start"] + 0.1, abs=0.01)
+    assert final["text"] == "segment 1 segment 2"
+    assert final["duration_s"] == pytest.approx(5.0)
+    # Language detected on the first segment is reused for the rest
+    assert fake.calls[0][1] is None and fake.calls[1][1] == "en"
+
+def test_stream_audio_rejects_unknown_format():
+    from fastapi.testclient import TestClient
+    from apps.backend.main import app
+
+    with TestClient(app).websocket_connect("/ingest/stream-audio?format=mp3") as ws:
+        assert ws.receive_json()["type"] == "error"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,126 @@
+"""
+Tests for batched retrieval and the /chat/batch NDJSON endpoint
+"""
+import pytest
+import json
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.benchmarks.stubs import HashingEmbeddingService, OverlapCrossEncoder
+from apps.backend.services.core import rag_retriever_advanced
+from apps.backend.services.rag.hybrid_search import HybridSearch
+from apps.backend.services.rag.reranker import Reranker
+
+DOCS = {
+    "manual.pdf_chunk_0": "The spindle temperature limit is 60 degrees during continuous operation.",
+    "manual.pdf_chunk_1": "Check the coolant level and pressure at the start of every shift.",
+    "safety.pdf_chunk_0": "Wear eye protection near the grinding station at all times.",
+}
+
+class _CountingStore:
+    """In-memory vector store counting query calls"""
+
+    def __init__(self, embedder):
+        self.ids = list(DOCS)
+        self.documents = list(DOCS.values())
+        self.metadatas = [{"doc_filename": doc_id.split("_chunk_")[0], "chunk_index": 0} for doc_id in self.ids]
+        self.vectors = np.asarray(embedder.embed(self.documents))
+        self.batch_calls = 0
+
+    def search_batch(self, query_embeddings, n_results=5):
+        self.batch_calls += 1
+        output = []
+        for embedding in query_embeddings:
+            distances = 1.0 - self.vectors @ np.asarray(embedding)
+            order = np.argsort(distances)[:n_results]
+            output.append({
+                "ids": [self.ids[i] for i in order],
+                "documents": [self.documents[i] for i in order],
+                "metadatas": [self.metadatas[i] for i in order],
+                "distances": [float(distances[i]) for i in order],
+            })
+        return output
+
+class _CountingEmbedder(HashingEmbeddingService):
+    def __init__(self):
+        super().__init__()
+        self.embed_calls = 0
+
+    def embed(self, texts, batch_size=32):
+        self.embed_calls += 1
+        return super().embed(texts, batch_size)
+
+class _CountingEncoder(OverlapCrossEncoder):
+    def __init__(self):
+        self.predict_calls = 0
+
+    def predict(self, pairs, batch_size=32):
+        self.predict_calls += 1
+        return super().predict(pairs, batch_size)
+
+@pytest.fixture
+def batch_services(monkeypatch):
+    embedder = _CountingEmbedder()
+    store = _CountingStore(embedder)
+    embedder.embed_calls = 0
+    hybrid_search = HybridSearch(store, embedder)
+    hybrid_search.build_bm25_index(store.documents)
+    hybrid_search.ids = store.ids
+    hybrid_search.metadatas = store.metadatas
+
+    encoder = _CountingEncoder()
+    reranker = Reranker(use_reranking=False)
+    reranker.use_reranking = True
+    reranker.model = encoder
+
+    monkeypatch.setattr(rag_retriever_advanced, "_hybrid_search", hybrid_search)
+    monkeypatch.setattr(rag_retriever_advanced, "_reranker", reranker)
+    return embedder, store, encoder
+
+def test_retrieve_batch_uses_single_model_passes(batch_services):
+    """One embedding pass, one vector query and one cross-encoder call for the whole batch"""
+    embedder, store, encoder = batch_services
+    queries = ["spindle temperature limit", "coolant pressure shift", "eye protection grinding"]
+
+    results = rag_retriever_advanced.retrieve_batch(queries, top_k=2)
+
+    assert (embedder.embed_calls, store.batch_calls, encoder.predict_calls) == (1, 1, 1)
+    assert [r[0]["doc_id"] for r in results] == ["manual.pdf_chunk_0", "manual.pdf_chunk_1", "safety.pdf_chunk_0"]
+    assert all(len(r) == 2 and r[0]["rerank_score"] is not None for r in results)
+
+def test_batch_endpoint_streams_ndjson(batch_services, monkeypatch):
+    """Shared evidence is sent once and every question gets an answer line"""
+    from fastapi.testclient import TestClient
+    from apps.backend.main import app
+    from apps.backend.api import routes_chat
+    from apps.backend.services.core.chat_pipeline import IndexStatusMonitor
+
+    async def fake_reply(query, evidences):
+        return {"answer": f"answer to {query}", "provider": "deepseek"}
+
+    monkeypatch.setattr(routes_chat, "_index_monitor", IndexStatusMonitor(lambda: {"status": "loaded"}))
+    monkeypatch.setattr(routes_chat, "draft_reply", fake_reply)
+
+    queries = ["spindle temperature limit", "spindle temperature", "", "coolant pressure"]
+    response = TestClient(app).post("/chat/batch", json={"queries": queries, "top_k": 2, "max_concurrency": 2})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    evidence_ids = [line["id"] for line in lines if line["type"] == "evidence"]
+    answers = {line["index"]: line for line in lines if line["type"] == "answer"}
+
+    assert len(evidence_ids) == len(set(evidence_ids))
+    assert set(answers) == {0, 1, 2, 3}
+    assert answers[2]["status"] == "error"
+    assert answers[0]["answer"] == "answer to spindle temperature limit"
+    assert set(answers[0]["evidence_ids"]) <= set(evidence_ids)
+    assert lines[-1]["type"] == "summary"
+    assert lines[-1]["statuses"] == {"success": 3, "error": 1}
+
+if __name__ == "__main__":
+    pytest.main([__file__])
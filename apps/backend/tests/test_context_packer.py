@@ -0,0 +1,71 @@
+"""
+Tests for token-budgeted context packing
+"""
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.core.context_packer import ContextPacker, count_tokens
+from apps.backend.services.core.rag_indexer_advanced import chunk_text
+
+MANUAL = (
+    "The spindle motor must not exceed 60 degrees Celsius during continuous operation. "
+    "Operators should check the coolant level at the start of every shift and top it up "
+    "with the approved fluid only. If the temperature alarm sounds, stop the machine, "
+    "wait ten minutes and inspect the fan filter for dust before restarting the cycle. "
+    "Lubrication of the linear guides is required every 200 operating hours. "
+) * 3
+
+def _evidence(doc, index, text, score):
+    return {"path": f"/papers/{doc}", "filename": doc, "chunk_index": index,
+            "doc_id": f"{doc}_chunk_{index}", "text": text, "score": score}
+
+def test_adjacent_chunks_merge_without_overlap():
+    """Consecutive chunks of one document become one passage with the overlap removed"""
+    chunks = chunk_text(MANUAL, chunk_size=200, chunk_overlap=50)
+    evidences = [_evidence("manual.pdf", 1, chunks[1], 0.7), _evidence("manual.pdf", 0, chunks[0], 0.9)]
+
+    packed = ContextPacker(token_budget=2000).pack(evidences)
+
+    assert packed["merged_chunks"] == 1
+    assert len(packed["passages"]) == 1
+    assert packed["passages"][0]["chunk_ids"] == ["manual.pdf_chunk_0", "manual.pdf_chunk_1"]
+    assert packed["passages"][0]["text"] == MANUAL[:350].strip()
+
+def test_near_duplicates_are_dropped():
+    """A passage mostly repeating a more relevant one is skipped"""
+    text = MANUAL[:300]
+    evidences = [
+        _evidence("manual.pdf", 0, text, 0.9),
+        _evidence("manual_copy.pdf", 4, text + " Revised edition.", 0.8),
+        _evidence("safety.pdf", 2, "Always wear eye protection near the grinding station.", 0.5),
+    ]
+
+    packed = ContextPacker(token_budget=2000).pack(evidences)
+
+    assert packed["dropped_duplicates"] == 1
+    assert [p["source"] for p in packed["passages"]] == ["manual.pdf", "safety.pdf"]
+
+def test_budget_is_filled_by_relevance():
+    """The context never exceeds the budget and keeps the most relevant passages first"""
+    evidences = [
+        _evidence(f"doc{i}.pdf", 0, f"Document {i} notes. " + MANUAL[i * 40:i * 40 + 300], score)
+        for i, score in enumerate([0.2, 0.9, 0.5, 0.7])
+    ]
+
+    packed = ContextPacker(token_budget=200, min_passage_tokens=20).pack(evidences)
+
+    assert packed["tokens"] <= 200
+    assert count_tokens(packed["context"]) <= 200
+    assert packed["passages"][0]["source"] == "doc1.pdf"
+    assert packed["truncated"]
+    assert packed["omitted_passages"] >= 1
+
+def test_empty_evidence():
+    """No evidence gives no context"""
+    assert ContextPacker().pack([])["context"] is None
+
+if __name__ == "__main__":
+    pytest.main([__file__])
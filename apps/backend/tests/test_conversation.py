@@ -0,0 +1,129 @@
+"""
+Tests for conversation memory and incremental context in multi-turn chat
+"""
+import pytest
+import asyncio
+import time
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services import responder
+from apps.backend.services.core.conversation_store import ConversationStore
+
+EVIDENCES = [
+    {"doc_id": "manual.pdf_chunk_0", "text": "The spindle temperature limit is 60 degrees.", "filename": "manual.pdf", "chunk_index": 0, "score": 0.9},
+    {"doc_id": "safety.pdf_chunk_4", "text": "Wear eye protection near the grinding station.", "filename": "safety.pdf", "chunk_index": 4, "score": 0.7},
+]
+NEW_EVIDENCE = {"doc_id": "coolant.pdf_chunk_2", "text": "Coolant pressure must stay above 2 bar.", "filename": "coolant.pdf", "chunk_index": 2, "score": 0.8}
+
+def test_store_evicts_least_recent_and_expired_sessions():
+    """Sessions beyond max_sessions are evicted LRU-first and idle sessions expire"""
+    store = ConversationStore(max_sessions=2, ttl_seconds=0.2)
+    first = store.get_or_create("a")
+    store.get_or_create("b")
+    assert store.get("a") is first  # touch "a" so "b" is least recent
+    store.get_or_create("c")
+
+    assert store.get("b") is None
+    assert store.get("a") is first
+    time.sleep(0.3)
+    assert store.get("a") is None
+    stats = store.stats()
+    assert (stats["sessions"], stats["evictions"], stats["expired"]) == (0, 1, 2)
+
+class _RecordingLLM:
+    provider = "deepseek"
+    model = "stub-model"
+
+    def __init__(self):
+        self.calls = []
+
+    def is_configured(self):
+        return True
+
+    async def generate_response(self, query, context=None, system_prompt=None, history=None):
+        self.calls.append({"query": query, "context": context, "history": history or []})
+        return f"answer {len(self.calls)}"
+
+def test_follow_ups_send_only_incremental_context(monkeypatch):
+    """Evidence already carried by the replayed history is not sent again"""
+    llm = _RecordingLLM()
+    monkeypatch.setattr(responder, "get_generation_backend", lambda: llm)
+    monkeypatch.setattr(responder, "get_response_cache", lambda: None)
+    session = ConversationStore().get_or_create("s1")
+
+    async def scenario():
+        await responder.draft_reply("What is the spindle limit?", EVIDENCES, conversation=session)
+        await responder.draft_reply("And in Fahrenheit?", EVIDENCES, conversation=session)
+        await responder.draft_reply("What about coolant?", EVIDENCES + [NEW_EVIDENCE], conversation=session)
+
+    asyncio.run(scenario())
+    first, second, third = llm.calls
+
+    assert "spindle temperature limit" in first["context"] and first["history"] == []
+    assert second["context"] is None
+    assert [m["role"] for m in second["history"]] == ["user", "assistant"]
+    assert "spindle temperature limit" in second["history"][0]["content"]
+    assert second["history"][1]["content"] == "answer 1"
+    assert "Coolant pressure" in third["context"] and "spindle" not in third["context"]
+    assert len(third["history"]) == 4
+    assert len(session.turns) == 3
+
+def test_history_is_trimmed_to_token_budget(monkeypatch):
+    """Old turns fall out of the replayed history and their evidence becomes sendable again"""
+    llm = _RecordingLLM()
+    monkeypatch.setattr(responder, "get_generation_backend", lambda: llm)
+    monkeypatch.setattr(responder, "get_response_cache", lambda: None)
+    session = ConversationStore(history_tokens=1).get_or_create("s2")
+
+    async def scenario():
+        await responder.draft_reply("spindle limit?", EVIDENCES, conversation=session)
+        await responder.draft_reply("coolant?", [NEW_EVIDENCE], conversation=session)
+        await responder.draft_reply("spindle limit again?", EVIDENCES, conversation=session)
+
+    asyncio.run(scenario())
+
+    # The newest turn is always kept; older ones exceed the budget
+    assert len(llm.calls[2]["history"]) == 2
+    assert "spindle temperature limit" in llm.calls[2]["context"]
+
+def test_chat_session_reuses_evidence(monkeypatch):
+    """reuse_evidence answers a follow-up from the session's evidence set without retrieving"""
+    from fastapi.testclient import TestClient
+    from apps.backend.main import app
+    from apps.backend.api import routes_chat
+    from apps.backend.services.core import conversation_store
+    from apps.backend.services.core.chat_pipeline import IndexStatusMonitor
+
+    retrievals = []
+
+    async def fake_retrieve(**kwargs):
+        retrievals.append(kwargs["query"])
+        return EVIDENCES
+
+    llm = _RecordingLLM()
+    monkeypatch.setattr(routes_chat, "_index_monitor", IndexStatusMonitor(lambda: {"status": "loaded"}))
+    monkeypatch.setattr(routes_chat, "retrieve_async", fake_retrieve)
+    monkeypatch.setattr(routes_chat, "get_generation_backend", lambda: llm)
+    monkeypatch.setattr(responder, "get_generation_backend", lambda: llm)
+    monkeypatch.setattr(responder, "get_response_cache", lambda: None)
+    monkeypatch.setattr(conversation_store, "_conversation_store", ConversationStore())
+
+    client = TestClient(app)
+    first = client.post("/chat/", json={"query": "spindle limit?", "session_id": "line-3"}).json()
+    second = client.post("/chat/", json={"query": "in Fahrenheit?", "session_id": "line-3", "reuse_evidence": True}).json()
+
+    assert retrievals == ["spindle limit?"]
+    assert (first["session_id"], first["turns"]) == ("line-3", 1)
+    assert second["turns"] == 2
+    assert second["search_metadata"]["evidence_reused"] is True
+    assert len(second["evidences"]) == 2
+    assert llm.calls[1]["context"] is None and len(llm.calls[1]["history"]) == 2
+
+    assert client.delete("/chat/sessions/line-3").status_code == 200
+    assert client.delete("/chat/sessions/line-3").status_code == 404
+
+if __name__ == "__main__":
+    pytest.main([__file__])
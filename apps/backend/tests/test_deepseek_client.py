@@ -0,0 +1,158 @@
+"""
+Tests for the pooled DeepSeek HTTP client and response streaming
+"""
+import pytest
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.ai.deepseek_service import DeepSeekService
+
+class _CompletionHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive chat completions endpoint"""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if payload.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for token in ["po", "ng"]:
+                chunk = {"choices": [{"delta": {"content": token}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+            return
+        body = json.dumps({"choices": [{"message": {"content": "pong"}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        body = json.dumps({"object": "list", "data": [{"id": "deepseek-chat"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def completion_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CompletionHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+def test_pooled_client_reuses_connection(completion_server, monkeypatch):
+    """Sequential calls share one keep-alive connection and are counted"""
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "test-key")
+    monkeypatch.setenv("DEEPSEEK_API_URL", completion_server)
+    service = DeepSeekService()
+
+    async def scenario():
+        await service.start()
+        answers = [await service.generate_response(f"ping {i}") for i in range(3)]
+        stats = service.pool_stats()
+        await service.aclose()
+        return answers, stats
+
+    answers, stats = asyncio.run(scenario())
+
+    assert answers == ["pong"] * 3
+    assert stats["requests_total"] == 3
+    assert stats["tcp_connects_total"] == 1
+    assert stats["open_connections"] == 1
+    assert stats["idle_connections"] == 1
+    assert stats["connection_reuse_ratio"] == pytest.approx(2 / 3, abs=1e-3)
+    assert not service.pool_stats()["client_open"]
+
+def test_streaming_yields_deltas(completion_server, monkeypatch):
+    """SSE chunks are parsed incrementally; stream=True on chat() aggregates them"""
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "test-key")
+    monkeypatch.setenv("DEEPSEEK_API_URL", completion_server)
+    service = DeepSeekService()
+
+    async def scenario():
+        tokens = [token async for token in service.generate_response_stream("ping")]
+        aggregated = await service.chat([{"role": "user", "content": "ping"}], stream=True)
+        await service.aclose()
+        return tokens, aggregated
+
+    tokens, aggregated = asyncio.run(scenario())
+
+    assert tokens == ["po", "ng"]
+    assert aggregated["choices"][0]["message"]["content"] == "pong"
+    assert service.pool_stats()["errors_total"] == 0
+
+def test_chat_stream_route_event_order(monkeypatch):
+    """/chat/stream sends evidences first, then tokens, then done"""
+    from fastapi.testclient import TestClient
+    from apps.backend.main import app
+    from apps.backend.api import routes_chat
+
+    async def fake_retrieve(**kwargs):
+        return [{"text": "spindle limit 60C", "filename": "m.pdf", "score": 0.9}]
+
+    async def fake_stream(query, evidences):
+        for token in ["Limit ", "is 60C"]:
+            yield {"type": "token", "text": token}
+        yield {"type": "done", "provider": "deepseek", "evidence_count": 1, "confidence": 0.9}
+
+    from apps.backend.services.core.chat_pipeline import IndexStatusMonitor
+    monkeypatch.setattr(routes_chat, "_index_monitor", IndexStatusMonitor(lambda: {"status": "loaded"}))
+    monkeypatch.setattr(routes_chat, "get_query_cache", lambda: None)
+    monkeypatch.setattr(routes_chat, "retrieve_async", fake_retrieve)
+    monkeypatch.setattr(routes_chat, "draft_reply_stream", fake_stream)
+
+    response = TestClient(app).post("/chat/stream", json={"query": "spindle limit?"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        (block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+        for block in response.text.strip().split("\n\n")
+    ]
+    assert [name for name, _ in events] == ["evidences", "token", "token", "done"]
+    assert events[0][1]["evidences"][0]["filename"] == "m.pdf"
+    assert "".join(data["text"] for name, data in events if name == "token") == "Limit is 60C"
+    assert events[-1][1]["search_metadata"]["cache"] == "disabled"
+    assert {"index", "retrieve", "first_token", "generate", "total"} <= set(events[-1][1]["search_metadata"]["timings_ms"])
+
+def test_warmup_opens_connection_reused_by_completion(completion_server, monkeypatch):
+    """A warm-up during retrieval leaves an idle connection that the completion reuses"""
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "test-key")
+    monkeypatch.setenv("DEEPSEEK_API_URL", completion_server)
+    service = DeepSeekService()
+
+    async def scenario():
+        warmed = await service.warmup()
+        warmed_again = await service.warmup()
+        answer = await service.generate_response("ping")
+        stats = service.pool_stats()
+        await service.aclose()
+        return warmed, warmed_again, answer, stats
+
+    warmed, warmed_again, answer, stats = asyncio.run(scenario())
+
+    assert warmed and not warmed_again
+    assert answer == "pong"
+    assert stats["warmups_total"] == 1
+    assert stats["tcp_connects_total"] == 1
+    assert stats["connection_reuse_ratio"] == pytest.approx(0.5)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
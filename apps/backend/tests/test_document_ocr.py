@@ -0,0 +1,84 @@
+"""
+Tests for multi-page TIFF/PDF OCR and the scanned-PDF indexing fallback
+"""
+import pytest
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.core import document_ocr, image_ocr
+from apps.backend.services.core.document_ocr import is_multipage, iter_pages, ocr_document
+
+def _pages(count: int):
+    # Page n is filled with gray level 10 * n so the fake OCR can tell pages apart
+    return [Image.new("L", (120, 80), 10 * (n + 1)) for n in range(count)]
+
+def _tiff(count: int) -> bytes:
+    frames = _pages(count)
+    buffer = io.BytesIO()
+    frames[0].save(buffer, format="TIFF", save_all=True, append_images=frames[1:])
+    return buffer.getvalue()
+
+def _pdf(count: int) -> bytes:
+    frames = [frame.convert("RGB") for frame in _pages(count)]
+    buffer = io.BytesIO()
+    frames[0].save(buffer, format="PDF", save_all=True, append_images=frames[1:])
+    return buffer.getvalue()
+
+class _FakeOCR:
+    def extract_text_from_image(self, image, lang=None, preprocess=None):
+        page = image.convert("L").getpixel((0, 0)) // 10
+        return {
+            "text": f"page {page}", "confidence": 0.9, "language": "eng", "word_count": 2,
+            "boxes": [{"text": "page", "left": 1, "top": 2, "width": 3, "height": 4, "confidence": 0.9, "level": 5}],
+        }
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    monkeypatch.setattr(document_ocr, "_worker_service", _FakeOCR())
+    monkeypatch.setenv("OCR_PROCESSES", "1")
+
+def test_tiff_frames_are_decoded_lazily():
+    data = _tiff(3)
+    assert is_multipage(data)
+    assert not is_multipage(_tiff(1))
+
+    pages = iter_pages(data)
+    first = next(pages)
+    assert first.getpixel((0, 0)) == 10
+    assert [page.getpixel((0, 0)) for page in pages] == [20, 30]
+
+@pytest.mark.skipif(not (document_ocr.PDFIUM_AVAILABLE or document_ocr.PYPDF_AVAILABLE), reason="no PDF backend")
+def test_scanned_pdf_pages_in_order_through_a_pool(fake_ocr):
+    """Pages keep their order when recognized concurrently with a small look-ahead window"""
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = ocr_document(_pdf(5), pool=pool, window=2)
+    assert [r["text"] for r in results] == [f"page {n}" for n in range(1, 6)]
+
+def test_run_ocr_returns_per_page_results(fake_ocr):
+    result = asyncio.run(image_ocr.run_ocr(_tiff(2)))
+
+    assert result["page_count"] == 2
+    assert result["text"] == "page 1\n\npage 2"
+    assert result["word_count"] == 4
+    assert result["pages"][1]["page"] == 2
+    assert result["pages"][1]["boxes"][0] == {"text": "page", "bbox": [1, 2, 4, 6], "confidence": 0.9}
+    assert [box["page"] for box in result["boxes"]] == [1, 2]
+
+@pytest.mark.skipif(not document_ocr.PYPDF_AVAILABLE, reason="pypdf not installed")
+def test_pdf_without_text_layer_is_ocrd_for_indexing(fake_ocr, tmp_path):
+    from apps.backend.services.core.rag_indexer_advanced import pdf_to_text
+
+    path = tmp_path / "scan.pdf"
+    path.write_bytes(_pdf(2))
+
+    assert pdf_to_text(str(path)) == "page 1\npage 2"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,97 @@
+"""
+Tests for priority lanes and the per-model inference pools
+"""
+import pytest
+import asyncio
+import io
+import threading
+import wave
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.core import executor as executor_module
+from apps.backend.services.core.executor import (
+    BoundedExecutor, ExecutorBusyError, LANE_BATCH, LANE_INTERACTIVE, get_inference_executor
+)
+
+def test_interactive_lane_overtakes_batch():
+    """With the only worker busy, a later interactive task runs before queued batch tasks"""
+    executor = BoundedExecutor("test-lanes", max_workers=1, max_queue=4)
+    release = threading.Event()
+    order = []
+
+    async def scenario():
+        blocker = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        batch = [asyncio.ensure_future(executor.run_in_lane(LANE_BATCH, order.append, f"batch-{i}")) for i in range(2)]
+        await asyncio.sleep(0.01)
+        interactive = asyncio.ensure_future(executor.run_in_lane(LANE_INTERACTIVE, order.append, "interactive"))
+        await asyncio.sleep(0.01)
+        assert executor.stats()["queued_by_lane"] == {"interactive": 1, "batch": 2}
+        release.set()
+        await asyncio.gather(blocker, interactive, *batch)
+
+    asyncio.run(scenario())
+    executor.shutdown()
+    assert order == ["interactive", "batch-0", "batch-1"]
+
+def test_batch_lane_keeps_headroom_for_interactive():
+    executor = BoundedExecutor("test-headroom", max_workers=1, max_queue=2, max_batch_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(executor.run_in_lane(LANE_BATCH, lambda: "batch"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ExecutorBusyError):
+            await executor.run_in_lane(LANE_BATCH, lambda: "rejected")
+        interactive = asyncio.ensure_future(executor.run(lambda: "interactive"))
+        release.set()
+        return await asyncio.gather(running, queued, interactive)
+
+    assert asyncio.run(scenario())[1:] == ["batch", "interactive"]
+    executor.shutdown()
+
+def test_inference_pools_are_configured_per_model(monkeypatch):
+    monkeypatch.setattr(executor_module, "_inference_executors", {})
+    monkeypatch.setenv("OCR_MAX_WORKERS", "3")
+
+    ocr = get_inference_executor("ocr")
+    assert ocr is get_inference_executor("ocr")
+    assert ocr.max_workers == 3
+    assert get_inference_executor("stt").retry_after == 10
+    with pytest.raises(ValueError):
+        get_inference_executor("tts")
+    for pool in executor_module._inference_executors.values():
+        pool.shutdown(wait=False)
+
+def test_upload_audio_returns_503_when_stt_pool_is_full(monkeypatch):
+    from fastapi.testclient import TestClient
+    from apps.backend.main import app
+
+    class _FullPool:
+        async def run_in_lane(self, lane, fn, *args, **kwargs):
+            raise ExecutorBusyError("stt", retry_after=7)
+
+    monkeypatch.setenv("INGEST_CACHE_ENABLED", "false")
+    monkeypatch.setattr(executor_module, "_inference_executors", {"stt": _FullPool()})
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\x00\x10" * 1600)
+
+    response = TestClient(app).post(
+        "/ingest/upload-audio",
+        files={"file": ("note.wav", buffer.getvalue(), "audio/wav")}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
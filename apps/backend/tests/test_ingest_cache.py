@@ -0,0 +1,141 @@
+"""
+Tests for the content-addressed ingest result cache
+"""
+import pytest
+import asyncio
+import os
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.core.disk_cache import DiskCache
+from apps.backend.services.core.ingest_cache import IngestCache, content_digest
+
+def test_key_covers_bytes_and_parameters(tmp_path):
+    cache = IngestCache(DiskCache(str(tmp_path)))
+    digest = content_digest(b"scan")
+    cache.set("ocr", digest, {"lang": "eng", "preprocess": ["downscale"]}, {"text": "hello"})
+
+    assert cache.get("ocr", digest, {"preprocess": ["downscale"], "lang": "eng"}) == {"text": "hello"}
+    assert cache.get("ocr", digest, {"lang": "deu", "preprocess": ["downscale"]}) is None
+    assert cache.get("ocr", content_digest(b"other scan"), {"lang": "eng", "preprocess": ["downscale"]}) is None
+    assert cache.get("vision", digest, {"lang": "eng", "preprocess": ["downscale"]}) is None
+
+    # Failed results are never served from the cache
+    cache.set("ocr", digest, {"lang": "fra"}, {"text": "", "error": "tesseract missing"})
+    assert cache.get("ocr", digest, {"lang": "fra"}) is None
+    assert cache.stats()["kinds"]["ocr"] == {"hits": 1, "misses": 3, "writes": 1}
+
+def test_size_bound_evicts_least_recently_used(tmp_path):
+    cache = IngestCache(DiskCache(str(tmp_path), max_bytes=600))
+    for index in range(5):
+        cache.set("stt", content_digest(bytes([index])), {}, {"text": "x" * 150})
+    assert cache.stats()["bytes"] <= 600
+    assert cache.get("stt", content_digest(bytes([0])), {}) is None
+    assert cache.get("stt", content_digest(bytes([4])), {}) is not None
+
+def test_duplicate_image_upload_skips_ocr(tmp_path, monkeypatch):
+    from apps.backend.api import routes_ingest
+
+    calls = []
+
+    async def fake_run_ocr(image_bytes, lane=None, preprocess=None):
+        calls.append(preprocess)
+        return {"text": "torque 85 Nm", "boxes": [], "confidence": 0.9}
+
+    monkeypatch.setattr(routes_ingest, "get_ingest_cache", lambda: IngestCache(DiskCache(str(tmp_path))))
+    monkeypatch.setattr(routes_ingest, "get_vision_service", lambda: None)
+    monkeypatch.setattr(routes_ingest, "run_ocr", fake_run_ocr)
+
+    first = asyncio.run(routes_ingest.process_image(b"png-bytes", "a.png"))
+    second = asyncio.run(routes_ingest.process_image(b"png-bytes", "b.png"))
+    assert calls == [None]
+    assert "cached" not in first["ocr"] and second["ocr"]["cached"] is True
+    assert second["ocr"]["text"] == "torque 85 Nm" and second["filename"] == "b.png"
+
+    # Another preprocessing configuration is a different result
+    asyncio.run(routes_ingest.process_image(b"png-bytes", "c.png", preprocess="full"))
+    assert calls == [None, "full"]
+
+def test_document_with_failed_pages_is_not_cached(tmp_path, monkeypatch):
+    import io
+    from PIL import Image
+    from apps.backend.api import routes_ingest
+    from apps.backend.services.core import image_ocr
+
+    calls = []
+
+    def fake_ocr_document(data, preprocess=None):
+        calls.append(preprocess)
+        return [
+            {"text": "page one", "confidence": 0.9, "word_count": 2, "boxes": []},
+            {"text": "", "confidence": 0.0, "word_count": 0, "boxes": [], "error": "tesseract is not installed"},
+        ]
+
+    monkeypatch.setattr(routes_ingest, "get_ingest_cache", lambda: IngestCache(DiskCache(str(tmp_path))))
+    monkeypatch.setattr(routes_ingest, "get_vision_service", lambda: None)
+    monkeypatch.setattr(image_ocr, "ocr_document", fake_ocr_document)
+
+    buffer = io.BytesIO()
+    pages = [Image.new("L", (64, 64), 255), Image.new("L", (64, 64), 255)]
+    pages[0].save(buffer, format="TIFF", save_all=True, append_images=pages[1:])
+
+    first = asyncio.run(routes_ingest.process_image(buffer.getvalue(), "scan.tiff"))
+    second = asyncio.run(routes_ingest.process_image(buffer.getvalue(), "scan.tiff"))
+    assert first["ocr"]["error"] == "1 of 2 pages failed: tesseract is not installed"
+    assert "cached" not in second["ocr"] and len(calls) == 2
+
+def test_duplicate_audio_upload_skips_transcription(tmp_path, monkeypatch):
+    from apps.backend.api import routes_ingest
+
+    calls = []
+
+    async def fake_transcribe(samples, lane=None):
+        calls.append(len(samples))
+        return {"text": "check the seal", "segments": [], "lang": "en", "confidence": 0.8}
+
+    monkeypatch.setattr(routes_ingest, "get_ingest_cache", lambda: IngestCache(DiskCache(str(tmp_path))))
+    monkeypatch.setattr(routes_ingest, "decode_audio", lambda data: [0.0] * 16000)
+    monkeypatch.setattr(routes_ingest, "transcribe", fake_transcribe)
+
+    asyncio.run(routes_ingest.process_audio(b"RIFF-audio", "a.wav"))
+    second = asyncio.run(routes_ingest.process_audio(b"RIFF-audio", "b.wav"))
+    assert calls == [16000]
+    assert second["cached"] is True and second["filename"] == "b.wav"
+    assert second["stt"]["text"] == "check the seal"
+
+    # A different Whisper model must not reuse the transcript
+    monkeypatch.setenv("STT_MODEL_SIZE", "large-v3")
+    asyncio.run(routes_ingest.process_audio(b"RIFF-audio", "c.wav"))
+    assert len(calls) == 2
+
+def test_failed_transcription_is_not_cached(tmp_path, monkeypatch):
+    """A Whisper failure reported in-band must reach process_audio and skip the cache"""
+    from apps.backend.api import routes_ingest
+    from apps.backend.services.core import audio_stt
+
+    outcomes = [
+        {"text": "", "segments": [], "language": "unknown", "error": "model crashed"},
+        {"text": "check the seal", "segments": [], "language": "en", "confidence": 0.8},
+    ]
+
+    class _Whisper:
+        def transcribe(self, audio, audio_format="wav"):
+            return outcomes.pop(0)
+
+    class _Pool:
+        async def run_in_lane(self, lane, fn, *args, **kwargs):
+            return fn(*args, **kwargs)
+
+    monkeypatch.setattr(routes_ingest, "get_ingest_cache", lambda: IngestCache(DiskCache(str(tmp_path))))
+    monkeypatch.setattr(routes_ingest, "decode_audio", lambda data: [0.0] * 16000)
+    monkeypatch.setattr(audio_stt, "get_whisper_service", lambda: _Whisper())
+    monkeypatch.setattr(audio_stt, "get_inference_executor", lambda kind: _Pool())
+
+    first = asyncio.run(routes_ingest.process_audio(b"RIFF-audio", "a.wav"))
+    second = asyncio.run(routes_ingest.process_audio(b"RIFF-audio", "a.wav"))
+    assert first["stt"]["error"] == "model crashed"
+    assert "cached" not in second and second["stt"]["text"] == "check the seal"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,137 @@
+"""
+Tests for the SQLite ingest job queue, its workers and the job endpoints
+"""
+import pytest
+import asyncio
+import os
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.core.executor import ExecutorBusyError
+from apps.backend.services.core.job_queue import JobQueue, JobWorkerPool
+
+def test_job_lifecycle_and_recovery(tmp_path):
+    """Jobs are spooled, claimed in order, and running jobs survive a restart"""
+    job_queue = JobQueue(str(tmp_path), max_attempts=2)
+    first = job_queue.submit("image", b"page-1", "p1.png", "image/png", batch_id="b1")
+    second = job_queue.submit("image", b"page-2", "p2.png", "image/png", batch_id="b1")
+
+    claimed = job_queue.claim()
+    assert claimed["id"] == first and claimed["status"] == "running"
+    assert job_queue.read_payload(claimed) == b"page-1"
+    job_queue.complete(first, {"ocr": {"text": "hello"}})
+    assert job_queue.get(first)["result"] == {"ocr": {"text": "hello"}}
+    assert not os.path.exists(claimed["spool_path"])
+
+    # Simulate a crash while the second job runs: a new process requeues it
+    assert job_queue.claim()["id"] == second
+    job_queue.close()
+    reopened = JobQueue(str(tmp_path), max_attempts=2)
+    assert reopened.recover() == 1
+    assert reopened.get(second)["status"] == "queued"
+    assert [job["status"] for job in reopened.batch("b1")] == ["done", "queued"]
+
+    # A job interrupted max_attempts times is failed instead of retried forever
+    reopened.claim()
+    assert reopened.recover() == 0
+    assert reopened.get(second)["status"] == "failed"
+    assert reopened.stats() == {"queued": 0, "running": 0, "done": 1, "failed": 1}
+    reopened.close()
+
+def test_workers_run_handlers_and_retry_when_busy(tmp_path):
+    job_queue = JobQueue(str(tmp_path))
+    calls = []
+
+    async def handler(data, job):
+        calls.append(data)
+        if len(calls) == 1:
+            raise ExecutorBusyError("ocr", retry_after=0)
+        if data == b"bad":
+            raise ValueError("unreadable")
+        return {"size": len(data)}
+
+    async def scenario():
+        workers = JobWorkerPool(job_queue, {"image": handler}, workers=1, poll_interval=0.01)
+        good = job_queue.submit("image", b"good")
+        bad = job_queue.submit("image", b"bad")
+        unknown = job_queue.submit("video", b"?")
+        workers.start()
+        for _ in range(200):
+            if job_queue.stats()["queued"] == 0 and job_queue.stats()["running"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        await workers.stop()
+        return good, bad, unknown
+
+    good, bad, unknown = asyncio.run(scenario())
+    assert calls[:2] == [b"good", b"good"]  # Requeued after the busy pool, then processed
+    assert job_queue.get(good)["result"] == {"size": 4} and job_queue.get(good)["attempts"] == 1
+    assert job_queue.get(bad)["error"] == "unreadable"
+    assert "No handler" in job_queue.get(unknown)["error"]
+    job_queue.close()
+
+def test_busy_job_is_delayed_and_shutdown_does_not_count_attempts(tmp_path):
+    job_queue = JobQueue(str(tmp_path), max_attempts=1)
+    started = []
+
+    async def audio_handler(data, job):
+        raise ExecutorBusyError("stt", retry_after=60)
+
+    async def image_handler(data, job):
+        started.append(job["id"])
+        await asyncio.sleep(10)  # Still running at shutdown
+
+    async def scenario():
+        workers = JobWorkerPool(job_queue, {"audio": audio_handler, "image": image_handler}, workers=1, poll_interval=0.01)
+        audio = job_queue.submit("audio", b"long recording")
+        image = job_queue.submit("image", b"scan")
+        workers.start()
+        for _ in range(200):
+            if started:
+                break
+            await asyncio.sleep(0.01)
+        await workers.stop()
+        return audio, image
+
+    audio, image = asyncio.run(scenario())
+    # The busy STT job waits out its retry-after instead of blocking the image job
+    assert started == [image]
+    assert job_queue.get(audio)["status"] == "queued" and job_queue.get(audio)["not_before"] > 0
+    # Cancelled by shutdown: requeued with the attempt given back, so restarts don't fail it
+    assert job_queue.get(image)["status"] == "queued" and job_queue.get(image)["attempts"] == 0
+    assert job_queue.recover() == 0 and job_queue.get(image)["status"] == "queued"
+    job_queue.close()
+
+def test_job_endpoints(tmp_path, monkeypatch):
+    """Submit, batch-submit, poll status and fetch results over HTTP"""
+    from fastapi.testclient import TestClient
+    from apps.backend.api import routes_ingest
+    from apps.backend.main import app
+
+    job_queue = JobQueue(str(tmp_path))
+    monkeypatch.setattr(routes_ingest, "get_job_queue", lambda: job_queue)
+    monkeypatch.setattr(routes_ingest, "_job_workers", JobWorkerPool(job_queue, {}))
+    client = TestClient(app)
+
+    response = client.post("/ingest/jobs", files={"file": ("note.wav", b"RIFF", "audio/wav")})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert client.get(f"/ingest/jobs/{job_id}").json()["status"] == "queued"
+    assert client.get(f"/ingest/jobs/{job_id}/result").status_code == 202
+
+    job_queue.complete(job_queue.claim()["id"], {"stt": {"text": "done"}})
+    assert client.get(f"/ingest/jobs/{job_id}/result").json()["result"] == {"stt": {"text": "done"}}
+
+    files = [("files", (f"page{i}.png", b"png", "image/png")) for i in range(3)]
+    batch = client.post("/ingest/jobs/batch", files=files).json()
+    assert len(batch["jobs"]) == 3
+    status = client.get(f"/ingest/jobs/batch/{batch['batch_id']}").json()
+    assert status["counts"] == {"queued": 3}
+
+    assert client.post("/ingest/jobs", files={"file": ("a.txt", b"x", "text/plain")}).status_code == 400
+    assert client.get("/ingest/jobs/missing").status_code == 404
+    job_queue.close()
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,102 @@
+"""
+Tests for the LLM gateway (concurrency cap, rate limit, retries, circuit breaker)
+"""
+import pytest
+import asyncio
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.ai.llm_gateway import LLMGateway, LLMProviderError, CircuitOpenError
+
+def _gateway(**overrides):
+    options = dict(max_concurrency=2, rate_per_second=0, max_retries=2, base_delay=0.001,
+                   max_delay=0.01, failure_threshold=3, recovery_timeout=0.05)
+    options.update(overrides)
+    return LLMGateway("test", **options)
+
+def test_retries_transient_errors_then_succeeds():
+    """429/5xx are retried with backoff; the eventual success is returned"""
+    gateway = _gateway()
+    outcomes = [LLMProviderError("busy", 429), LLMProviderError("down", 503), "ok"]
+
+    async def flaky():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert asyncio.run(gateway.call(flaky)) == "ok"
+    stats = gateway.stats()
+    assert stats["retries"] == 2
+    assert stats["rate_limited"] == 1
+    assert stats["successes"] == 1
+    assert stats["state"] == "closed"
+
+def test_client_errors_are_not_retried():
+    """A 400 is raised immediately and does not count against provider health"""
+    gateway = _gateway()
+    calls = []
+
+    async def bad_request():
+        calls.append(1)
+        raise LLMProviderError("bad request", 400)
+
+    with pytest.raises(LLMProviderError):
+        asyncio.run(gateway.call(bad_request))
+    assert len(calls) == 1
+    assert gateway.stats()["consecutive_failures"] == 0
+
+def test_circuit_opens_sheds_and_recovers():
+    """Consecutive failures open the circuit; after the timeout one probe closes it"""
+    gateway = _gateway(max_retries=0)
+
+    async def down():
+        raise LLMProviderError("down", 502)
+
+    async def up():
+        return "ok"
+
+    async def scenario():
+        for _ in range(3):
+            with pytest.raises(LLMProviderError):
+                await gateway.call(down)
+        assert gateway.stats()["state"] == "open"
+
+        with pytest.raises(CircuitOpenError):
+            await gateway.call(up)
+
+        await asyncio.sleep(0.06)
+        return await gateway.call(up)
+
+    assert asyncio.run(scenario()) == "ok"
+    stats = gateway.stats()
+    assert stats["state"] == "closed"
+    assert stats["shed"] == 1
+    assert stats["circuit_opens"] == 1
+
+def test_concurrency_cap_and_rate_limit():
+    """No more than max_concurrency calls run at once; bursts beyond the bucket are throttled"""
+    gateway = _gateway(max_concurrency=2, rate_per_second=50, burst=3)
+    running = []
+    peak = []
+
+    async def work():
+        running.append(1)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+        return True
+
+    async def scenario():
+        return await asyncio.gather(*(gateway.call(work) for _ in range(6)))
+
+    assert all(asyncio.run(scenario()))
+    assert max(peak) == 2
+    stats = gateway.stats()
+    assert stats["throttled"] >= 3
+    assert stats["in_flight"] == 0
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,103 @@
+"""
+Tests for the local LLM backend and generation backend selection
+"""
+import pytest
+import asyncio
+import time
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.ai import local_llm_service
+from apps.backend.services.ai.local_llm_service import LocalLLMService
+from apps.backend.services import responder
+
+class _FakeLlama:
+    """Stands in for llama_cpp.Llama: echoes the question word by word"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def create_chat_completion(self, messages, temperature, max_tokens, stream):
+        self.prompts.append(messages[-1]["content"])
+        time.sleep(0.02)
+        for word in messages[-1]["content"].split()[:max_tokens]:
+            yield {"choices": [{"delta": {"content": word + " "}}]}
+
+@pytest.fixture
+def local_service(tmp_path, monkeypatch):
+    model_file = tmp_path / "tiny.gguf"
+    model_file.write_bytes(b"gguf")
+    monkeypatch.setenv("LOCAL_LLM_MODEL_PATH", str(model_file))
+    monkeypatch.setattr(local_llm_service, "LLAMA_CPP_AVAILABLE", True)
+    fake = _FakeLlama()
+    monkeypatch.setattr(LocalLLMService, "_load_model", lambda self: fake)
+    service = LocalLLMService()
+    yield service, fake
+    asyncio.run(service.aclose())
+
+def test_streams_tokens_and_serves_queued_requests_in_order(local_service):
+    """Tokens stream back per request; requests queued behind a busy worker are served FIFO"""
+    service, fake = local_service
+
+    async def scenario():
+        await service.start()
+        streamed = [token async for token in service.generate_response_stream("spindle limit")]
+        answers = await asyncio.gather(*(service.generate_response(f"question {i}") for i in range(5)))
+        return streamed, answers
+
+    streamed, answers = asyncio.run(scenario())
+
+    assert streamed == ["spindle ", "limit "]
+    assert answers == [f"question {i} " for i in range(5)]
+    stats = service.stats()
+    assert stats["requests_total"] == 6
+    assert fake.prompts[1:] == [f"question {i}" for i in range(5)]
+    assert stats["avg_queue_wait_ms"] > 0
+    assert stats["tokens_total"] == 12
+
+def test_backend_selection(local_service, monkeypatch):
+    """LLM_BACKEND picks the local model explicitly, or automatically when no API key is set"""
+    service, _ = local_service
+    monkeypatch.setattr(local_llm_service, "get_local_llm_service", lambda: service)
+    monkeypatch.delenv("DEEPSEEK_API_KEY", raising=False)
+    from apps.backend.services.ai.deepseek_service import DeepSeekService
+    from apps.backend.services.ai import deepseek_service
+    monkeypatch.setattr(deepseek_service, "get_deepseek_service", lambda: DeepSeekService())
+
+    monkeypatch.setenv("LLM_BACKEND", "local")
+    assert responder.get_generation_backend() is service
+    monkeypatch.setenv("LLM_BACKEND", "auto")
+    assert responder.get_generation_backend() is service
+    monkeypatch.setenv("LLM_BACKEND", "deepseek")
+    assert responder.get_generation_backend().provider == "deepseek"
+
+    monkeypatch.setenv("LLM_BACKEND", "local")
+    monkeypatch.setattr(responder, "get_response_cache", lambda: None)
+    reply = asyncio.run(responder.draft_reply("spindle limit", []))
+    assert reply["provider"] == "local"
+    assert reply["answer"] == "spindle limit "
+
+def test_worker_survives_a_closed_requester_loop(local_service):
+    """A request whose event loop closed before its tokens arrived must not kill the worker"""
+    service, _ = local_service
+
+    async def abandon():
+        await service.start()
+        output = asyncio.Queue()
+        service._jobs.put_nowait(local_llm_service._Job(
+            [{"role": "user", "content": "left behind"}], 0.7, 8, asyncio.get_running_loop(), output
+        ))
+        service._requests += 1
+
+    asyncio.run(abandon())  # Loop closes while the job is queued or running
+
+    async def follow_up():
+        return await asyncio.wait_for(service.generate_response("still serving"), timeout=5)
+
+    assert asyncio.run(follow_up()) == "still serving "
+    assert service._worker.is_alive()
+
+if __name__ == "__main__":
+    pytest.main([__file__])
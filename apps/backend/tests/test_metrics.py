@@ -0,0 +1,144 @@
+"""
+Tests for latency histograms, debug traces and the /metrics endpoint
+"""
+import pytest
+import asyncio
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.benchmarks.stubs import HashingEmbeddingService, OverlapCrossEncoder, StubLLM
+from apps.backend.services import responder
+from apps.backend.services.core import metrics, rag_retriever_advanced
+from apps.backend.services.core.executor import BoundedExecutor
+from apps.backend.services.core.metrics import Histogram, MetricsRegistry, start_trace, trace_stage
+from apps.backend.services.rag.hybrid_search import HybridSearch
+from apps.backend.services.rag.reranker import Reranker
+
+DOCS = {
+    "manual.pdf_chunk_0": "The spindle temperature limit is 60 degrees during continuous operation.",
+    "manual.pdf_chunk_1": "Check the coolant level and pressure at the start of every shift.",
+    "safety.pdf_chunk_0": "Wear eye protection near the grinding station at all times.",
+}
+
+def test_histogram_quantiles_and_prometheus_output():
+    """Quantiles interpolate within buckets and the exposition format is cumulative"""
+    histogram = Histogram(buckets=(10, 100, 1000))
+    for value in [5] * 90 + [500] * 10:
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) <= 10
+    assert 100 < histogram.quantile(0.95) <= 1000
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100
+    assert snapshot["max_ms"] == 500
+
+    registry = MetricsRegistry()
+    registry.describe("rag_stage_latency_ms", "Stage latency")
+    registry.observe("rag_stage_latency_ms", 5, stage="bm25")
+    text = registry.render_prometheus()
+    assert "# TYPE rag_stage_latency_ms histogram" in text
+    assert 'rag_stage_latency_ms_bucket{stage="bm25",le="+Inf"} 1' in text
+    assert 'rag_stage_latency_ms_count{stage="bm25"} 1' in text
+
+def test_trace_collects_stages_from_executor_threads(monkeypatch):
+    """Stages timed on the bounded executor land in the request's trace and the registry"""
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, "_metrics_registry", registry)
+    executor = BoundedExecutor("test-trace", max_workers=2, max_queue=2)
+
+    def work(name):
+        with trace_stage(name) as stage:
+            stage["candidates"] = 3
+
+    async def scenario():
+        trace = start_trace()
+        await asyncio.gather(executor.run(work, "ann"), executor.run(work, "bm25"))
+        return trace.to_dict()
+
+    traced = asyncio.run(scenario())
+    executor.shutdown()
+
+    assert sorted(s["stage"] for s in traced["stages"]) == ["ann", "bm25"]
+    assert all(s["candidates"] == 3 for s in traced["stages"])
+    assert registry.snapshot()["rag_stage_latency_ms"]["stage=ann"]["count"] == 1
+
+    # Without an active trace only the histogram is updated
+    work("ann")
+    assert registry.snapshot()["rag_stage_latency_ms"]["stage=ann"]["count"] == 2
+
+class _MemoryStore:
+    """In-memory vector store with the VectorStore.search interface"""
+
+    def __init__(self, embedder):
+        self.ids = list(DOCS)
+        self.documents = list(DOCS.values())
+        self.metadatas = [{"doc_filename": doc_id.split("_chunk_")[0], "chunk_index": 0} for doc_id in self.ids]
+        self.vectors = np.asarray(embedder.embed(self.documents))
+
+    def search(self, query_embedding, n_results=5):
+        distances = 1.0 - self.vectors @ np.asarray(query_embedding)
+        order = np.argsort(distances)[:n_results]
+        return {
+            "ids": [self.ids[i] for i in order],
+            "documents": [self.documents[i] for i in order],
+            "metadatas": [self.metadatas[i] for i in order],
+            "distances": [float(distances[i]) for i in order],
+        }
+
+class _StubBackend(StubLLM):
+    provider = "stub"
+    model = "stub"
+
+def test_chat_debug_flag_returns_trace(monkeypatch):
+    """debug=true adds per-stage timings, candidate counts and cache outcomes to search_metadata"""
+    from fastapi.testclient import TestClient
+    from apps.backend.main import app
+    from apps.backend.api import routes_chat
+    from apps.backend.services.core.chat_pipeline import IndexStatusMonitor
+
+    embedder = HashingEmbeddingService()
+    store = _MemoryStore(embedder)
+    hybrid_search = HybridSearch(store, embedder)
+    hybrid_search.build_bm25_index(store.documents)
+    hybrid_search.ids = store.ids
+    hybrid_search.metadatas = store.metadatas
+    reranker = Reranker(use_reranking=False)
+    reranker.use_reranking = True
+    reranker.model = OverlapCrossEncoder()
+
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, "_metrics_registry", registry)
+    monkeypatch.setattr(rag_retriever_advanced, "_hybrid_search", hybrid_search)
+    monkeypatch.setattr(rag_retriever_advanced, "_reranker", reranker)
+    monkeypatch.setattr(routes_chat, "_index_monitor", IndexStatusMonitor(lambda: {"status": "loaded"}))
+    monkeypatch.setattr(routes_chat, "get_query_cache", lambda: None)
+    monkeypatch.setattr(routes_chat, "get_generation_backend", lambda: _StubBackend())
+    monkeypatch.setattr(responder, "get_generation_backend", lambda: _StubBackend())
+    monkeypatch.setattr(responder, "get_response_cache", lambda: None)
+
+    client = TestClient(app)
+    plain = client.post("/chat/", json={"query": "spindle temperature limit", "top_k": 2})
+    assert plain.status_code == 200
+    assert "trace" not in plain.json()["search_metadata"]
+
+    response = client.post("/chat/", json={"query": "spindle temperature limit", "top_k": 2, "debug": True})
+    assert response.status_code == 200
+    trace = response.json()["search_metadata"]["trace"]
+    stages = {s["stage"] for s in trace["stages"]}
+    assert {"embed", "ann", "bm25", "fuse", "rerank", "llm"} <= stages
+    assert trace["candidates"]["returned"] == 2
+    assert trace["candidates"]["vector"] == 3
+    assert trace["query_cache"] == "disabled"
+
+    snapshot = client.get("/metrics", params={"format": "json"}).json()
+    assert snapshot["rag_stage_latency_ms"]["stage=rerank"]["count"] == 2
+    assert snapshot["chat_stage_latency_ms"]["endpoint=chat,stage=total"]["count"] == 2
+    text = client.get("/metrics").text
+    assert 'chat_stage_latency_ms_count{endpoint="chat",stage="retrieve"} 2' in text
+
+if __name__ == "__main__":
+    pytest.main([__file__])
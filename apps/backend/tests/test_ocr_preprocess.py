@@ -0,0 +1,120 @@
+"""
+Tests for OCR image preprocessing and its benchmark
+"""
+import pytest
+import io
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.ai import ocr_service
+from apps.backend.services.ai.ocr_preprocess import (
+    PreprocessOptions, adaptive_threshold, estimate_skew, map_box_to_source, preprocess_image
+)
+
+def _lined_page(skew: float = 0.0) -> Image.Image:
+    page = Image.new("L", (1200, 900), 255)
+    draw = ImageDraw.Draw(page)
+    for y in range(100, 800, 40):
+        draw.rectangle([100, y, 1100, y + 12], fill=0)
+    return page.rotate(skew, expand=True, fillcolor=255) if skew else page
+
+def test_options_parse_presets_and_steps(monkeypatch):
+    assert PreprocessOptions.parse("none").steps == ()
+    assert PreprocessOptions.parse("threshold,downscale").steps == ("downscale", "threshold")
+    monkeypatch.setenv("OCR_PREPROCESS", "full")
+    assert len(PreprocessOptions.parse(None).steps) == 4
+    with pytest.raises(ValueError):
+        PreprocessOptions.parse("sharpen")
+
+def test_large_jpeg_is_downscaled_at_decode():
+    buffer = io.BytesIO()
+    Image.new("RGB", (6000, 4000), (200, 200, 200)).save(buffer, format="JPEG", dpi=(72, 72))
+    image = Image.open(io.BytesIO(buffer.getvalue()))
+
+    processed, report = preprocess_image(image, PreprocessOptions(("downscale", "grayscale"), max_side=3000))
+
+    assert processed.mode == "L"
+    assert max(processed.size) == 3000
+    assert report["scale"] == pytest.approx(0.5)
+
+def test_high_dpi_scan_is_reduced_to_target_dpi():
+    scan = Image.new("L", (2400, 3300), 255)
+    scan.info["dpi"] = (600, 600)
+    processed, report = preprocess_image(scan, PreprocessOptions(("downscale",), target_dpi=300))
+    assert processed.size == (1200, 1650)
+
+def test_deskew_recovers_rotation():
+    assert estimate_skew(_lined_page(skew=-3.0)) == pytest.approx(3.0, abs=0.2)
+    assert estimate_skew(_lined_page()) == pytest.approx(0.0, abs=0.2)
+
+def test_adaptive_threshold_handles_uneven_lighting():
+    """Dark text stays ink and paper stays white across a strong lighting gradient"""
+    page = np.asarray(_lined_page(), dtype=np.float32)
+    lit = (page * np.linspace(1.0, 0.4, page.shape[1])[None, :]).astype(np.uint8)
+
+    binary = adaptive_threshold(lit, window=31, offset=0.1)
+
+    ink = np.asarray(_lined_page()) == 0
+    assert set(np.unique(binary)) <= {0, 255}
+    assert (binary[ink] == 0).mean() > 0.95
+    assert (binary[~ink] == 255).mean() > 0.95
+
+def test_boxes_map_back_to_original_coordinates(monkeypatch):
+    seen = []
+
+    def fake_image_to_data(image, lang, output_type):
+        seen.append(image.size)
+        return {
+            "level": [5], "page_num": [1], "block_num": [1], "par_num": [1], "line_num": [1], "word_num": [1],
+            "left": [50], "top": [20], "width": [100], "height": [10], "conf": [90], "text": ["Valve"],
+        }
+
+    monkeypatch.setattr(ocr_service.pytesseract, "image_to_data", fake_image_to_data)
+    monkeypatch.setenv("OCR_MAX_SIDE", "4000")
+    buffer = io.BytesIO()
+    Image.new("RGB", (8000, 2000), "white").save(buffer, format="PNG")
+
+    result = ocr_service.OCRService(backend="pytesseract").extract_text(buffer.getvalue(), preprocess="downscale")
+
+    assert seen == [(4000, 1000)]
+    assert result["boxes"][0]["left"] == 100 and result["boxes"][0]["width"] == 200
+    assert result["preprocessing"]["steps"] == ["downscale"]
+
+def test_deskewed_boxes_map_back_through_rotation_and_expansion():
+    page = Image.new("L", (2000, 1400), 255)
+    ImageDraw.Draw(page).rectangle([1500, 200, 1539, 219], fill=0)  # A word near the top-right corner
+
+    for angle in (3.0, -4.5):
+        rotated = page.rotate(angle, resample=Image.NEAREST, expand=True, fillcolor=255)
+        ys, xs = np.where(np.asarray(rotated) < 128)
+        report = {"skew_angle": angle, "rotated_from": [2000, 1400], "rotated_to": list(rotated.size), "scale": 0.5}
+
+        left, top, width, height = map_box_to_source(
+            int(xs.min()), int(ys.min()), int(xs.max() - xs.min() + 1), int(ys.max() - ys.min() + 1), report
+        )
+        # Upright bounds of the rotated word, at original (2x) resolution: within a few pixels
+        assert abs(left - 3000) <= 6 and abs(top - 400) <= 6
+        assert 80 <= width <= 92 and 40 <= height <= 56
+
+def test_benchmark_reports_each_config():
+    from apps.backend.benchmarks.bench_ocr import run_benchmark
+
+    class _Stub:
+        def extract_text(self, data, preprocess=None):
+            time.sleep(0.005)
+            return {"confidence": 0.9 if preprocess == "full" else 0.7, "word_count": 10,
+                    "preprocessing": {"ms": 1.0}}
+
+    results = run_benchmark({"a": b"x"}, ["none", "full"], runs=2, service=_Stub())
+
+    assert results["configs"]["full"]["confidence_mean"] == 0.9
+    assert results["configs"]["none"]["speedup_vs_none"] == 1.0
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,90 @@
+"""
+Tests for single-pass OCR text reconstruction and the tesserocr backend
+"""
+import pytest
+import io
+import types
+
+from PIL import Image
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.ai import ocr_service
+from apps.backend.services.ai.ocr_service import OCRService, parse_tsv, text_from_data
+
+# Two blocks; the first has two paragraphs, the second a two-line paragraph
+TSV = "\n".join([
+    "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext",
+    "1\t1\t0\t0\t0\t0\t0\t0\t400\t300\t-1\t",
+    "2\t1\t1\t0\t0\t0\t10\t10\t200\t40\t-1\t",
+    "5\t1\t1\t1\t1\t1\t10\t10\t60\t12\t96.5\tPump",
+    "5\t1\t1\t1\t1\t2\t75\t10\t30\t12\t91\tP-101",
+    "5\t1\t1\t2\t1\t1\t10\t30\t80\t12\t88\tInspected",
+    "5\t1\t2\t1\t1\t1\t10\t60\t50\t12\t90\tSeal",
+    "5\t1\t2\t1\t1\t2\t65\t60\t40\t12\t-1\t ",
+    "5\t1\t2\t1\t2\t1\t10\t75\t50\t12\t80\tleaking",
+])
+
+def _png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("L", (400, 300), 255).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def test_text_is_rebuilt_from_layout():
+    assert text_from_data(parse_tsv(TSV)) == "Pump P-101\n\nInspected\n\nSeal\nleaking"
+
+def test_extract_text_runs_tesseract_once(monkeypatch):
+    """Boxes and text come from one image_to_data pass; image_to_string is never called"""
+    calls = []
+
+    def fake_image_to_data(image, lang, output_type):
+        calls.append(lang)
+        return parse_tsv(TSV)
+
+    monkeypatch.setattr(ocr_service.pytesseract, "image_to_data", fake_image_to_data)
+    monkeypatch.setattr(ocr_service.pytesseract, "image_to_string", lambda *a, **k: pytest.fail("second OCR pass"))
+
+    result = OCRService(backend="pytesseract").extract_text(_png())
+
+    assert calls == ["eng"]
+    assert result["text"] == "Pump P-101\n\nInspected\n\nSeal\nleaking"
+    assert result["word_count"] == 5
+    assert result["boxes"][0] == {
+        "text": "Pump", "left": 10, "top": 10, "width": 60, "height": 12, "confidence": 0.965, "level": 5
+    }
+    assert result["confidence"] == pytest.approx((96.5 + 91 + 88 + 90 + 80) / 500, abs=1e-3)
+
+def test_tesserocr_api_is_reused_per_thread(monkeypatch):
+    created = []
+
+    class _FakeAPI:
+        def __init__(self, lang):
+            created.append(lang)
+
+        def SetImage(self, image):
+            self.image = image
+
+        def GetTSVText(self, page):
+            return TSV.split("\n", 1)[1]  # tesserocr omits the header row
+
+    monkeypatch.setattr(ocr_service, "tesserocr", types.SimpleNamespace(PyTessBaseAPI=_FakeAPI), raising=False)
+    monkeypatch.setattr(ocr_service, "TESSEROCR_AVAILABLE", True)
+
+    service = OCRService(backend="auto")
+    first = service.extract_text(_png())
+    service.extract_text(_png())
+    service.extract_text(_png(), lang="kor")
+
+    assert service.backend == "tesserocr"
+    assert created == ["eng", "kor"]
+    assert first["text"].startswith("Pump P-101")
+
+def test_tesserocr_backend_requires_package(monkeypatch):
+    monkeypatch.setattr(ocr_service, "TESSEROCR_AVAILABLE", False)
+    with pytest.raises(ImportError):
+        OCRService(backend="tesserocr")
+
+if __name__ == "__main__":
+    pytest.main([__file__])
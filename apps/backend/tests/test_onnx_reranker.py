@@ -0,0 +1,99 @@
+"""
+Parity tests for the ONNX Runtime reranker backend against sentence-transformers
+"""
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+sentence_transformers = pytest.importorskip("sentence_transformers")
+
+from apps.backend.services.rag.onnx_reranker import OnnxCrossEncoder
+from apps.backend.services.rag.reranker import Reranker
+
+VOCAB = [
+    "[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]",
+    "what", "is", "the", "max", "spindle", "temperature", "for", "machine",
+    "coolant", "pressure", "alarm", "reset", "procedure", "motor", "speed",
+    "limit", "degrees", "celsius", "bar", "rpm", "check", "manual", "a", "b",
+]
+
+PAIRS = [
+    ("what is the max spindle temperature", "the spindle temperature limit is 60 degrees celsius"),
+    ("what is the max spindle temperature", "coolant pressure alarm reset procedure"),
+    ("what is the max spindle temperature", "motor speed limit is 3000 rpm"),
+    ("coolant pressure alarm", "check coolant pressure 5 bar"),
+    ("coolant pressure alarm", "the spindle temperature limit is 60 degrees celsius"),
+]
+
+@pytest.fixture(scope="module")
+def tiny_cross_encoder(tmp_path_factory):
+    """Build a small randomly initialised BERT cross-encoder so the test runs offline"""
+    import torch
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    model_dir = tmp_path_factory.mktemp("tiny-cross-encoder")
+    vocab_file = model_dir / "vocab.txt"
+    vocab_file.write_text("\n".join(VOCAB) + "\n")
+
+    tokenizer = BertTokenizerFast(vocab_file=str(vocab_file), model_max_length=128)
+    tokenizer.save_pretrained(str(model_dir))
+
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=len(VOCAB),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=128,
+        num_labels=1,
+    )
+    BertForSequenceClassification(config).eval().save_pretrained(str(model_dir))
+    return str(model_dir)
+
+def test_onnx_fp32_matches_torch(tiny_cross_encoder, tmp_path):
+    """Unquantized ONNX scores match the PyTorch CrossEncoder"""
+    from sentence_transformers import CrossEncoder
+
+    torch_scores = CrossEncoder(tiny_cross_encoder).predict(PAIRS)
+    onnx_model = OnnxCrossEncoder(tiny_cross_encoder, quantize=False, cache_dir=str(tmp_path))
+
+    # Different batch sizes exercise the dynamic batch and sequence axes
+    for batch_size in (1, 2, 32):
+        onnx_scores = onnx_model.predict(PAIRS, batch_size=batch_size)
+        assert onnx_scores.shape == (len(PAIRS),)
+        assert np.allclose(torch_scores, onnx_scores, atol=1e-4)
+
+def test_onnx_int8_close_to_torch(tiny_cross_encoder, tmp_path):
+    """Quantized ONNX scores stay close to the PyTorch CrossEncoder"""
+    from sentence_transformers import CrossEncoder
+
+    torch_scores = CrossEncoder(tiny_cross_encoder).predict(PAIRS)
+    onnx_model = OnnxCrossEncoder(tiny_cross_encoder, quantize=True, num_threads=1, cache_dir=str(tmp_path))
+    onnx_scores = onnx_model.predict(PAIRS)
+
+    assert os.path.exists(os.path.join(str(tmp_path), tiny_cross_encoder.strip("/").replace("/", "__"), "model.int8.onnx"))
+    assert np.max(np.abs(torch_scores - onnx_scores)) < 0.05
+
+def test_reranker_onnx_backend(tiny_cross_encoder, tmp_path, monkeypatch):
+    """Reranker uses the ONNX backend and keeps its result format"""
+    monkeypatch.setenv("ONNX_MODEL_DIR", str(tmp_path))
+    reranker = Reranker(model_name=tiny_cross_encoder, backend="onnx", quantize=False)
+    results = [{"text": doc, "score": 0.1 * i} for i, (_, doc) in enumerate(PAIRS[:3])]
+
+    reranked = reranker.rerank(PAIRS[0][0], results, top_k=2)
+
+    assert reranker.use_reranking
+    assert len(reranked) == 2
+    assert all("rerank_score" in r and "original_score" in r for r in reranked)
+    assert reranked[0]["rerank_score"] >= reranked[1]["rerank_score"]
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,82 @@
+"""
+Tests for the two-level chat query cache
+"""
+import pytest
+import time
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.core.query_cache import QueryCache, normalize_query
+
+PARAMS = (5, True, 0.5)
+VALUE = {"answer": "60 C", "evidences": [], "search_metadata": {"total_results": 0}}
+
+def test_normalize_query():
+    """Case, whitespace and trailing punctuation do not change the key"""
+    assert normalize_query("  What is the MAX spindle   temperature?  ") == "what is the max spindle temperature"
+
+def test_exact_hit_after_normalization():
+    """Level 1 matches differently formatted copies of the same question"""
+    cache = QueryCache()
+    cache.put("What is the max spindle temperature?", PARAMS, 1, VALUE)
+
+    assert cache.get_exact("what is the max spindle temperature", PARAMS, 1) == VALUE
+    assert cache.get_exact("what is the max spindle temperature", (3, True, 0.5), 1) is None
+    assert cache.stats()["exact_hits"] == 1
+
+def test_semantic_hit_respects_threshold():
+    """Level 2 returns the nearest cached query only above the similarity threshold"""
+    cache = QueryCache(similarity_threshold=0.9)
+    cache.put("max spindle temperature", PARAMS, 1, VALUE, query_embedding=[1.0, 0.0, 0.0])
+
+    assert cache.get_semantic([0.95, 0.1, 0.0], PARAMS, 1) == VALUE
+    assert cache.get_semantic([0.0, 1.0, 0.0], PARAMS, 1) is None
+    cache.record_miss()
+
+    stats = cache.stats()
+    assert stats["semantic_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_index_version_change_invalidates():
+    """A new index version drops all entries from previous versions"""
+    cache = QueryCache()
+    cache.put("q", PARAMS, 1, VALUE, query_embedding=[1.0, 0.0])
+
+    assert cache.get_exact("q", PARAMS, 2) is None
+    assert cache.get_semantic([1.0, 0.0], PARAMS, 2) is None
+    assert cache.stats()["invalidations"] == 1
+
+def test_stale_write_is_dropped():
+    """A result computed against an older index version neither lands nor invalidates"""
+    cache = QueryCache()
+    cache.put("fresh", PARAMS, 2, VALUE)
+    cache.put("stale", PARAMS, 1, {"results": ["old"]})
+
+    assert cache.get_exact("fresh", PARAMS, 2) == VALUE
+    assert cache.get_exact("stale", PARAMS, 2) is None
+    stats = cache.stats()
+    assert stats["stale_writes"] == 1
+    assert stats["invalidations"] == 0
+
+def test_ttl_and_lru_eviction():
+    """Expired entries are not returned and the oldest entry is evicted at capacity"""
+    cache = QueryCache(max_entries=2, ttl_seconds=0.05)
+    cache.put("a", PARAMS, 1, VALUE)
+    time.sleep(0.1)
+    assert cache.get_exact("a", PARAMS, 1) is None
+
+    cache = QueryCache(max_entries=2)
+    cache.put("a", PARAMS, 1, VALUE)
+    cache.put("b", PARAMS, 1, VALUE)
+    cache.get_exact("a", PARAMS, 1)
+    cache.put("c", PARAMS, 1, VALUE)
+
+    assert cache.get_exact("b", PARAMS, 1) is None
+    assert cache.get_exact("a", PARAMS, 1) == VALUE
+    assert cache.stats()["evictions"] == 1
+
+if __name__ == "__main__":
+    pytest.main([__file__])
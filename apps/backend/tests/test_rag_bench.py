@@ -0,0 +1,78 @@
+"""
+Tests for the RAG benchmark metrics and the offline benchmark run
+"""
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.benchmarks.metrics import recall_at_k, reciprocal_rank, ndcg_at_k, summarize_quality
+
+def test_retrieval_metrics():
+    """recall@k, MRR and nDCG on a hand-checked ranking"""
+    retrieved = ["x", "a", "y", "b"]
+    relevant = ["a", "b"]
+
+    assert recall_at_k(retrieved, relevant, 2) == 0.5
+    assert recall_at_k(retrieved, relevant, 4) == 1.0
+    assert reciprocal_rank(retrieved, relevant) == 0.5
+    assert ndcg_at_k(["a", "b"], relevant, 2) == pytest.approx(1.0)
+    assert 0.0 < ndcg_at_k(retrieved, relevant, 4) < 1.0
+    assert summarize_quality([{"retrieved": retrieved, "relevant": relevant}], 2)["mrr"] == 0.5
+
+def test_offline_benchmark_run(tmp_path):
+    """A small stub-model run produces quality, per-stage latency and indexing stats"""
+    pytest.importorskip("chromadb")
+    pytest.importorskip("rank_bm25")
+    pytest.importorskip("pypdf")
+    from apps.backend.benchmarks.run_rag_bench import run_benchmark, compare_results, STAGES
+
+    results = run_benchmark(num_docs=4, doc_format="pdf", corpus_dir=str(tmp_path / "corpus"), top_k=3)
+
+    assert results["config"]["num_queries"] > 0
+    assert results["indexing"]["chunks"] > 0
+    assert results["indexing"]["chunks_per_s"] > 0
+    for run in results["runs"].values():
+        assert set(run["latency"]) == set(STAGES)
+        assert 0.0 <= run["quality"]["recall@3"] <= 1.0
+    planner = results["runs"]["alpha=0.5/adaptive"]["planner"]
+    assert sum(planner["decisions"].values()) == results["config"]["num_queries"]
+    assert set(planner["by_decision"]) == set(planner["decisions"])
+
+    assert compare_results(results, results) == []
+    worse = {"runs": {
+        name: {**run, "quality": {k: v - 0.5 for k, v in run["quality"].items()}}
+        for name, run in results["runs"].items()
+    }}
+    assert compare_results(worse, results)
+
+def test_txt_corpus_is_labelled(tmp_path):
+    """Generated .txt documents keep their queries (labels match on the file stem)"""
+    pytest.importorskip("chromadb")
+    pytest.importorskip("rank_bm25")
+    from apps.backend.benchmarks.run_rag_bench import run_benchmark
+
+    results = run_benchmark(num_docs=3, doc_format="txt", corpus_dir=str(tmp_path / "corpus"), top_k=3, modes=["no_rerank"])
+
+    assert results["config"]["num_queries"] > 0
+    assert results["runs"]["alpha=0.5/no_rerank"]["quality"]["recall@3"] > 0
+
+def test_benchmark_rejects_corpus_without_relevant_chunks(tmp_path):
+    pytest.importorskip("chromadb")
+    pytest.importorskip("rank_bm25")
+    import json
+    from apps.backend.benchmarks.run_rag_bench import run_benchmark
+
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "notes.txt").write_text("Nothing about any machine here.", encoding="utf-8")
+    (corpus / "queries.json").write_text(json.dumps([
+        {"query": "What is the max spindle temperature?", "filename": "other.pdf", "answer_phrase": "spindle temperature is 90"}
+    ]))
+
+    with pytest.raises(ValueError):
+        run_benchmark(corpus_dir=str(corpus), top_k=3, modes=["no_rerank"])
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,115 @@
+"""
+Tests for the disk cache and the LLM response cache
+"""
+import pytest
+import asyncio
+import time
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.core.disk_cache import DiskCache
+from apps.backend.services.core.response_cache import ResponseCache, response_cache_key
+from apps.backend.services import responder
+
+EVIDENCES = [
+    {"doc_id": "manual_0", "text": "Spindle temperature limit is 60C.", "filename": "manual.pdf", "score": 0.9},
+    {"doc_id": "manual_1", "text": "Coolant pressure must stay above 2 bar.", "filename": "manual.pdf", "score": 0.8},
+]
+
+def test_key_covers_prompt_inputs():
+    """Key is stable under query normalization but changes with model, prompt or evidence order"""
+    base = response_cache_key("m", "sys", "Spindle limit?", EVIDENCES, "ctx")
+
+    assert response_cache_key("m", "sys", "  spindle LIMIT ", EVIDENCES, "ctx") == base
+    assert response_cache_key("other", "sys", "Spindle limit?", EVIDENCES, "ctx") != base
+    assert response_cache_key("m", "sys2", "Spindle limit?", EVIDENCES, "ctx") != base
+    assert response_cache_key("m", "sys", "Spindle limit?", EVIDENCES[::-1], "ctx") != base
+    assert response_cache_key("m", "sys", "Spindle limit?", EVIDENCES, "edited ctx") != base
+
+def test_disk_cache_ttl_and_size_cap(tmp_path):
+    """Entries expire after the TTL, and the oldest files are evicted beyond max_bytes"""
+    cache = DiskCache(str(tmp_path / "ttl"), ttl_seconds=0.05)
+    cache.set("a", {"v": 1})
+    assert cache.get("a") == {"v": 1}
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+    capped = DiskCache(str(tmp_path / "capped"), max_bytes=300)
+    for i in range(5):
+        capped.set(f"k{i}", {"payload": "x" * 80})
+        time.sleep(0.01)
+    stats = capped.stats()
+    assert stats["bytes"] <= 300
+    assert stats["evictions"] > 0
+    assert capped.get("k4") is not None
+    assert capped.get("k0") is None
+
+    # A new instance over the same directory sees the persisted entries
+    assert DiskCache(str(tmp_path / "capped")).get("k4") == {"payload": "x" * 80}
+
+def test_disk_cache_evicts_least_recently_used_without_rescanning(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path), max_bytes=400)  # Room for three ~126-byte entries
+    for i in range(3):
+        cache.set(f"k{i}", {"payload": "x" * 80})
+
+    # Eviction works from the in-memory index; the directory is only scanned at startup
+    monkeypatch.setattr(cache, "_scan", lambda: pytest.fail("eviction rescanned the cache directory"))
+    assert cache.get("k0") is not None  # k0 becomes the most recently used
+    cache.set("k3", {"payload": "x" * 80})
+    assert cache.get("k1") is None
+    assert cache.get("k0") is not None and cache.get("k3") is not None
+    monkeypatch.undo()
+
+    # A restarted cache seeds recency from file mtimes
+    reopened = DiskCache(str(tmp_path), max_bytes=400)
+    assert reopened.stats()["bytes"] == cache.stats()["bytes"]
+
+def test_response_cache_tiers(tmp_path):
+    """Misses fall through to disk, and disk hits are promoted to memory"""
+    cache = ResponseCache(max_entries=1, disk_cache=DiskCache(str(tmp_path)))
+    cache.put("k1", {"answer": "one"})
+    cache.put("k2", {"answer": "two"})  # evicts k1 from memory only
+
+    assert cache.get("k2") == ({"answer": "two"}, "memory")
+    assert cache.get("k1") == ({"answer": "one"}, "disk")
+    assert cache.get("k1") == ({"answer": "one"}, "memory")
+    assert cache.get("k3") == (None, None)
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (2, 1, 1)
+
+class _CountingLLM:
+    provider = "deepseek"
+    model = "stub-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    def is_configured(self):
+        return True
+
+    async def generate_response(self, query, context=None, system_prompt=None):
+        self.calls += 1
+        return f"answer {self.calls}"
+
+def test_draft_reply_reuses_cached_answer(monkeypatch):
+    """A repeated question over the same evidence skips the LLM call"""
+    from apps.backend.services.ai import deepseek_service
+
+    llm = _CountingLLM()
+    cache = ResponseCache()
+    monkeypatch.setattr(deepseek_service, "get_deepseek_service", lambda: llm)
+    monkeypatch.setattr(responder, "get_response_cache", lambda: cache)
+
+    first = asyncio.run(responder.draft_reply("Spindle limit?", EVIDENCES))
+    second = asyncio.run(responder.draft_reply("spindle limit", EVIDENCES))
+    third = asyncio.run(responder.draft_reply("Spindle limit?", EVIDENCES[:1]))
+
+    assert first["answer"] == second["answer"] == "answer 1"
+    assert second["cache"] == "memory"
+    assert third["answer"] == "answer 2"
+    assert llm.calls == 2
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,88 @@
+"""
+Tests for the adaptive retrieval planner
+"""
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.rag.retrieval_planner import RetrievalPlanner
+
+def _candidates(rows):
+    """Build fused candidates from (id, fused, vector, bm25) rows"""
+    return [
+        {"id": doc_id, "score": fused, "vector_score": vector, "bm25_score": bm25}
+        for doc_id, fused, vector, bm25 in rows
+    ]
+
+def test_decisive_first_stage_skips_reranking():
+    """A clear top-1 lead skips re-ranking"""
+    candidates = _candidates([
+        ("a", 0.95, 0.9, 1.0),
+        ("b", 0.80, 0.95, 0.85),
+        ("c", 0.40, 0.3, 0.5),
+        ("d", 0.35, 0.4, 0.3),
+    ])
+    plan = RetrievalPlanner().plan(candidates, top_k=2)
+
+    assert plan["decision"] == "skip"
+    assert plan["rerank_depth"] == 0
+    assert plan["lead"] == pytest.approx(0.15)
+    assert plan["agreement"] == 1.0
+
+def test_agreement_guard_blocks_skip():
+    """With an agreement floor set, a clear lead alone does not skip"""
+    candidates = _candidates([
+        ("a", 0.90, 1.0, 0.0),
+        ("b", 0.60, 0.0, 1.0),
+        ("c", 0.40, 0.3, 0.5),
+    ])
+    assert RetrievalPlanner().plan(candidates, top_k=1)["decision"] == "skip"
+    assert RetrievalPlanner(decisive_agreement=0.5).plan(candidates, top_k=1)["decision"] == "narrow"
+
+def test_near_tie_widens_candidate_depth():
+    """The top two results are nearly tied, so more candidates are re-ranked"""
+    candidates = _candidates([
+        ("a", 0.60, 1.0, 0.2),
+        ("b", 0.59, 0.9, 0.25),
+        ("c", 0.55, 0.1, 1.0),
+        ("d", 0.50, 0.0, 0.95),
+        ("e", 0.30, 0.3, 0.3),
+        ("f", 0.20, 0.2, 0.2),
+        ("g", 0.10, 0.1, 0.1),
+        ("h", 0.05, 0.05, 0.05),
+    ])
+    plan = RetrievalPlanner().plan(candidates, top_k=2)
+
+    assert plan["decision"] == "widen"
+    assert plan["rerank_depth"] == 6
+
+def test_moderate_lead_narrows_and_counts_decisions():
+    """A moderate top-1 lead re-ranks a narrower set; decisions are counted"""
+    candidates = _candidates([
+        ("a", 0.9, 1.0, 0.9),
+        ("b", 0.8, 0.9, 0.1),
+        ("c", 0.7, 0.1, 0.8),
+        ("d", 0.6, 0.8, 0.7),
+        ("e", 0.3, 0.2, 0.2),
+        ("f", 0.2, 0.1, 0.1),
+    ])
+    planner = RetrievalPlanner(decisive_lead=0.2)
+    plan = planner.plan(candidates, top_k=4)
+
+    assert plan["decision"] == "narrow"
+    assert plan["rerank_depth"] == 6
+    assert planner.stats()["decisions"]["narrow"] == 1
+    assert planner.max_candidates(4) == 12
+
+def test_small_lead_uses_default_depth():
+    """A lead between the widen and narrow thresholds keeps the default depth"""
+    candidates = _candidates([(c, 0.9 - 0.03 * i, 0.5, 0.5) for i, c in enumerate("abcdefghij")])
+    plan = RetrievalPlanner().plan(candidates, top_k=3)
+
+    assert plan["decision"] == "default"
+    assert plan["rerank_depth"] == 6
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,91 @@
+"""
+Tests for the pluggable speech-to-text backends and the RTF benchmark
+"""
+import pytest
+import time
+import types
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from apps.backend.services.ai.whisper_service import WhisperService
+
+class _Segment:
+    def __init__(self, start, end, text, no_speech_prob):
+        self.start, self.end, self.text, self.no_speech_prob = start, end, text, no_speech_prob
+
+class _FakeWhisperModel:
+    """Stands in for faster_whisper.WhisperModel"""
+
+    instances = []
+
+    def __init__(self, model_size, device, compute_type, cpu_threads):
+        self.options = {"model_size": model_size, "device": device, "compute_type": compute_type, "cpu_threads": cpu_threads}
+        self.calls = []
+        _FakeWhisperModel.instances.append(self)
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append(kwargs)
+        segments = (s for s in [_Segment(0.0, 1.5, " Spindle at", 0.1), _Segment(1.5, 3.0, " sixty degrees.", 0.3)])
+        return segments, types.SimpleNamespace(language="en", duration_after_vad=3.0)
+
+@pytest.fixture
+def fake_faster_whisper(monkeypatch):
+    monkeypatch.setitem(sys.modules, "faster_whisper", types.SimpleNamespace(WhisperModel=_FakeWhisperModel))
+    monkeypatch.setattr(WhisperService, "_model_cache", {})
+    _FakeWhisperModel.instances = []
+    return _FakeWhisperModel
+
+def test_faster_whisper_backend_returns_same_schema(fake_faster_whisper, monkeypatch):
+    """int8 CPU model with VAD and configured threads; response matches the openai backend schema"""
+    monkeypatch.setenv("STT_BACKEND", "auto")
+    monkeypatch.setenv("STT_CPU_THREADS", "4")
+
+    service = WhisperService(model_size="base")
+    result = service.transcribe(np.zeros(48000, dtype=np.float32), language="en")
+
+    model = fake_faster_whisper.instances[0]
+    assert service.backend == "faster-whisper"
+    assert model.options == {"model_size": "base", "device": "cpu", "compute_type": "int8", "cpu_threads": 4}
+    assert model.calls[0]["vad_filter"] is True and model.calls[0]["beam_size"] == 1
+    assert set(result) == {"text", "language", "segments", "no_speech_prob", "confidence"}
+    assert result["text"] == "Spindle at sixty degrees."
+    assert result["segments"][1] == {"start": 1.5, "end": 3.0, "text": "sixty degrees."}
+    assert result["confidence"] == pytest.approx(0.8)
+
+    # Same configuration reuses the loaded model
+    WhisperService(model_size="base")
+    assert len(fake_faster_whisper.instances) == 1
+
+def test_unknown_backend_rejected(monkeypatch):
+    monkeypatch.setattr(WhisperService, "_model_cache", {})
+    with pytest.raises(ValueError):
+        WhisperService(backend="vosk")
+
+def test_rtf_benchmark_with_stub_backend():
+    """The benchmark reports real-time factor per backend and survives missing packages"""
+    from apps.backend.benchmarks.bench_stt import run_benchmark, synthetic_audio
+
+    class _Stub:
+        def transcribe(self, samples):
+            time.sleep(0.02)
+            return {"text": f" {len(samples)} samples"}
+
+    def factory(name, model_size, threads):
+        if name == "faster-whisper-int8":
+            raise ImportError("faster_whisper")
+        return _Stub()
+
+    clips = {"clip": synthetic_audio(seconds=4.0)}
+    results = run_benchmark(clips, "base", ["openai", "faster-whisper-int8"], runs=2, threads=1, factory=factory)
+
+    assert results["audio_s"] == 4.0
+    assert 0 < results["backends"]["openai"]["rtf_mean"] < 1
+    assert results["backends"]["openai"]["transcripts"]["clip"] == "64000 samples"
+    assert "not installed" in results["backends"]["faster-whisper-int8"]["error"]
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,96 @@
+"""
+Tests for vision image preparation and the async vision client path
+"""
+import pytest
+import asyncio
+import base64
+import io
+import os
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+import numpy as np
+from PIL import Image
+
+from apps.backend.services.ai.vision_image import PROVIDER_LIMITS, detect_image_format, prepare_image
+from apps.backend.services.ai.vision_service import VisionService
+
+def _encode(image: Image.Image, fmt: str, **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **kwargs)
+    return buffer.getvalue()
+
+def _photo(width: int, height: int) -> Image.Image:
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 255, (height, width, 3), dtype=np.uint8))
+
+def test_detect_image_format_from_magic_bytes():
+    small = Image.new("RGB", (4, 4), "white")
+    for fmt, name in (("JPEG", "jpeg"), ("PNG", "png"), ("GIF", "gif"), ("WEBP", "webp"), ("TIFF", "tiff"), ("BMP", "bmp")):
+        assert detect_image_format(_encode(small, fmt)) == name
+    assert detect_image_format(b"%PDF-1.7") is None
+
+def test_small_supported_images_pass_through():
+    data = _encode(Image.new("RGB", (640, 480), "white"), "PNG")
+    prepared, media_type, report = prepare_image(data, "anthropic")
+    assert prepared is data and media_type == "image/png" and report["reencoded"] is False
+
+def test_large_photo_is_downscaled_to_provider_limits():
+    data = _encode(_photo(4000, 3000), "JPEG", quality=95)
+
+    prepared, media_type, report = prepare_image(data, "anthropic")
+    width, height = Image.open(io.BytesIO(prepared)).size
+    assert media_type == "image/jpeg" and report["reencoded"] is True
+    assert max(width, height) <= PROVIDER_LIMITS["anthropic"]["max_side"]
+    assert width * height <= PROVIDER_LIMITS["anthropic"]["max_pixels"] * 1.01
+    assert len(prepared) * 5 < len(data)
+
+    prepared, _, _ = prepare_image(data, "openai")
+    assert min(Image.open(io.BytesIO(prepared)).size) == PROVIDER_LIMITS["openai"]["min_side"]
+
+def test_reencode_keeps_transparency_and_orientation():
+    # Unsupported format with alpha -> PNG
+    tiff = _encode(Image.new("RGBA", (300, 200), (255, 0, 0, 128)), "TIFF")
+    prepared, media_type, _ = prepare_image(tiff, "openai")
+    assert media_type == "image/png" and Image.open(io.BytesIO(prepared)).mode == "RGBA"
+
+    # EXIF orientation 6 (rotate 90) is applied before the metadata is dropped
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    photo = _encode(_photo(3000, 2000), "JPEG", exif=exif)
+    prepared, _, report = prepare_image(photo, "anthropic")
+    width, height = Image.open(io.BytesIO(prepared)).size
+    assert height > width and report["source_size"] == [3000, 2000]
+
+def test_describe_image_async_uses_async_client_with_sniffed_format():
+    requests = []
+
+    class _Usage:
+        input_tokens = 1200
+        output_tokens = 40
+
+    class _Response:
+        content = [type("Block", (), {"text": "A pump nameplate"})()]
+        usage = _Usage()
+
+    class _Messages:
+        async def create(self, **kwargs):
+            requests.append(kwargs)
+            return _Response()
+
+    service = VisionService(provider="anthropic")
+    service.model = "claude-test"
+    service.async_client = type("Client", (), {"messages": _Messages()})()
+
+    data = _encode(_photo(3000, 2000), "PNG")
+    result = asyncio.run(service.describe_image_async(data))
+
+    source = requests[0]["messages"][0]["content"][0]["source"]
+    assert source["media_type"] == "image/jpeg"
+    assert len(base64.b64decode(source["data"])) < len(data) / 5
+    assert result["description"] == "A pump nameplate" and result["tokens_used"] == 1240
+    assert result["image"]["source_format"] == "png"
+
+if __name__ == "__main__":
+    pytest.main([__file__])